@@ -1,34 +1,77 @@
+from __future__ import annotations
 import random
 import serial.tools.list_ports
 import serial
 import threading    
 import time
+from typing import Callable
+from collections import namedtuple, deque
+import numpy as np
 
 from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace, print_trace, \
-                        print_call_stack
+                        print_call_stack, debug_enabled
+from poll_policy import pollPolicy
+from station_reactor import stationReactor, reactorJob
+from weight_filters import filterChain
+from async_scale import asyncScaleHub
+from scale_capture import scaleCapture
+from wlc_frame import wlcDecoder
 
 class WLCscale:  
+    weightSample = namedtuple("weightSample", ["time", "weight", "stable"])     # time - monotonic frame arrival time
+    SCALE_VID = 1155                        # Vendor ID for scales
+    BAUDRATE = 9600
+    BYTE_TIME = 10 / BAUDRATE               # sec, start + 8 data + stop bits
+    RX_MAX = 1024                           # bytes without a line end are dropped
+    SAMPLES_MAX = 4096                      # streamed samples kept until drained (~90 sec at the native rate)
+    READER_STOP_TIMEOUT = 1.0               # sec, reader thread exit wait on disconnect
     _scales:list[str]      # Class variable to hold available scales
     @staticmethod
     def listScales()->list[str]:       # List available serial scales COM ports
 
         WLCscale._scales = list()
         ports = serial.tools.list_ports.comports()
-        print_log(f'Scanning available serial ports for scales....{len(ports)} ports found: {ports}')
+        print_log(f'Scanning available serial ports for scales....{len(ports)} ports found')
         for port in ports:
 
-            print_log(f"Found port: {port.device},name={port.name}, Description: {port.description}, name={port.name}, hwid={port.hwid}, vid={port.vid}, serial_number={port.serial_number}, location={port.location}, manufacturer={port.manufacturer},product={port.product}, interface={port.interface} ")
-            # if "Scale" in port.description:  # Replace with actual identifier for scales
-            if port.vid == 1155:  # Vendor ID for scales
+            print_DEBUG(f"Found port: {port.device},name={port.name}, Description: {port.description}, name={port.name}, hwid={port.hwid}, vid={port.vid}, serial_number={port.serial_number}, location={port.location}, manufacturer={port.manufacturer},product={port.product}, interface={port.interface} ")
+            if WLCscale.is_scale_port(port):
                 WLCscale._scales.append(port.device)
+        print_log(f'Scale ports found: {WLCscale._scales}')
         return  WLCscale._scales
+
+    @staticmethod
+    def is_scale_port(port)->bool:     # ListPortInfo filter
+        # if "Scale" in port.description:  # Replace with actual identifier for scales
+        return port.vid == WLCscale.SCALE_VID
     
-    def __init__(self, serial_port: str, poll_interval: float = 0.1):
+    def __init__(self, serial_port: str, poll_interval: float = 0.1, poll_policy:pollPolicy = None,
+                 reactor:stationReactor = None, streaming:bool = False, filters:filterChain = None,
+                 hub:asyncScaleHub = None):
         self.__serial_port = serial_port
+        self.hub:asyncScaleHub | None = hub                 # asyncio hub servicing the port, None - own reader
+        self.subscribers:list[Callable[[list[WLCscale.weightSample]], None]] = list()
+                                                            # called with every batch of new samples, in the reader context
+        self.filters:filterChain | None = filters            # signal conditioning between frame parsing and publication
+        self.streaming:bool = streaming                     # reader consumes every frame instead of polling one line
+        self.samples:deque[WLCscale.weightSample] = deque(maxlen=WLCscale.SAMPLES_MAX)
+                                                            # every frame received (streaming and reactor modes)
+        self.samples_total:int = 0                          # frames received since connect
+        self.last_frame_time:float | None = None            # monotonic time of the last valid frame
+        self.unit:str | None = None                         # weight unit reported by the scale
+        self.overloads:int = 0                              # overload / underload frames received since connect
+        self.capture:scaleCapture | None = None             # raw received bytes recorder, see start_capture()
         self.__connection = None
+        self.reactor:stationReactor | None = reactor        # station reactor running the reader, None - own thread
+        self.__wd:threading.Thread | reactorJob | None = None   # reader thread (or reactor job)
         self.__wd_stop:threading.Event = threading.Event() # Event to stop watchdog thread
+        self.__wd_last_change:float = time.monotonic()      # last weight change time
+        self.__rx:bytearray = bytearray()                   # partial frame received (streaming and reactor modes)
         self.__current_weight:float = 0.0                     # Current weight reading
         self.__poll_interval = poll_interval
+        self.poll_policy:pollPolicy = poll_policy if poll_policy is not None \
+                                        else pollPolicy(idle=max(poll_interval, 0.5), active=poll_interval, near=poll_interval)
+                                                            # polls slowly while the weight is stable
     
     def update_serial_port(self, serial_port: str):
         print_log(f'Updating serial port to {self.__serial_port}-> {serial_port}')
@@ -41,21 +84,35 @@ class WLCscale:
     def updatePollInterval(self, poll_interval: float):
         print_log(f'Updating poll interval to {self.__poll_interval}-> {poll_interval}')
         self.__poll_interval = poll_interval
+        self.poll_policy.active = self.poll_policy.near = poll_interval
+        self.poll_policy.idle = max(self.poll_policy.idle, poll_interval)
 
     def connect(self)->bool:
         try:
             if not self.is_connected():
                 self.__connection = serial.Serial(self.__serial_port, 
-                                                baudrate=9600, 
+                                                baudrate=WLCscale.BAUDRATE, 
                                                 bytesize=serial.EIGHTBITS,
                                                 parity=serial.PARITY_NONE,
                                                 stopbits=serial.STOPBITS_ONE,
                                                 timeout=0.5)
                 print_log(f'Connected to scale on {self.__serial_port}')
-                # Start watchdog thread
-                wd_thread = threading.Thread(target=self.__watch_dog_thread, daemon=True)   
                 self.__wd_stop.clear()
-                wd_thread.start()      
+                self.__rx.clear()
+                self.samples_total = 0
+                self.overloads = 0
+                if self.hub is not None:                    # the hub loop reads the port as data arrives
+                    if not self.hub.register(self.__serial_port, self.__connection, self.__on_readable):
+                        raise RuntimeError(f'Scale hub {self.hub.name} failed to register {self.__serial_port}')
+                elif self.reactor is not None:                # reads without blocking the reactor
+                    self.__wd = self.reactor.add_job(f'scale-{self.__serial_port}', self.__reactor_step, self.__poll_interval_next)
+                elif self.streaming:
+                    self.__wd = threading.Thread(target=self.__stream_thread, daemon=True)   
+                    self.__wd.start()      
+                else:
+                    # Start watchdog thread
+                    self.__wd = threading.Thread(target=self.__watch_dog_thread, daemon=True)   
+                    self.__wd.start()      
             else:
                 self.disconnect()
             
@@ -92,6 +149,8 @@ class WLCscale:
 
 
     def read_weight(self)->float:   
+        if self.streaming or self.hub is not None:      # the port is owned by the streaming reader / hub
+            return self.__current_weight
         try:
             line = ' '*50
             if self.__connection and self.__connection.is_open:
@@ -101,16 +160,21 @@ class WLCscale:
                 #                                                             # (in case of string was partially read)
                 # line = self.__connection.readline().decode('utf-8').strip()
                 self.__connection.reset_input_buffer()
-                line = self.__connection.readline().decode(errors="ignore").strip()   # Read line from scale, ignore decode errors to avoid issues with non-UTF-8 characters
-                if not line:                                                           # If no data is read, return the last known weight
-                    print_warn('No data read from scale, returning last known weight')
+                _raw = self.__connection.readline()
+                if self.capture is not None and _raw:
+                    self.capture.write(time.monotonic(), _raw)
+                _frame = wlcDecoder.decode(_raw)
+                if _frame is None:                                                     # If no data is read, return the last known weight
+                    print_warn(f'No valid frame read from scale ({_raw}), returning last known weight')
                     return self.__current_weight                  
-                
-                weight:float = self.parse_weight(line=line)
-                sign:int = -1 if line[5] == '-' else 1
-                # weight:float = sign * float(line[6:15])
-                weight = sign * weight
-                self.__current_weight = weight
+                if not self.__frame_valid(_frame):
+                    return self.__current_weight
+
+                _sample = self.__condition([WLCscale.weightSample(time=time.monotonic(), weight=_frame.weight,
+                                                                  stable=_frame.stable)])[0]
+                self.__current_weight = _sample.weight
+                self.samples.append(_sample)
+                self.last_frame_time = _sample.time
                 # print_DEBUG(f'READ_WEIGHT={weight}')
             else:
                 print_err('Scale is not connected')
@@ -122,9 +186,139 @@ class WLCscale:
             exptTrace(e)
             return 0.0
 
+    def __frame_valid(self, frame:wlcDecoder.frame)->bool:
+        self.unit = frame.unit
+        if frame.overload:
+            self.overloads += 1
+            if debug_enabled(): print_DEBUG(f'Scale on {self.__serial_port} overload: {frame}')
+            return False
+        return True
+
+    def read_weight_nowait(self)->float:          # reactor mode: consumes the received bytes only, never waits for a line
+        try:
+            if self.__connection and self.__connection.is_open:
+                _waiting = self.__connection.in_waiting
+                if _waiting:
+                    self.__received(self.__connection.read(_waiting), time.monotonic())
+            else:
+                print_err('Scale is not connected')
+
+            return self.__current_weight
+
+        except Exception as e:
+            print_err(f'Error reading weight: {e}')
+            exptTrace(e)
+            return 0.0
+
+    def __received(self, data:bytes, t:float)->int:  # bytes read from the port
+        if self.capture is not None:
+            self.capture.write(t, data)
+        return self._feed_bytes(data, t)
+
+    def start_capture(self, path:str)->bool:       # records the raw received bytes, replay with scale_capture.scaleReplay
+        try:
+            _capture = scaleCapture(path)
+        except OSError as e:
+            print_err(f'Scale capture to {path} failed: {e}')
+            return False
+        _prev, self.capture = self.capture, _capture
+        if _prev is not None:
+            _prev.close()
+        return True
+
+    def stop_capture(self)->scaleCapture | None:
+        _capture, self.capture = self.capture, None
+        if _capture is not None:
+            _capture.close()
+        return _capture
+
+    def _feed_bytes(self, data:bytes, t:float)->int:
+                                    # splits the received bytes into frames, returns the number of new samples
+                                    # t - arrival time of the last byte, earlier frames are dated back by their byte time
+        self.__rx += data
+        _end = self.__rx.rfind(b'\n')
+        if _end < 0:
+            if len(self.__rx) > WLCscale.RX_MAX:
+                print_warn(f'No frame end in {len(self.__rx)} bytes from scale on {self.__serial_port}, dropped')
+                self.__rx.clear()
+            return 0
+
+        _size:int = len(self.__rx)
+        _frames = wlcDecoder.decode_all(self.__rx, _end + 1)     # in place, partial / garbage lines are skipped
+        del self.__rx[:_end + 1]
+
+        _samples:list[WLCscale.weightSample] = [WLCscale.weightSample(time=t - (_size - _frame_end) * WLCscale.BYTE_TIME,
+                                                                      weight=_frame.weight, stable=_frame.stable)
+                                                for _frame_end, _frame in _frames if self.__frame_valid(_frame)]
+
+        _samples = self.__condition(_samples)
+        for _sample in _samples:
+            self.__update_weight(_sample.weight, self.__current_weight)
+            self.samples.append(_sample)
+        self.samples_total += len(_samples)
+        if _samples:
+            self.last_frame_time = _samples[-1].time
+            self._publish(_samples)
+        return len(_samples)
+
+    def subscribe(self, callback:Callable[[list[WLCscale.weightSample]], None]):
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback:Callable[[list[WLCscale.weightSample]], None]):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def data_age(self)->float | None:               # sec since the last valid frame, None - no frame yet
+        return time.monotonic() - self.last_frame_time if self.last_frame_time is not None else None
+
+    def _publish(self, samples:list[WLCscale.weightSample]):
+        for _subscriber in list(self.subscribers):
+            try:
+                _subscriber(samples)
+            except Exception as e:
+                print_err(f'Scale on {self.__serial_port} subscriber {_subscriber} failed: {e}')
+                exptTrace(e)
+
+    def __on_readable(self):                        # hub loop thread: the port has data
+        try:
+            _connection = self.__connection
+            if _connection is None or not _connection.is_open:
+                return
+            _data = _connection.read(_connection.in_waiting or 1)
+            if _data:
+                self.__received(_data, time.monotonic())
+        except Exception as e:
+            print_err(f'Error reading scale on {self.__serial_port}: {e}')
+            exptTrace(e)
+            self.disconnect()
+
+    def __condition(self, samples:list[WLCscale.weightSample])->list[WLCscale.weightSample]:
+                                                    # filters the batch weights, oldest sample first
+        if not self.filters or not samples:
+            return samples
+        _weights = self.filters.process(np.fromiter((_s.time for _s in samples), dtype=np.float64, count=len(samples)),
+                                        np.fromiter((_s.weight for _s in samples), dtype=np.float64, count=len(samples)))
+        return [_s._replace(weight=float(_w)) for _s, _w in zip(samples, _weights)]
+
+    def set_filters(self, filters:filterChain | None):
+        print_log(f'Scale on {self.__serial_port} filters: {self.filters} -> {filters}')
+        self.filters = filters
+
+    def drain_samples(self)->list[WLCscale.weightSample]:     # samples received since the last call, oldest first
+        _samples:list[WLCscale.weightSample] = list()
+        while True:
+            try:
+                _samples.append(self.samples.popleft())
+            except IndexError:
+                return _samples
+
     def disconnect(self)->bool:
         try:
             self.__wd_stop.set()
+            if self.hub is not None:
+                self.hub.unregister(self.__serial_port)     # the descriptor must not be watched after close
+            self.__stop_reader()
             if self.__connection and self.__connection.is_open:
                 print_log('Disconnecting from scale...')
                 self.__connection.close()
@@ -135,13 +329,33 @@ class WLCscale:
             exptTrace(e)
             return False
         
+    def __stop_reader(self):                    # the reader must not use the port being closed
+        _wd, self.__wd = self.__wd, None
+        if _wd is None:
+            return
+        if isinstance(_wd, reactorJob):
+            self.reactor.remove_job(_wd.name)
+            return
+        if _wd is threading.current_thread() or not _wd.is_alive():
+            return
+        if self.__connection is not None and hasattr(self.__connection, 'cancel_read'):
+            try:
+                self.__connection.cancel_read()     # wakes the blocking read / readline
+            except Exception as e:
+                print_warn(f'Cancelling read on {self.__serial_port} failed: {e}')
+        _wd.join(WLCscale.READER_STOP_TIMEOUT)
+        if _wd.is_alive():
+            print_warn(f'Reader of scale on {self.__serial_port} did not stop in {WLCscale.READER_STOP_TIMEOUT} sec')
+
     def __watch_dog_thread(self):
         print_log('Watchdog thread started for scale monitoring...')
+        self.__wd_last_change = time.monotonic()
         try:
             while not self.__wd_stop.is_set():
-                self.__current_weight = self.read_weight()  
+                _prev_weight = self.__current_weight
+                self.__update_weight(self.read_weight(), _prev_weight)  
                                                 # Monitor operation status
-                if self.__wd_stop.wait(float(self.__poll_interval)):
+                if self.__wd_stop.wait(self.__poll_interval_next()):
                     break
                 # time.sleep(self.__poll_interval)
         except Exception as e:
@@ -150,9 +364,42 @@ class WLCscale:
 
         print_warn('Watchdog thread stopped for scale monitoring.')
 
+    def __stream_thread(self):
+        print_log(f'Streaming reader started for scale on {self.__serial_port}')
+        try:
+            while not self.__wd_stop.is_set():
+                _connection = self.__connection
+                if _connection is None or not _connection.is_open:
+                    break
+                _data = _connection.read(max(1, _connection.in_waiting))     # waits for the first byte up to the port timeout
+                if _data:
+                    self.__received(_data, time.monotonic())
+        except Exception as e:
+            if not self.__wd_stop.is_set():             # port closed by disconnect() otherwise
+                print_err(f'Error in streaming reader: {e}')
+                exptTrace(e)
+
+        print_warn(f'Streaming reader stopped for scale on {self.__serial_port}, {self.samples_total} frames received')
+
+    def __reactor_step(self):
+        if self.__wd_stop.is_set() or not self.is_connected():
+            print_warn('Reactor job stopped for scale monitoring.')
+            return stationReactor.DONE
+        return self.read_weight_nowait()
+
+    def __update_weight(self, weight:float, prev_weight:float)->float:
+        if self.poll_policy.changed(weight, prev_weight):
+            self.__wd_last_change = time.monotonic()
+        self.__current_weight = weight
+        return weight
+
+    def __poll_interval_next(self)->float:
+        return self.poll_policy.interval(active = self.poll_policy.is_active(self.__wd_last_change, time.monotonic()))
+
 
     def __del__(self):
         self.disconnect()   
+        self.stop_capture()
 
 
 
@@ -169,7 +416,13 @@ class WLCscaleStub:
     def listScales()->list[str]:       # List available serial scales COM ports
         return  ["COM3", "COM4"]
     
-    def __init__(self, serial_port: str, poll_interval: float = 0.1):
+    def __init__(self, serial_port: str, poll_interval: float = 0.1, poll_policy:pollPolicy = None,
+                 reactor:stationReactor = None, streaming:bool = False, filters:filterChain = None,
+                 hub:asyncScaleHub = None):
+        self.filters:filterChain | None = filters            # not applied to the simulated weight
+        self.subscribers:list[Callable[[list[WLCscale.weightSample]], None]] = list()
+        self.last_frame_time:float | None = None
+        self.samples:deque[WLCscale.weightSample] = deque(maxlen=WLCscale.SAMPLES_MAX)
         self.__wd_stop:threading.Event = threading.Event() # Event to stop watchdog thread
         self.__test_weight = 0
         self.__poll_interval = poll_interval
@@ -184,6 +437,11 @@ class WLCscaleStub:
         if self.__current_time == 0 or time.time() - self.__current_time > self.__poll_interval:  # Update weight every X seconds or if it's the first read
             delta_weight = random.randint(1, 3) * 10  # Simulate weight change in grams 
             self.__test_weight = self.__test_weight + delta_weight  # Simulate weight increase, adjust logic as needed (e.g., random walk, specific patterns, etc.)
+            _sample = WLCscale.weightSample(time=time.monotonic(), weight=self.__test_weight, stable=True)
+            self.samples.append(_sample)
+            self.last_frame_time = _sample.time
+            for _subscriber in list(self.subscribers):
+                _subscriber([_sample])
             # print_DEBUG(f'[Stub] Updated weight to {self.__test_weight} g')
             self.__current_time = time.time()
         return self.__test_weight
@@ -192,6 +450,32 @@ class WLCscaleStub:
         print_log(f'Updating serial port to {self.__serial_port}-> {serial_port}')
         self.__serial_port = serial_port
 
+    def set_filters(self, filters:filterChain | None):
+        self.filters = filters
+
+    def start_capture(self, path:str)->bool:
+        print_warn(f'[Stub] No raw bytes to capture from simulated scale on {self.__serial_port}')
+        return False
+
+    def stop_capture(self)->scaleCapture | None:
+        return None
+
+    def data_age(self)->float | None:
+        return time.monotonic() - self.last_frame_time if self.last_frame_time is not None else None
+
+    def subscribe(self, callback:Callable[[list[WLCscale.weightSample]], None]):
+        if callback not in self.subscribers:
+            self.subscribers.append(callback)
+
+    def unsubscribe(self, callback:Callable[[list[WLCscale.weightSample]], None]):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def drain_samples(self)->list[WLCscale.weightSample]:
+        _samples = list(self.samples)
+        self.samples.clear()
+        return _samples
+
     def updatePollInterval(self, poll_interval: float):
         print_log(f'Updating poll interval to {self.__poll_interval}-> {poll_interval}')
         self.__poll_interval = poll_interval
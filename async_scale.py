@@ -0,0 +1,132 @@
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Callable
+
+from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace
+
+
+#
+#   Asyncio serial hub: one event loop thread services the serial ports of many scales.
+#   Port descriptors are watched by the loop (add_reader), the registered callback consumes the
+#   received bytes as they arrive. Where the loop can't watch serial descriptors (Windows proactor loop)
+#   the port is polled by a loop task instead, still in the same thread.
+#   Usage: WLCscale(port, hub=hub) / serialScale(port, hub=hub) - the scale registers itself on connect().
+#
+
+class asyncScaleHub:
+    POLL_PERIOD = 0.01                      # sec, polling period where descriptors can't be watched
+    CALL_TIMEOUT = 2.0                      # sec, register / unregister completion timeout
+
+    def __init__(self, name:str = 'scales'):
+        self.name = name
+        self.loop:asyncio.AbstractEventLoop | None = None
+        self.__thread:threading.Thread | None = None
+        self.__ready = threading.Event()
+        self.__lock = threading.Lock()
+        self.__ports:dict[str, tuple[int | None, asyncio.Task | None]] = dict()    # port -> (watched fd, polling task)
+
+    def __repr__(self):
+        return f'asyncScaleHub({self.name}, ports={list(self.__ports)})'
+
+    def start(self) -> bool:
+        with self.__lock:
+            if self.__thread is not None and self.__thread.is_alive():
+                return True
+            self.__ready.clear()
+            self.__thread = threading.Thread(target=self.__run, name=f'hub-{self.name}', daemon=True)
+            self.__thread.start()
+        if not self.__ready.wait(asyncScaleHub.CALL_TIMEOUT):
+            print_err(f'Scale hub {self.name} event loop did not start')
+            return False
+        return True
+
+    def stop(self, timeout:float = 2.0):
+        if self.loop is None or self.__thread is None:
+            return
+        for _port in list(self.__ports):
+            self.unregister(_port)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+        print_log(f'Scale hub {self.name} stopped')
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def in_loop(self) -> bool:
+        return self.__thread is threading.current_thread()
+
+    def register(self, port:str, connection, on_readable:Callable[[], None]) -> bool:
+                                            # on_readable is called in the loop thread when the port has data
+        if not self.start():
+            return False
+        return self.__call(self.__add, port, connection, on_readable)
+
+    def unregister(self, port:str) -> bool:
+        if not self.is_running():
+            self.__ports.pop(port, None)
+            return False
+        return self.__call(self.__remove, port)
+
+    def call_soon(self, callback:Callable, *args):  # runs the callback in the loop thread
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def __run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        print_log(f'Scale hub {self.name} event loop started')
+        self.__ready.set()
+        try:
+            self.loop.run_forever()
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Scale hub {self.name} event loop failed. Exception: {ex} of type: {type(ex)}')
+        finally:
+            self.loop.close()
+            print_log(f'Scale hub {self.name} event loop closed')
+
+    def __call(self, func:Callable, *args) -> bool:  # runs func in the loop thread and waits for the result
+        if self.in_loop():
+            return func(*args)
+        async def _call():
+            return func(*args)
+        try:
+            return asyncio.run_coroutine_threadsafe(_call(), self.loop).result(asyncScaleHub.CALL_TIMEOUT)
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Scale hub {self.name}: {func.__name__}{args[:1]} failed. Exception: {ex} of type: {type(ex)}')
+            return False
+
+    def __add(self, port:str, connection, on_readable:Callable[[], None]) -> bool:
+        self.__remove(port)
+        try:
+            _fd = connection.fileno()
+            self.loop.add_reader(_fd, on_readable)
+            self.__ports[port] = (_fd, None)
+            print_log(f'Scale hub {self.name}: watching {port} (fd = {_fd})')
+        except (NotImplementedError, AttributeError, ValueError, OSError):
+            _task = self.loop.create_task(self.__poll(port, connection, on_readable))
+            self.__ports[port] = (None, _task)
+            print_log(f'Scale hub {self.name}: polling {port} every {asyncScaleHub.POLL_PERIOD} sec')
+        return True
+
+    def __remove(self, port:str) -> bool:
+        _fd, _task = self.__ports.pop(port, (None, None))
+        if _fd is not None:
+            self.loop.remove_reader(_fd)
+        if _task is not None:
+            _task.cancel()
+        return _fd is not None or _task is not None
+
+    async def __poll(self, port:str, connection, on_readable:Callable[[], None]):
+        while True:
+            try:
+                if connection.in_waiting:
+                    on_readable()
+            except Exception as ex:
+                print_err(f'Scale hub {self.name}: polling {port} failed. Exception: {ex}')
+                self.__ports.pop(port, None)
+                return
+            await asyncio.sleep(asyncScaleHub.POLL_PERIOD)
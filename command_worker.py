@@ -0,0 +1,129 @@
+from __future__ import annotations
+import threading
+import itertools
+from collections import namedtuple, deque
+from typing import Callable, Any
+
+from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace, debug_enabled
+
+
+#
+#   Per device command worker.
+#   Device commands (driver call chains) run one by one in the worker thread, the caller (Qt GUI thread)
+#   gets a command id immediately and the completion through on_done(id, success, message).
+#   The queue is bounded. A command submitted with a supersede key replaces the queued (not yet started)
+#   commands with the same key, e.g. a newer motion command drops the older queued moves. A kept command
+#   (e.g. stop) drops the queued commands with its key but is never superseded itself.
+#
+
+class commandWorker:
+    command = namedtuple("command", ["id", "name", "func", "args", "supersede", "on_done"])
+    QUEUE_MAX = 8                                       # queued commands limit
+    REJECTED = -1                                       # submit() result when the queue is full
+    SUPERSEDED = 'Superseded'
+
+    def __init__(self, name:str, maxsize:int = QUEUE_MAX):
+        self.name = name
+        self.maxsize:int = maxsize
+        self.__queue:deque[commandWorker.command] = deque()
+        self.__cond = threading.Condition()
+        self.__ids = itertools.count(1)
+        self.__stop = False
+        self.__thread:threading.Thread | None = None
+        self.current:commandWorker.command | None = None    # command running now
+        self.executed:int = 0
+        self.failed:int = 0
+        self.superseded:int = 0
+        self.rejected:int = 0
+
+    def __repr__(self):
+        return f'commandWorker({self.name}, queued={len(self.__queue)}, current={self.current.name if self.current else None})'
+
+    def start(self) -> bool:
+        with self.__cond:
+            if self.__thread is not None and self.__thread.is_alive():
+                return True
+            self.__stop = False
+            self.__thread = threading.Thread(target=self.__run, name=f'commands-{self.name}', daemon=True)
+            self.__thread.start()
+        return True
+
+    def stop(self, timeout:float = 2.0):                # queued commands are dropped, the running one completes
+        with self.__cond:
+            self.__stop = True
+            _dropped = list(self.__queue)
+            self.__queue.clear()
+            self.__cond.notify_all()
+        for _cmd in _dropped:
+            self.__done(_cmd, False, 'Cancelled')
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def pending(self) -> int:
+        with self.__cond:
+            return len(self.__queue)
+
+    def submit(self, name:str, func:Callable[..., Any], *args, supersede:str = None, keep:bool = False,
+               on_done:Callable[[int, bool, str], None] = None) -> int:
+                                                        # func result: False / None - failure, anything else - success
+        _superseded:list[commandWorker.command] = list()
+        with self.__cond:
+            if self.__stop:
+                return commandWorker.REJECTED
+            if supersede is not None:
+                _superseded = [_cmd for _cmd in self.__queue if _cmd.supersede == supersede]
+                for _cmd in _superseded:
+                    self.__queue.remove(_cmd)
+            if len(self.__queue) >= self.maxsize:
+                self.rejected += 1
+                print_warn(f'Command worker {self.name}: queue is full ({self.maxsize}), {name} rejected')
+                _cmd = None
+            else:
+                _cmd = commandWorker.command(id=next(self.__ids), name=name, func=func, args=args,
+                                             supersede=None if keep else supersede, on_done=on_done)
+                self.__queue.append(_cmd)
+                self.__cond.notify()
+        for _old in _superseded:
+            self.superseded += 1
+            print_log(f'Command worker {self.name}: {_old.name} (id = {_old.id}) superseded by {name}')
+            self.__done(_old, False, commandWorker.SUPERSEDED)
+        if self.__thread is None or not self.__thread.is_alive():
+            self.start()
+        return _cmd.id if _cmd is not None else commandWorker.REJECTED
+
+    def __done(self, cmd:commandWorker.command, success:bool, message:str):
+        if cmd.on_done is None:
+            return
+        try:
+            cmd.on_done(cmd.id, success, message)
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Command worker {self.name}: completion of {cmd.name} (id = {cmd.id}) failed. Exception: {ex}')
+
+    def __run(self):
+        print_log(f'Command worker {self.name} started')
+        while True:
+            with self.__cond:
+                while not self.__queue and not self.__stop:
+                    self.__cond.wait()
+                if self.__stop:
+                    break
+                self.current = self.__queue.popleft()
+            _cmd = self.current
+            if debug_enabled(): print_DEBUG(f'Command worker {self.name}: executing {_cmd.name} (id = {_cmd.id})')
+            try:
+                _result = _cmd.func(*_cmd.args)
+                _success, _message = _result not in (None, False), 'OK' if _result not in (None, False) else 'Failed'
+            except Exception as ex:
+                exptTrace(ex)
+                print_err(f'Command worker {self.name}: {_cmd.name} (id = {_cmd.id}) failed. Exception: {ex} of type: {type(ex)}')
+                _success, _message = False, str(ex)
+            self.executed += 1
+            if not _success:
+                self.failed += 1
+            self.current = None
+            self.__done(_cmd, _success, _message)
+        print_log(f'Command worker {self.name} stopped')
@@ -3,6 +3,8 @@ import atexit
 from re import T
 import PySimpleGUI as sg
 import logging, datetime, sys, os, re
+import logging.handlers
+import queue, threading, time, copy
 from dataclasses import dataclass
 from queue import Queue 
 from collections import namedtuple
@@ -26,6 +28,57 @@ class InstantFileHandler(logging.FileHandler):
         super().emit(record)
         self.flush()
 
+class BatchFileHandler(logging.FileHandler):        # flushes every flush_records records or flush_interval sec
+    def __init__(self, filename, mode='a', encoding=None, flush_interval:float = 0.5, flush_records:int = 100):
+        super().__init__(filename, mode=mode, encoding=encoding)
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self.__pending:int = 0
+        self.__last_flush:float = time.monotonic()
+
+    def emit(self, record):                         # StreamHandler.emit() flushes every record, write directly
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        self.__pending += 1
+        if self.__pending >= self.flush_records or time.monotonic() - self.__last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        super().flush()
+        self.__pending = 0
+        self.__last_flush = time.monotonic()
+
+    def idle(self):                                 # called by the listener when the queue is empty
+        if self.__pending > 0:
+            self.flush()
+
+class BatchQueueListener(logging.handlers.QueueListener):     # wakes up periodically to flush idle handlers
+    def __init__(self, queue, *handlers, respect_handler_level=False, idle_interval:float = 0.5):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.idle_interval = idle_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.idle_interval)
+            except queue.Empty:
+                for _handler in self.handlers:
+                    if hasattr(_handler, 'idle'):
+                        _handler.idle()
+
+class RecordQueueHandler(logging.handlers.QueueHandler):  # in-process queue, the record goes to the listener as is
+    def prepare(self, record):                      # QueueHandler.prepare() formats here and drops exc_info,
+                                                    # the listener handlers (Rich tracebacks) format the record
+        record = copy.copy(record)
+        record.msg = record.getMessage()            # arguments may change after the call
+        record.args = None
+        return record
+
 logging.basicConfig(format=log_format, handlers=[
             RichHandler(
                 rich_tracebacks=True,         # nice rich tracebacks in the log
@@ -43,10 +96,48 @@ logging.basicConfig(format=log_format, handlers=[
 
 void_f = lambda a : None
 
+_log_listener:BatchQueueListener | None = None         # see enableAsyncLogging()
+
+ASYNC_LOG_LEVEL = logging.INFO                      # default root level in the asynchronous mode, level=None keeps the current one
+
+def enableAsyncLogging(level:int = ASYNC_LOG_LEVEL, flush_interval:float = 0.5, flush_records:int = 100) -> bool:
+                                    # Producer threads only enqueue records, the listener thread renders the console
+                                    # and writes the log file in batches
+    global _log_listener
+    if _log_listener is not None:
+        return True
+    _root = logging.getLogger()
+    if level is not None:
+        _root.setLevel(level)
+    _handlers = list()
+    for _handler in list(_root.handlers):
+        _root.removeHandler(_handler)
+        if isinstance(_handler, InstantFileHandler):
+            _batch = BatchFileHandler(_handler.baseFilename, mode='a', encoding=_handler.encoding, 
+                                      flush_interval=flush_interval, flush_records=flush_records)
+            _batch.setFormatter(_handler.formatter)
+            _batch.setLevel(_handler.level)
+            _handler.close()
+            _handler = _batch
+        _handlers.append(_handler)
+
+    _log_q = queue.SimpleQueue()
+    _root.addHandler(RecordQueueHandler(_log_q))
+    _log_listener = BatchQueueListener(_log_q, *_handlers, respect_handler_level=True, idle_interval=flush_interval)
+    _log_listener.start()
+    print_log(f'Asynchronous logging enabled, flush interval = {flush_interval} sec, flush records = {flush_records}')
+    return True
+
+def debug_enabled() -> bool:        # guard for debug f-strings in hot loops
+    return logging.root.isEnabledFor(logging.DEBUG)
 
 
 def logCleanup():                   # log cleanup at exit
+    global _log_listener
     print_log(f"Log cleanup")
+    if _log_listener is not None:
+        _log_listener.stop()        # drains the queue
+        _log_listener = None
     logging.shutdown()              # shutdown logging system
 
 atexit.register(logCleanup)     # register log cleanup at exit
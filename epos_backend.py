@@ -0,0 +1,794 @@
+import os, sys
+import time
+import threading
+from ctypes import CDLL, cdll, byref, c_void_p, c_char_p, c_int32, c_uint32, c_uint16, c_uint8
+from collections import namedtuple, deque
+import ctypes
+
+from common_utils import print_log, print_warn, print_err, print_DEBUG, exptTrace
+
+
+'''
+EPOS Command Library backends.
+
+    windows  -  .\DLL\EposCmd64.dll (maxon EPOS Command Library for Windows)
+    linux    -  libEposCmd.so (maxon EPOS Command Library for Linux)
+    sim      -  pure Python simulated EPOS4 (no hardware), implements the VCS_* functions used by maxon.py
+
+Backend selection: explicit parameter -> EPOS_BACKEND environment variable -> platform default.
+The simulated backend accepts the same ctypes arguments (byref(), c_void_p(), c_uint16(), plain ints/bytes)
+as the real library, so MAXON_Motor code runs unchanged on top of it.
+'''
+
+EPOS_BACKEND_WINDOWS = 'windows'
+EPOS_BACKEND_LINUX = 'linux'
+EPOS_BACKEND_SIM = 'sim'
+
+EPOS_WINDOWS_PATH = '.\\DLL\\EposCmd64.dll'
+EPOS_LINUX_PATH = 'libEposCmd.so'
+
+
+def defaultBackend() -> str:
+    _backend = os.environ.get('EPOS_BACKEND')
+    if _backend:
+        return _backend.lower()
+    return EPOS_BACKEND_WINDOWS if sys.platform == 'win32' else EPOS_BACKEND_LINUX
+
+
+_HANDLE = c_void_p                          # 64-bit safe device handle
+_WORD = c_uint16
+_BYTE = c_uint8
+_DWORD = c_uint32
+_BOOL = c_int32
+_LONG = c_int32
+_IN_STR = c_char_p
+_PTR = c_void_p                             # OUT parameters / buffers - accepts byref() of any ctypes object
+
+                                            # function : (restype, argtypes)
+EPOS_PROTOTYPES:dict[str, tuple] = {
+    'VCS_OpenDevice':                       (_HANDLE, [_IN_STR, _IN_STR, _IN_STR, _IN_STR, _PTR]),
+    'VCS_CloseDevice':                      (_BOOL, [_HANDLE, _PTR]),
+    'VCS_SetProtocolStackSettings':         (_BOOL, [_HANDLE, _DWORD, _DWORD, _PTR]),
+    'VCS_GetDeviceNameSelection':           (_BOOL, [_BOOL, _PTR, _WORD, _PTR, _PTR]),
+    'VCS_GetProtocolStackNameSelection':    (_BOOL, [_IN_STR, _BOOL, _PTR, _WORD, _PTR, _PTR]),
+    'VCS_GetInterfaceNameSelection':        (_BOOL, [_IN_STR, _IN_STR, _BOOL, _PTR, _WORD, _PTR, _PTR]),
+    'VCS_GetPortNameSelection':             (_BOOL, [_IN_STR, _IN_STR, _IN_STR, _BOOL, _PTR, _WORD, _PTR, _PTR]),
+    'VCS_GetBaudrateSelection':             (_BOOL, [_IN_STR, _IN_STR, _IN_STR, _IN_STR, _BOOL, _PTR, _PTR, _PTR]),
+    'VCS_FindDeviceCommunicationSettings':  (_BOOL, [_PTR, _PTR, _PTR, _PTR, _PTR, _WORD, _PTR, _PTR, _PTR, c_int32, _PTR]),
+    'VCS_GetSensorType':                    (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_GetObject':                        (_BOOL, [_HANDLE, _WORD, _WORD, _BYTE, _PTR, _DWORD, _PTR, _PTR]),
+    'VCS_SetObject':                        (_BOOL, [_HANDLE, _WORD, _WORD, _BYTE, _PTR, _DWORD, _PTR, _PTR]),
+    'VCS_ClearFault':                       (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_GetState':                         (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_SetEnableState':                   (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_SetDisableState':                  (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_SetQuickStopState':                (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_GetQuickStopState':                (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_GetPositionIs':                    (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_GetVelocityIs':                    (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_GetCurrentIs':                     (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_GetMovementState':                 (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_ActivateProfilePositionMode':      (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_SetPositionProfile':               (_BOOL, [_HANDLE, _WORD, _DWORD, _DWORD, _DWORD, _PTR]),
+    'VCS_MoveToPosition':                   (_BOOL, [_HANDLE, _WORD, _LONG, _BOOL, _BOOL, _PTR]),
+    'VCS_HaltPositionMovement':             (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_ActivateProfileVelocityMode':      (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_SetVelocityProfile':               (_BOOL, [_HANDLE, _WORD, _DWORD, _DWORD, _PTR]),
+    'VCS_MoveWithVelocity':                 (_BOOL, [_HANDLE, _WORD, _LONG, _PTR]),
+    'VCS_HaltVelocityMovement':             (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_ActivateCurrentMode':              (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_SetCurrentMustEx':                 (_BOOL, [_HANDLE, _WORD, _LONG, _PTR]),
+    'VCS_ActivateHomingMode':               (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_DefinePosition':                   (_BOOL, [_HANDLE, _WORD, _LONG, _PTR]),
+    'VCS_SetRecorderParameter':             (_BOOL, [_HANDLE, _WORD, _WORD, _WORD, _PTR]),
+    'VCS_EnableTrigger':                    (_BOOL, [_HANDLE, _WORD, _BYTE, _PTR]),
+    'VCS_DisableAllTriggers':               (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_ActivateChannel':                  (_BOOL, [_HANDLE, _WORD, _BYTE, _WORD, _BYTE, _BYTE, _PTR]),
+    'VCS_DeactivateAllChannels':            (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_StartRecorder':                    (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_StopRecorder':                     (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_ForceTrigger':                     (_BOOL, [_HANDLE, _WORD, _PTR]),
+    'VCS_IsRecorderRunning':                (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_IsRecorderTriggered':              (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_ReadChannelVectorSize':            (_BOOL, [_HANDLE, _WORD, _PTR, _PTR]),
+    'VCS_ReadChannelDataVector':            (_BOOL, [_HANDLE, _WORD, _BYTE, _PTR, _DWORD, _PTR]),
+}
+
+                                            # Data Recorder (VCS_EnableTrigger trigger types, may be OR-ed)
+RECORDER_TRIGGER_MOVEMENT_START = 0x01
+RECORDER_TRIGGER_ERROR = 0x02
+RECORDER_TRIGGER_DIGITAL_INPUT = 0x04
+RECORDER_TRIGGER_MOVEMENT_END = 0x08
+RECORDER_BASE_PERIOD = 0.0001               # sec, VCS_SetRecorderParameter SamplingPeriod unit
+RECORDER_MAX_CHANNELS = 4
+
+
+def bindPrototypes(lib:CDLL) -> CDLL:       # declare argtypes/restype once at load time
+    for _name, (_restype, _argtypes) in EPOS_PROTOTYPES.items():
+        try:
+            _func = getattr(lib, _name)
+        except AttributeError:
+            print_warn(f'EPOS library has no {_name}')
+            continue
+        _func.restype = _restype
+        _func.argtypes = _argtypes
+    return lib
+
+
+class eposCallBuffers:                      # preallocated OUT parameters of one device, use under the device comm_lock
+    def __init__(self):
+        self.pErrorCode = c_uint32()
+        self.pData = c_int32()
+        self.pNbOfBytes = c_uint32()
+        self.pPosition = c_int32()
+        self.pVelocity = c_int32()
+        self.pCurrent = c_int32()
+        self.pBool = c_int32()
+        self.pState = c_uint32()
+                                            # byref() objects are created once as well
+        self.rErrorCode = byref(self.pErrorCode)
+        self.rData = byref(self.pData)
+        self.rNbOfBytes = byref(self.pNbOfBytes)
+        self.rPosition = byref(self.pPosition)
+        self.rVelocity = byref(self.pVelocity)
+        self.rCurrent = byref(self.pCurrent)
+        self.rBool = byref(self.pBool)
+        self.rState = byref(self.pState)
+
+
+def loadEposLibrary(backend:str = None, path:str = None, latency:float = None):
+    backend = backend.lower() if backend else defaultBackend()
+    print_log(f'Loading EPOS library backend = {backend}, path = {path}')
+
+    if backend == EPOS_BACKEND_SIM:
+        if latency is None:
+            latency = float(os.environ.get('EPOS_SIM_LATENCY', 0))
+        return eposSimulator(latency=latency)
+    elif backend == EPOS_BACKEND_WINDOWS:
+        _path = path if path else EPOS_WINDOWS_PATH
+        cdll.LoadLibrary(_path)              # have no idea why but Maxon wants it
+        return bindPrototypes(CDLL(_path))
+    elif backend == EPOS_BACKEND_LINUX:
+        _path = path if path else EPOS_LINUX_PATH
+        return bindPrototypes(CDLL(_path))
+    else:
+        raise ValueError(f'Unknown EPOS backend: {backend}')
+
+
+
+#------------------------- simulated EPOS4 ----------------------------
+
+SIM_COUNTS_PER_REV = 4096                   # encoder increments per revolution
+SIM_IDLE_CURRENT = 40                       # mA, enabled motor at standstill
+SIM_CURRENT_PER_RPM = 0.1                   # mA per rpm
+SIM_CURRENT_PER_ACC = 0.05                  # mA per rpm/s
+
+SIM_NO_ERROR = 0x00000000
+SIM_ERR_HANDLE = 0x10000003                 # Handle not valid
+SIM_ERR_PORT = 0x10000008                   # Bad port name
+SIM_ERR_OBJECT = 0x06020000                 # Object does not exist
+SIM_ERR_RECORDER = 0x1000002D               # Data recorder not configured
+SIM_RECORDER_BUFFER = 4096                  # recorder samples, shared by the active channels
+SIM_DIN_QUICK_STOP = 28                     # 0x3142 digital input function: quick stop
+SIM_DIN_COUNT = 8                           # digital inputs
+
+_SIM_MODE_NONE = 0
+_SIM_MODE_PPM = 1                           # profile position
+_SIM_MODE_PVM = 3                           # profile velocity
+_SIM_MODE_HMM = 6                           # homing
+_SIM_MODE_CUR = -3                          # current
+
+simDevice = namedtuple("simDevice", ["port", "sn", "nodeid", "sensortype"])
+
+
+def _val(arg):                              # c_void_p(x) / c_uint16(x) / plain value -> python value
+    return arg.value if hasattr(arg, 'value') else arg
+
+def _ref(arg):                              # byref(obj) -> obj
+    return getattr(arg, '_obj', arg)
+
+def _set(arg, value):                       # write OUT parameter
+    _ref(arg).value = value
+
+def _name(arg) -> bytes:                    # IN string parameter: bytes / c_char_p / byref(string buffer)
+    _obj = _ref(arg)
+    _v = _obj.value if hasattr(_obj, 'value') else _obj
+    return _v if isinstance(_v, bytes) else str(_v).encode()
+
+
+class _simRecorder:                         # EPOS4 Data Recorder: pre-trigger ring buffer, stops when the buffer is full
+    def __init__(self):
+        self.period:int = 1                     # RECORDER_BASE_PERIOD units
+        self.preceding:int = 0
+        self.triggers:int = 0
+        self.channels:dict[int, tuple[int,int,int]] = dict()    # channel -> (index, subindex, size)
+        self.running = False
+        self.triggered = False
+        self.samples:deque = deque()
+        self.t_next:float = 0.0
+        self.remaining:int = 0
+
+    @property
+    def capacity(self) -> int:
+        return SIM_RECORDER_BUFFER // max(len(self.channels), 1)
+
+    def start(self, t:float):
+        self.samples = deque(maxlen=self.capacity)
+        self.running = True
+        self.triggered = False
+        self.t_next = t
+
+    def trigger(self):
+        if not self.running or self.triggered:
+            return
+        self.triggered = True
+        while len(self.samples) > self.preceding:
+            self.samples.popleft()
+        self.remaining = self.capacity - len(self.samples)
+
+    def sample(self, motor:'_simMotor'):
+        self.samples.append({_ch: motor.object_value(_index, _sub) or 0 for _ch, (_index, _sub, _size) in self.channels.items()})
+        self.t_next += self.period * RECORDER_BASE_PERIOD
+        if self.triggered:
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self.running = False
+
+
+class _simMotor:                            # kinematic model of one EPOS4 + motor
+    def __init__(self, sn:int):
+        self.sn = sn
+        self.enabled = False
+        self.fault = False
+        self.quick_stop = False
+        self.mode = _SIM_MODE_NONE
+        self.pos = 0.0                      # increments
+        self.vel = 0.0                      # rpm
+        self.acc = 0.0                      # rpm/s, last applied acceleration
+        self.target_vel = 0.0
+        self.target_pos = 0
+        self.profile_vel = 1000.0
+        self.profile_acc = 3000.0
+        self.profile_dec = 3000.0
+        self.current_must = 0
+        self.objects:dict[tuple[int,int], int] = dict()
+        self.inputs:int = 0                 # digital inputs physical levels, bit n-1 - input n
+        self.recorder = _simRecorder()
+        self.t = time.monotonic()
+
+    @property
+    def inputs_logic(self) -> int:          # 0x3141:01, levels after the 0x3141:02 polarity (bit set - active low)
+        return (self.inputs ^ self.objects.get((0x3141, 0x02), 0)) & ((1 << SIM_DIN_COUNT) - 1)
+
+    def update(self):
+        _now = time.monotonic()
+        _logic = self.inputs_logic
+        if _logic and any(_logic & (1 << (_n - 1)) and self.objects.get((0x3142, _n)) == SIM_DIN_QUICK_STOP
+                          for _n in range(1, SIM_DIN_COUNT + 1)):
+            self.quick_stop = True          # the firmware reacts to the quick stop input
+        _rec = self.recorder
+        if _rec.running:                    # integrate sample by sample while recording
+            _pre = (_rec.preceding + 1) * _rec.period * RECORDER_BASE_PERIOD
+            if not _rec.triggered and _now - _rec.t_next > _pre:
+                _rec.t_next = _now - _pre   # older pre-trigger samples would be dropped anyway
+            while _rec.running and _rec.t_next <= _now:
+                self.__integrate(_rec.t_next)
+                _rec.sample(self)
+        self.__integrate(_now)
+
+    def trigger(self, event:int):
+        if self.recorder.triggers & event:
+            self.recorder.trigger()
+
+    def object_value(self, index:int, sub:int) -> int | None:
+        if (index, sub) == (0x1018, 0x04):
+            return self.sn
+        elif index == 0x6041:
+            return self.statusword
+        elif index in (0x6077, 0x30D2):
+            return int(self.current * 15 / 100) & 0xffff        # per mille of rated torque
+        elif (index, sub) == (0x30D1, 0x02):
+            return self.current
+        elif (index, sub) == (0x3141, 0x01):
+            return self.inputs_logic
+        elif (index, sub) == (0x3141, 0x02):
+            return self.objects.get((index, sub), 0)    # all inputs active high by default
+        elif index == 0x6064:
+            return int(round(self.pos))
+        elif index == 0x606C:
+            return int(self.vel)
+        return self.objects.get((index, sub))
+
+    def __integrate(self, _now:float):
+        _dt = _now - self.t
+        self.t = _now
+        if _dt <= 0:
+            return
+        _vel0 = self.vel
+        if not self.enabled or self.fault:
+            self.vel = 0.0
+        elif self.quick_stop:
+            self.vel = self.__ramp(self.vel, 0.0, self.profile_dec, _dt)
+        elif self.mode == _SIM_MODE_PVM:
+            self.vel = self.__ramp(self.vel, self.target_vel, self.profile_acc if abs(self.target_vel) > abs(self.vel) else self.profile_dec, _dt)
+        elif self.mode == _SIM_MODE_PPM:
+            _remaining = (self.target_pos - self.pos) / SIM_COUNTS_PER_REV * 60          # rpm*s
+            _brake_vel = (2 * self.profile_dec * abs(_remaining)) ** 0.5
+            _target = min(self.profile_vel, _brake_vel) * (1 if _remaining > 0 else -1)
+            self.vel = self.__ramp(self.vel, _target, self.profile_acc, _dt)
+        elif self.mode == _SIM_MODE_CUR:
+            self.vel = self.__ramp(self.vel, self.current_must * 2.0, self.profile_acc, _dt)
+        else:
+            self.vel = 0.0
+
+        _new_pos = self.pos + (self.vel + _vel0) / 2 / 60 * SIM_COUNTS_PER_REV * _dt
+        if self.mode == _SIM_MODE_PPM and self.enabled and (self.pos - self.target_pos) * (_new_pos - self.target_pos) <= 0:
+            _new_pos = float(self.target_pos)       # target crossed - snap
+            self.vel = 0.0
+        self.pos = _new_pos
+        self.acc = (self.vel - _vel0) / _dt
+
+    @staticmethod
+    def __ramp(vel:float, target:float, acc:float, dt:float) -> float:
+        _step = max(acc, 1.0) * dt
+        if abs(target - vel) <= _step:
+            return target
+        return vel + _step if target > vel else vel - _step
+
+    @property
+    def current(self) -> int:
+        if not self.enabled:
+            return 0
+        return int(SIM_IDLE_CURRENT + abs(self.vel) * SIM_CURRENT_PER_RPM + abs(self.acc) * SIM_CURRENT_PER_ACC)
+
+    @property
+    def target_reached(self) -> bool:
+        if self.mode == _SIM_MODE_PPM:
+            return int(round(self.pos)) == self.target_pos and self.vel == 0
+        if self.mode == _SIM_MODE_PVM:
+            return self.vel == self.target_vel
+        return self.vel == 0
+
+    @property
+    def statusword(self) -> int:
+        if self.fault:
+            return 0x0008
+        if not self.enabled:
+            return 0x0040                                       # switch on disabled
+        _status = 0x0017 if self.quick_stop else 0x0037         # quick stop active / operation enabled
+        if self.target_reached:
+            _status |= 0x0400
+        return _status
+
+
+class eposSimulator:
+    def __init__(self, latency:float = 0.0, devices:list[simDevice] = None, device_name:bytes = b'EPOS4',
+                 protocol:bytes = b'MAXON SERIAL V2', interface:bytes = b'USB', baudrate:int = 1000000):
+        self.latency = latency                                  # per VCS_* call delay, sec
+        self.devices:list[simDevice] = devices if devices is not None else [simDevice(port=b'USB0', sn=0x1234, nodeid=1, sensortype=1)]
+        self.device_name = device_name
+        self.protocol = protocol
+        self.interface = interface
+        self.baudrate = baudrate
+        self.__lock = threading.RLock()
+        self.__motors:dict[bytes, _simMotor] = {_d.port: _simMotor(_d.sn) for _d in self.devices}
+        self.__handles:dict[int, bytes] = dict()                # keyHandle -> port
+        self.__next_handle = 0x1000
+        self.__selection:dict[str, int] = dict()                # enumeration cursors
+        self.calls:int = 0                                      # number of VCS_* calls (for benchmarking)
+
+        for _name in dir(self):
+            if _name.startswith('VCS_'):
+                setattr(self, _name, self.__wrap(getattr(self, _name)))
+
+        print_log(f'EPOS simulator: devices = {self.devices}, latency = {self.latency} sec')
+
+    def __wrap(self, func):
+        def _call(*args):
+            self.calls += 1
+            if self.latency > 0:
+                time.sleep(self.latency)
+            with self.__lock:
+                return func(*args)
+        _call.__name__ = func.__name__
+        return _call
+
+    def set_digital_inputs(self, port:bytes, inputs:int):     # simulated wiring: physical input levels of a device
+        with self.__lock:
+            self.__motors[port].inputs = inputs
+
+    def __motor(self, keyHandle, pErrorCode) -> _simMotor | None:
+        _port = self.__handles.get(_val(keyHandle))
+        if _port is None:
+            _set(pErrorCode, SIM_ERR_HANDLE)
+            return None
+        _set(pErrorCode, SIM_NO_ERROR)
+        _motor = self.__motors[_port]
+        _motor.update()
+        return _motor
+
+    def __device(self, port:bytes) -> simDevice | None:
+        for _d in self.devices:
+            if _d.port == port:
+                return _d
+        return None
+
+    def __handle(self, port:bytes) -> int:
+        for _h, _p in self.__handles.items():
+            if _p == port:
+                return _h
+        self.__next_handle += 1
+        self.__handles[self.__next_handle] = port
+        return self.__next_handle
+
+    def __select(self, key:str, items:list, StartOfSelection, pSel, pEndOfSelection, pErrorCode) -> int:
+        _ind = 0 if _val(StartOfSelection) else self.__selection.get(key, 0) + 1
+        self.__selection[key] = _ind
+        if _ind >= len(items):
+            _set(pEndOfSelection, True)
+            _set(pErrorCode, SIM_ERR_PORT)
+            return 0
+        _set(pSel, items[_ind])
+        _set(pEndOfSelection, _ind >= len(items) - 1)
+        _set(pErrorCode, SIM_NO_ERROR)
+        return 1
+
+#----------- enumeration / communication
+    def VCS_GetDeviceNameSelection(self, StartOfSelection, pDeviceNameSel, MaxStrSize, pEndOfSelection, pErrorCode):
+        return self.__select('device', [self.device_name], StartOfSelection, pDeviceNameSel, pEndOfSelection, pErrorCode)
+
+    def VCS_GetProtocolStackNameSelection(self, DeviceName, StartOfSelection, pProtocolStackNameSel, MaxStrSize, pEndOfSelection, pErrorCode):
+        return self.__select('protocol', [self.protocol], StartOfSelection, pProtocolStackNameSel, pEndOfSelection, pErrorCode)
+
+    def VCS_GetInterfaceNameSelection(self, DeviceName, ProtocolStackName, StartOfSelection, pInterfaceNameSel, MaxStrSize, pEndOfSelection, pErrorCode):
+        return self.__select('interface', [self.interface], StartOfSelection, pInterfaceNameSel, pEndOfSelection, pErrorCode)
+
+    def VCS_GetPortNameSelection(self, DeviceName, ProtocolStackName, InterfaceName, StartOfSelection, pPortSel, MaxStrSize, pEndOfSelection, pErrorCode):
+        return self.__select(f'port', [_d.port for _d in self.devices], StartOfSelection, pPortSel, pEndOfSelection, pErrorCode)
+
+    def VCS_GetBaudrateSelection(self, DeviceName, ProtocolStackName, InterfaceName, PortName, StartOfSelection, pBaudrateSel, pEndOfSelection, pErrorCode):
+        return self.__select(f'baudrate', [self.baudrate], StartOfSelection, pBaudrateSel, pEndOfSelection, pErrorCode)
+
+    def VCS_FindDeviceCommunicationSettings(self, pKeyHandle, pDeviceName, pProtocolStackName, pInterfaceName, PortName, SizeName,
+                                            pBaudrate, pTimeout, pNodeId, DialogMode, pErrorCode):
+        _dev = self.__device(_name(PortName))
+        if _dev is None:
+            _set(pErrorCode, SIM_ERR_PORT)
+            return 0
+        for _arg, _v in ((pDeviceName, self.device_name), (pProtocolStackName, self.protocol), (pInterfaceName, self.interface)):
+            if hasattr(_ref(_arg), 'raw'):                      # OUT string buffer (MXN_cmd), IN name otherwise
+                _set(_arg, _v)
+        _set(pKeyHandle, self.__handle(_dev.port))
+        _set(pBaudrate, self.baudrate)
+        _set(pTimeout, 500)
+        _set(pNodeId, _dev.nodeid)
+        _set(pErrorCode, SIM_NO_ERROR)
+        return 1
+
+    def VCS_OpenDevice(self, DeviceName, ProtocolStackName, InterfaceName, PortName, pErrorCode):
+        _dev = self.__device(_name(PortName))
+        if _dev is None:
+            _set(pErrorCode, SIM_ERR_PORT)
+            return 0
+        _set(pErrorCode, SIM_NO_ERROR)
+        return self.__handle(_dev.port)
+
+    def VCS_CloseDevice(self, KeyHandle, pErrorCode):
+        _set(pErrorCode, SIM_NO_ERROR)
+        return 1
+
+    def VCS_SetProtocolStackSettings(self, KeyHandle, Baudrate, Timeout, pErrorCode):
+        _set(pErrorCode, SIM_NO_ERROR)
+        return 1
+
+    def VCS_GetSensorType(self, KeyHandle, NodeId, pSensorType, pErrorCode):
+        _port = self.__handles.get(_val(KeyHandle))
+        _dev = self.__device(_port) if _port else None
+        if _dev is None:
+            _set(pErrorCode, SIM_ERR_HANDLE)
+            return 0
+        _set(pSensorType, _dev.sensortype)
+        _set(pErrorCode, SIM_NO_ERROR)
+        return 1
+
+#----------- object dictionary
+    def VCS_GetObject(self, KeyHandle, NodeId, ObjectIndex, ObjectSubIndex, pData, NbOfBytesToRead, pNbOfBytesRead, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _index, _sub, _size = _val(ObjectIndex), _val(ObjectSubIndex), _val(NbOfBytesToRead)
+        _data = _motor.object_value(_index, _sub)
+        if _data is None:
+            _set(pErrorCode, SIM_ERR_OBJECT)
+            return 0
+        _set(pData, _data & ((1 << (8 * _size)) - 1) if _size < 4 else _data)
+        _set(pNbOfBytesRead, _size)
+        return 1
+
+    def VCS_SetObject(self, KeyHandle, NodeId, ObjectIndex, ObjectSubIndex, pData, NbOfBytesToWrite, pNbOfBytesWritten, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _index, _sub, _size = _val(ObjectIndex), _val(ObjectSubIndex), _val(NbOfBytesToWrite)
+        _data = _ref(pData).value
+        if _index == 0x6040:                                    # controlword
+            if _data & 0x0100:                                  # halt
+                _motor.target_vel = 0.0
+            _motor.enabled = (_data & 0x0F) == 0x0F
+            _motor.quick_stop = False
+        elif _index == 0x60FF:                                  # target velocity
+            _motor.target_vel = float(_data)
+        _motor.objects[(_index, _sub)] = _data
+        _set(pNbOfBytesWritten, _size)
+        return 1
+
+#----------- state machine
+    def VCS_ClearFault(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.fault = False
+        return 1
+
+    def VCS_GetState(self, KeyHandle, NodeId, pState, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pState, 3 if _motor.fault else (2 if _motor.quick_stop else (1 if _motor.enabled else 0)))
+        return 1
+
+    def VCS_SetEnableState(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.enabled = True
+        _motor.quick_stop = False
+        return 1
+
+    def VCS_SetDisableState(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.enabled = False
+        _motor.quick_stop = False
+        _motor.vel = 0.0
+        return 1
+
+    def VCS_SetQuickStopState(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.quick_stop = True
+        return 1
+
+    def VCS_GetQuickStopState(self, KeyHandle, NodeId, pIsQuickStopped, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pIsQuickStopped, _motor.quick_stop)
+        return 1
+
+#----------- motion info
+    def VCS_GetPositionIs(self, KeyHandle, NodeId, pPositionIs, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pPositionIs, int(round(_motor.pos)))
+        return 1
+
+    def VCS_GetVelocityIs(self, KeyHandle, NodeId, pVelocityIs, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pVelocityIs, int(_motor.vel))
+        return 1
+
+    def VCS_GetCurrentIs(self, KeyHandle, NodeId, pCurrentIs, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pCurrentIs, _motor.current)
+        return 1
+
+    def VCS_GetMovementState(self, KeyHandle, NodeId, pTargetReached, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pTargetReached, _motor.target_reached)
+        return 1
+
+#----------- profile position mode
+    def VCS_ActivateProfilePositionMode(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.mode = _SIM_MODE_PPM
+        _motor.target_pos = int(round(_motor.pos))
+        return 1
+
+    def VCS_SetPositionProfile(self, KeyHandle, NodeId, ProfileVelocity, ProfileAcceleration, ProfileDeceleration, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.profile_vel, _motor.profile_acc, _motor.profile_dec = float(_val(ProfileVelocity)), float(_val(ProfileAcceleration)), float(_val(ProfileDeceleration))
+        return 1
+
+    def VCS_MoveToPosition(self, KeyHandle, NodeId, TargetPosition, Absolute, Immediately, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _target = int(_val(TargetPosition))
+        _motor.target_pos = _target if _val(Absolute) else int(round(_motor.pos)) + _target
+        _motor.trigger(RECORDER_TRIGGER_MOVEMENT_START)
+        return 1
+
+    def VCS_HaltPositionMovement(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.target_pos = int(round(_motor.pos))
+        _motor.vel = 0.0
+        return 1
+
+#----------- profile velocity mode
+    def VCS_ActivateProfileVelocityMode(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.mode = _SIM_MODE_PVM
+        _motor.target_vel = 0.0
+        return 1
+
+    def VCS_SetVelocityProfile(self, KeyHandle, NodeId, ProfileAcceleration, ProfileDeceleration, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.profile_acc, _motor.profile_dec = float(_val(ProfileAcceleration)), float(_val(ProfileDeceleration))
+        return 1
+
+    def VCS_MoveWithVelocity(self, KeyHandle, NodeId, TargetVelocity, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.target_vel = float(_val(TargetVelocity))
+        _motor.trigger(RECORDER_TRIGGER_MOVEMENT_START)
+        return 1
+
+    def VCS_HaltVelocityMovement(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.target_vel = 0.0
+        return 1
+
+#----------- current / homing mode
+    def VCS_ActivateCurrentMode(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.mode = _SIM_MODE_CUR
+        return 1
+
+    def VCS_SetCurrentMustEx(self, KeyHandle, NodeId, CurrentMust, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.current_must = int(_val(CurrentMust))
+        _motor.trigger(RECORDER_TRIGGER_MOVEMENT_START)
+        return 1
+
+    def VCS_ActivateHomingMode(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.mode = _SIM_MODE_HMM
+        return 1
+
+    def VCS_DefinePosition(self, KeyHandle, NodeId, HomePosition, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.pos = float(_val(HomePosition))
+        _motor.target_pos = int(_motor.pos)
+        return 1
+
+#----------- data recorder
+    def VCS_SetRecorderParameter(self, KeyHandle, NodeId, SamplingPeriod, NbOfPrecedingSamples, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.period = max(int(_val(SamplingPeriod)), 1)
+        _motor.recorder.preceding = int(_val(NbOfPrecedingSamples))
+        return 1
+
+    def VCS_EnableTrigger(self, KeyHandle, NodeId, TriggerType, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.triggers |= int(_val(TriggerType))
+        return 1
+
+    def VCS_DisableAllTriggers(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.triggers = 0
+        return 1
+
+    def VCS_ActivateChannel(self, KeyHandle, NodeId, ChannelNumber, ObjectIndex, ObjectSubIndex, ObjectSize, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.channels[int(_val(ChannelNumber))] = (int(_val(ObjectIndex)), int(_val(ObjectSubIndex)), int(_val(ObjectSize)))
+        return 1
+
+    def VCS_DeactivateAllChannels(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.channels = dict()
+        return 1
+
+    def VCS_StartRecorder(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        if not _motor.recorder.channels:
+            _set(pErrorCode, SIM_ERR_RECORDER)
+            return 0
+        _motor.recorder.start(_motor.t)
+        return 1
+
+    def VCS_StopRecorder(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.running = False
+        return 1
+
+    def VCS_ForceTrigger(self, KeyHandle, NodeId, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _motor.recorder.trigger()
+        return 1
+
+    def VCS_IsRecorderRunning(self, KeyHandle, NodeId, pRunning, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pRunning, _motor.recorder.running)
+        return 1
+
+    def VCS_IsRecorderTriggered(self, KeyHandle, NodeId, pTriggered, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _set(pTriggered, _motor.recorder.triggered)
+        return 1
+
+    def VCS_ReadChannelVectorSize(self, KeyHandle, NodeId, pVectorSize, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        if not _motor.recorder.channels:
+            _set(pErrorCode, SIM_ERR_RECORDER)
+            return 0
+        _set(pVectorSize, len(_motor.recorder.samples))
+        return 1
+
+    def VCS_ReadChannelDataVector(self, KeyHandle, NodeId, ChannelNumber, pDataVectorBuffer, VectorBufferSize, pErrorCode):
+        _motor = self.__motor(KeyHandle, pErrorCode)
+        if _motor is None:
+            return 0
+        _channel = int(_val(ChannelNumber))
+        if _channel not in _motor.recorder.channels:
+            _set(pErrorCode, SIM_ERR_RECORDER)
+            return 0
+        _size = _motor.recorder.channels[_channel][2]
+        _mask = (1 << (8 * _size)) - 1
+        _data = b''.join((_sample[_channel] & _mask).to_bytes(_size, 'little') for _sample in _motor.recorder.samples)
+        _buf = _ref(pDataVectorBuffer)
+        _count = min(len(_data), int(_val(VectorBufferSize)))
+        ctypes.memmove(_buf, _data, _count)
+        return 1
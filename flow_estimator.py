@@ -0,0 +1,100 @@
+from __future__ import annotations
+from collections import deque
+
+
+#
+#   Flow rate (weight slope) estimators.
+#   Least-squares slope of weight over monotonic time in a sliding time window, kept as running sums:
+#   every sample is added once and removed once, so an update is O(1) amortized.
+#   Times are kept relative to a base time, rebased periodically to keep the sums well conditioned.
+#
+
+class slopeEstimator:
+    RESYNC_PERIOD = 1024                    # removals between running sums recalculation
+
+    def __init__(self, window:float):
+        self.window:float = window          # sec
+        self.__samples:deque[tuple[float, float]] = deque()     # (t - base, weight)
+        self.__base:float | None = None
+        self.__removed:int = 0
+        self.__st = self.__sw = self.__stt = self.__stw = 0.0
+
+    def __repr__(self):
+        return f'slopeEstimator({self.window} sec, n={len(self.__samples)}, slope={self.slope})'
+
+    def __len__(self) -> int:
+        return len(self.__samples)
+
+    def reset(self):
+        self.__samples.clear()
+        self.__base = None
+        self.__removed = 0
+        self.__st = self.__sw = self.__stt = self.__stw = 0.0
+
+    def add(self, t:float, weight:float):
+        if self.__base is None:
+            self.__base = t
+        _t = t - self.__base
+        self.__samples.append((_t, weight))
+        self.__st += _t
+        self.__sw += weight
+        self.__stt += _t * _t
+        self.__stw += _t * weight
+
+        while self.__samples and self.__samples[0][0] < _t - self.window:
+            _old_t, _old_w = self.__samples.popleft()
+            self.__st -= _old_t
+            self.__sw -= _old_w
+            self.__stt -= _old_t * _old_t
+            self.__stw -= _old_t * _old_w
+            self.__removed += 1
+
+        if self.__removed >= slopeEstimator.RESYNC_PERIOD:
+            self.__resync()
+
+    def __resync(self):                     # rebase to the oldest sample and recalculate the sums
+        _shift = self.__samples[0][0]
+        self.__base += _shift
+        self.__samples = deque((_t - _shift, _w) for _t, _w in self.__samples)
+        self.__st = sum(_t for _t, _ in self.__samples)
+        self.__sw = sum(_w for _, _w in self.__samples)
+        self.__stt = sum(_t * _t for _t, _ in self.__samples)
+        self.__stw = sum(_t * _w for _t, _w in self.__samples)
+        self.__removed = 0
+
+    @property
+    def slope(self) -> float:               # weight units per sec, 0 until two samples at different times
+        _n = len(self.__samples)
+        if _n < 2:
+            return 0.0
+        _den = _n * self.__stt - self.__st * self.__st
+        if _den <= 0:
+            return 0.0
+        return (_n * self.__stw - self.__st * self.__sw) / _den
+
+
+class flowEstimators:                       # one estimator per window, fed by the same samples
+    def __init__(self, windows:tuple[float, ...] = (1.0, 10.0, 60.0)):
+        self.windows:tuple[float, ...] = tuple(windows)
+        self.estimators:list[slopeEstimator] = [slopeEstimator(_w) for _w in self.windows]
+
+    def __repr__(self):
+        return f'flowEstimators({self.estimators})'
+
+    def reset(self):
+        for _est in self.estimators:
+            _est.reset()
+
+    def add(self, t:float, weight:float):
+        for _est in self.estimators:
+            _est.add(t, weight)
+
+    def extend(self, times, weights):
+        for _t, _w in zip(times, weights):
+            self.add(_t, _w)
+
+    def rate(self, index:int = 0) -> float:     # slope of the index-th window
+        return self.estimators[index].slope if index < len(self.estimators) else 0.0
+
+    def rates(self) -> list[float]:
+        return [_est.slope for _est in self.estimators]
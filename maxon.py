@@ -6,6 +6,7 @@ from weakref import finalize
 import serial as serial
 import sys, os
 import time
+import math
 import threading
 import ctypes
 from threading import Lock
@@ -14,18 +15,25 @@ from collections import namedtuple
 from inputimeout  import inputimeout , TimeoutOccurred
 from dataclasses import dataclass
 from queue import Queue 
+import json
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 
 
-from common_utils import print_log, print_warn, print_err, print_DEBUG, exptTrace, s16, s32, num2binstr, set_parm, get_parm, void_f, assign_parm
+from common_utils import print_log, print_warn, print_err, print_DEBUG, debug_enabled, exptTrace, s16, s32, num2binstr, set_parm, get_parm, void_f, assign_parm
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Any
 
 
 # print_DEBUG = void_f
 
 from ctypes import *
-from ctypes import wintypes
 from maxon_errors import ErrTxt
+from epos_backend import loadEposLibrary, eposCallBuffers, RECORDER_TRIGGER_MOVEMENT_START, RECORDER_BASE_PERIOD, \
+                        RECORDER_MAX_CHANNELS
+import numpy as np
+from poll_policy import pollPolicy
+from station_reactor import stationReactor
 import threading
 
 typeDict={  'char': c_char,
@@ -148,6 +156,12 @@ INP_POLARITY_CTL = 0x3141
 QUICK_STOP = 0x1C   # 0x1C = 28
 GENERAL_PURPOSE_D = 0x13   # 0x13 = 19
 DIG_INP_4_CONF = 0x04
+DIG_INP_STATE_SUB = 0x01            # 0x3141:01 - digital inputs logic state, bit n-1 - input n
+DIG_INP_POLARITY_SUB = 0x02         # 0x3141:02 - digital inputs polarity, bit set - active low
+DIG_INP_COUNT = 8
+
+DIG_INP_STATE_QUERY = (INP_POLARITY_CTL, DIG_INP_STATE_SUB, 0x2)
+DIG_INP_POLARITY_QUERY = (INP_POLARITY_CTL, DIG_INP_POLARITY_SUB, 0x2)
 
 READ_HIGH_POLARITY = [
     (INP_POLARITY_CTL, 0x1, 0x2)
@@ -169,6 +183,27 @@ QUCK_STOP_MASK = 0b0000000000100000
 IDLE_DEV_CURRENT = 1         # mA
 IDLE_DEV_VELOCITY = 10
 CURRENT_WAIT_TIME = 2
+WATCHDOG_PERIOD = 0.02       # sec, motion watchdog loop period (50 Hz)
+WATCHDOG_NEAR_PERIOD = 0.005 # sec, close to the target position / current limit / timeout
+
+TARGET_REACHED_MASK = 0x0400        # statusword bit 10
+FAULT_MASK = 0x0008                 # statusword bit 3
+
+ST_DISABLED = 0                     # VCS_GetState() compatible states
+ST_ENABLED = 1
+ST_QUICKSTOP = 2
+ST_FAULT = 3
+
+def statusword2state(_status:int) -> tuple[int, bool]:          # (VCS state, quick stop active) out of the statusword
+    _qStop:bool = ((_status & 0x0f) == 0b0111) and (((_status >> 5) & 0x03) == 0b00)
+                                                                # quick stop : xxxx xxxx x00x 0111
+    if _status & FAULT_MASK:
+        return ST_FAULT, _qStop
+    if _qStop:
+        return ST_QUICKSTOP, _qStop
+    if (_status & 0x6f) == 0x27:                                # operation enabled: xxxx xxxx x01x 0111
+        return ST_ENABLED, _qStop
+    return ST_DISABLED, _qStop
 
 
 
@@ -176,14 +211,47 @@ CURRENT_WAIT_TIME = 2
 class MAXON_Motor: 
     portSp = namedtuple("portSp", ["device", "protocol", "interface", "port", "baudrate", "sn", "nodeid", "sensortype"])
     resultType = namedtuple("resultType", ["res", "answData", "query"])
-    activated_devs = []                                     # port numbers
+    WD_SKIPPED = 'skipped'                          # watchdog tick result: device busy, no snapshot read yet
+    telemetrySnapshot = namedtuple("telemetrySnapshot", ["timestamp", "position", "velocity", "current", "torque",
+                                                         "statusword", "state", "quick_stop", "target_reached", "error",
+                                                         "inputs", "hw_quick_stop"])
+                                                    # timestamp - time.monotonic(), error - first failed call error code (0 - OK)
+                                                    # inputs - digital inputs logic state (None - no quick stop input configured),
+                                                    # hw_quick_stop - the quick stop input is active
+    recorderChannel = namedtuple("recorderChannel", ["index", "subindex", "size", "dtype"])
+    RECORDER_CHANNELS:dict = {                      # Data Recorder channels by name
+        'position': recorderChannel(0x6064, 0x00, 4, '<i4'),       # Position actual value, inc
+        'velocity': recorderChannel(0x606C, 0x00, 4, '<i4'),       # Velocity actual value, rpm
+        'current': recorderChannel(0x30D1, 0x02, 4, '<i4'),        # Current actual value, mA
+        'torque': recorderChannel(0x6077, 0x00, 2, '<i2'),         # Torque actual value, per mille of rated torque
+    }
+    activated_devs = []                                   # port numbers
     protocol = None
     # devices:MAXON_Motor.portSp = None               # list of devices
     devices:list[MAXON_Motor.portSp] = None               # list of devices
     intf = None
-    mxn_lock = Lock()                               # COM port access mutex 
+    # Locking rule:
+    #   comm_lock (per port / keyHandle, see portLock()) - any call addressed to one port or opened device
+    #       (VCS_FindDeviceCommunicationSettings, telemetry, SDO read/write, motion commands).
+    #       Devices on different ports never wait for each other.
+    #   mxn_lock (library-wide) - only calls that touch the library-global tables: enumeration
+    #       (VCS_Get*Selection), VCS_OpenDevice/VCS_CloseDevice and the port_locks table itself.
+    #       Never take mxn_lock while holding a comm_lock.
+    #   enum_lock - one enumeration at a time; mxn_lock is held per selection, not for the whole enumeration
+    mxn_lock = Lock()                               # library-wide mutex
+    enum_lock = Lock()                              # devices enumeration mutex
+    port_locks:dict = dict()                        # port -> RLock, per communication handle mutexes
     epos = None
-    path = '.\DLL\EposCmd64.dll'                      # EPOS Command Library path
+    backend:str = None                              # EPOS library backend: 'windows', 'linux', 'sim' (None - EPOS_BACKEND env / platform default)
+    path:str = None                                 # EPOS Command Library path (None - backend default)
+    sim_latency:float = None                        # per call latency of the simulated backend, sec
+    cache_file:str = 'maxon_devices.json'           # last known devices list (see save_device_cache())
+    enum_parallel:bool = False                      # probe ports (baudrate + S/N) concurrently during enumeration
+    enum_workers:int = 4                            # max concurrent port probes
+    enum_port_timeout:float = 5.0                   # sec, port probe not answered in time is skipped
+    poll_policy:pollPolicy = pollPolicy(idle=0.5, active=WATCHDOG_PERIOD, near=WATCHDOG_NEAR_PERIOD, 
+                                        position_band=2000, deadline_band=0.2)
+                                                    # motion watchdog polling, assign own pollPolicy() per device if needed
     timeout = 500
     acceleration = 3000                            # rpm/s
     deceleration = 3000                            # rpm/s
@@ -204,6 +272,7 @@ class MAXON_Motor:
         self.IDLE_DEV_CURRENT = IDLE_DEV_CURRENT
         self.IDLE_DEV_VELOCITY = IDLE_DEV_VELOCITY
         self.CURRENT_WAIT_TIME = CURRENT_WAIT_TIME
+        self.WATCHDOG_PERIOD:float = WATCHDOG_PERIOD
         self.ACCELERATION =  MAXON_Motor.acceleration
         self.DECELERATION = MAXON_Motor.deceleration
         self.STALL_RELEASE = True
@@ -217,7 +286,20 @@ class MAXON_Motor:
         self.mDev_vel:int = 0                                 #  current velocity
         self.actual_current = 0                             # actual current value
         self.el_current_limit:int = MAXON_Motor.default_curr_limit                       # electrical current limit to stop 
-        self.wd = None                                      # watch dog identificator
+        self.wd = None                                      # watch dog identificator (thread or reactor job)
+        self.reactor:stationReactor | None = None           # station reactor running the watchdog, None - own thread
+        self.on_complete:Callable[[bool], None] | None = None   # current move completion callback, see _complete()
+        self.quick_stop_latency:float | None = None         # sec, last mDev_quick_stop() request to library call
+        self.executor:Callable[[str, Callable[[], Any]], bool] | None = None
+                                                            # runs the reactor watchdog completion (stop, final read, callback)
+                                                            # off the reactor thread, e.g. in the servo command worker.
+                                                            # False / None - completion runs in the reactor step
+        self.wd_skipped:int = 0                             # reactor watchdog ticks skipped, the device was busy
+        self.quick_stop_input:int | None = None             # digital input mapped to the drive quick stop, see mDev_config_quick_stop_input()
+        self.__wd_interval:float = WATCHDOG_PERIOD          # next watchdog tick, sec
+        self.__wd_phase:str = 'begin'                       # reactor watchdog phase: begin / run
+        self.__wd_active:bool = False                       # watchdog running, cleared before the completion is reported
+        self.__max_GRC:int = 0                              # max current during the operation
         self.mDev_SN = mxnDev.sn                                   # Serial N (0x1018:0x04)
         self.mDev_status = False                              # device status (bool) / used for succesful initiation validation
         self.__stop_motion:threading.Event = threading.Event()  # Event to stop motion thread
@@ -241,6 +323,12 @@ class MAXON_Motor:
         self.actual_torque = 0
         self.dev_lock = Lock()
         self.devNotificationQ = Queue()
+        self.snapshot:MAXON_Motor.telemetrySnapshot | None = None     # last telemetry snapshot
+        self.comm_lock = MAXON_Motor.portLock(self.mDev_port)          # per device (port) mutex
+        self._bufs = eposCallBuffers()                                  # preallocated OUT parameters, use under comm_lock
+        self.recorder_channels:list[str] = list()                      # active Data Recorder channels (see recorder_configure())
+        self.recorder_period:float = 0.0                                # Data Recorder sampling period, sec
+        self.recorder_preceding:int = 0                                 # samples recorded before the trigger
 
         try:
 
@@ -248,11 +336,12 @@ class MAXON_Motor:
             pErrorCode=c_uint()
 
 
-            self.keyHandle = MAXON_Motor.epos.VCS_OpenDevice(mxnDev.device, mxnDev.protocol, mxnDev.interface, mxnDev.port, byref(pErrorCode)) 
+            with MAXON_Motor.mxn_lock:
+                self.keyHandle = MAXON_Motor.epos.VCS_OpenDevice(mxnDev.device, mxnDev.protocol, mxnDev.interface, mxnDev.port, byref(pErrorCode)) 
    
             
 
-            MAXON_Motor.epos.VCS_SetProtocolStackSettings(self.keyHandle, c_int32(mxnDev.baudrate), c_int32(self.timeout), byref(pErrorCode)) # set baudrate
+            MAXON_Motor.epos.VCS_SetProtocolStackSettings(self.keyHandle, mxnDev.baudrate, self.timeout, byref(pErrorCode)) # set baudrate
 
 
             MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
@@ -296,8 +385,10 @@ class MAXON_Motor:
 
         try:
 
-            MAXON_Motor.epos.VCS_SetDisableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode)) # disable device
-            MAXON_Motor.epos.VCS_CloseDevice(self.keyHandle, byref(pErrorCode))
+            with self.comm_lock:
+                MAXON_Motor.epos.VCS_SetDisableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode)) # disable device
+            with MAXON_Motor.mxn_lock:
+                MAXON_Motor.epos.VCS_CloseDevice(self.keyHandle, byref(pErrorCode))
 
 
             print_log(f'({self.devName}) MAXON disabled on port {self.mDev_port}.')
@@ -347,47 +438,125 @@ class MAXON_Motor:
 
 
     @staticmethod
-    def getAvailablePorts(DeviceName, ProtocolStackName, InterfaceID)->list:
+    def getPortNames(DeviceName, ProtocolStackName, InterfaceName)->list:
         MaxStrSize = 100
         pEndOfSelection =  c_bool(False)
         pErrorCode = c_uint()
 
-        # InterfaceName = c_char_p(b'USB')
-        InterfaceName = InterfaceID
         pPortSel = create_string_buffer(MaxStrSize)
-        localPortlst = list()
-        print_log(f'Getting available ports for DeviceName={DeviceName}, ProtocolStackName={ProtocolStackName}, InterfaceName={InterfaceName}, MaxStrSize={MaxStrSize}')
+        portNames = list()
         MAXON_Motor.epos.VCS_GetPortNameSelection(DeviceName, ProtocolStackName, InterfaceName, True, byref(pPortSel), MaxStrSize, byref(pEndOfSelection), byref(pErrorCode))
         if pErrorCode.value == 0:
-            bdRate = MAXON_Motor.getMaxBaudrate(DeviceName, ProtocolStackName, InterfaceName, pPortSel.value)
-            SN, nodeID, senorType = MAXON_Motor.getDevSN(DeviceName, ProtocolStackName, InterfaceName, pPortSel.value)
-            if SN == 0:
-                print_warn (f'Serial # is 0 for Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port = {pPortSel.value}')
-            else:
-                print_log(f'Adding found (1) port for Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port = {pPortSel.value}, Baudrate = {bdRate}, SN = {SN}, nodeID = {nodeID}, senorType = {senorType}')
-                localPortlst.append(pPortSel.value)
-                MAXON_Motor.devices.append(MAXON_Motor.portSp(device=DeviceName, protocol=ProtocolStackName, interface=InterfaceName, port=pPortSel.value, baudrate=bdRate, sn=SN, nodeid=nodeID, sensortype=senorType))
+            portNames.append(pPortSel.value)
         else:
             print_err (f'ERROR getting port. Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port (1) = {pPortSel.value}  , pEndOfSelection = {pEndOfSelection.value}, pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
         while not pEndOfSelection.value:
             MAXON_Motor.epos.VCS_GetPortNameSelection(DeviceName, ProtocolStackName, InterfaceName, False, byref(pPortSel), MaxStrSize, byref(pEndOfSelection), byref(pErrorCode))
             if pErrorCode.value == 0:
-                bdRate = MAXON_Motor.getMaxBaudrate(DeviceName, ProtocolStackName, InterfaceName, pPortSel.value)
-                SN, nodeID, senorType = MAXON_Motor.getDevSN(DeviceName, ProtocolStackName, InterfaceName, pPortSel.value)
-                if SN == 0:
-                    print_warn (f'Serial # is 0 for Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port = {pPortSel.value}')
-                else:
-                    print_log(f'Adding found (...) port for Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port = {pPortSel.value}, Baudrate = {bdRate}, SN = {SN}, nodeID = {nodeID}, senorType = {senorType}')
-                    localPortlst.append(pPortSel.value)
-                    MAXON_Motor.devices.append(MAXON_Motor.portSp(device=DeviceName, protocol=ProtocolStackName, interface=InterfaceName, port=pPortSel.value, baudrate=bdRate, sn=SN, nodeid=nodeID, sensortype=senorType))
+                portNames.append(pPortSel.value)
             else:
-                print_err (f'ERROR getting port. Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceID} Port ... = {pPortSel.value}  , pEndOfSelection = {pEndOfSelection.value}, pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                print_err (f'ERROR getting port. Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port ... = {pPortSel.value}  , pEndOfSelection = {pEndOfSelection.value}, pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
                 break
+        return portNames
+
+    @staticmethod
+    def getAvailablePorts(DeviceName, ProtocolStackName, InterfaceID, parallel:bool = None, known:dict = None)->list:
+                                                    # known - port -> portSp of the last enumeration, opened ports are not probed.
+                                                    # Every port is probed (baudrate, find, S/N) by probePort(), concurrently if parallel.
+                                                    # A probe not done within enum_port_timeout is skipped and left running,
+                                                    # it holds only its own port lock
+        MaxStrSize = 100
+        InterfaceName = InterfaceID
+        localPortlst = list()
+        parallel = MAXON_Motor.enum_parallel if parallel is None else parallel
+        print_log(f'Getting available ports for DeviceName={DeviceName}, ProtocolStackName={ProtocolStackName}, InterfaceName={InterfaceName}, MaxStrSize={MaxStrSize}, parallel={parallel}')
+        _start = time.perf_counter()
+
+        found:list[MAXON_Motor.portSp | None] = list()
+        _probed:list = list()                       # ports to probe
+        with MAXON_Motor.mxn_lock:                  # selection, activated_devs
+            portNames = MAXON_Motor.getPortNames(DeviceName, ProtocolStackName, InterfaceName)
+            for _port in portNames:
+                if known and _port in known and _port in MAXON_Motor.activated_devs:
+                    print_log(f'Port {_port} is open, not probed. Dev = {known[_port]}')
+                    found.append(known[_port])
+                else:
+                    _probed.append(_port)
+
+        if parallel and len(_probed) > 1:
+            _workers = min(MAXON_Motor.enum_workers, len(_probed))
+            _deadline = _start + MAXON_Motor.enum_port_timeout * math.ceil(len(_probed) / _workers)
+                                                    # probes queued behind hanging ones are not waited for longer
+            _started:dict = dict()                  # port -> probe start time
+
+            def _probe(_port):
+                _started[_port] = time.perf_counter()
+                return MAXON_Motor.probePort(DeviceName, ProtocolStackName, InterfaceName, _port)
+
+            def _result(_port, _future):            # per port timeout, counted from the probe start
+                while True:
+                    _begin = _started.get(_port)
+                    _now = time.perf_counter()
+                    if _begin is None and _now >= _deadline:
+                        _future.cancel()
+                        raise FutureTimeoutError()
+                    try:
+                        return _future.result(timeout=max(_begin + MAXON_Motor.enum_port_timeout - _now, 0) if _begin is not None 
+                                                      else min(_deadline - _now, 0.05))
+                    except FutureTimeoutError:
+                        if _begin is not None or _future.cancelled():
+                            raise
+
+            _pool = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix='mxnProbe')
+            _futures = [_pool.submit(_probe, _port) for _port in _probed]
+            for _port, _future in zip(_probed, _futures):
+                try:                                # one hanging controller doesn't hold the rest
+                    found.append(_result(_port, _future))
+                except FutureTimeoutError:
+                    print_err(f'Timeout ({MAXON_Motor.enum_port_timeout} sec) probing port {_port} Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName}. Port skipped')
+                    found.append(None)
+                except Exception as ex:
+                    exptTrace(ex)
+                    print_err(f'Exception probing port {_port}: {ex} of type: {type(ex)}')
+                    found.append(None)
+            _pool.shutdown(wait=False, cancel_futures=True)     # timed out probes finish on their own
+        else:
+            for _port in _probed:
+                found.append(MAXON_Motor.probePort(DeviceName, ProtocolStackName, InterfaceName, _port))
+
+        for _dev in found:
+            if _dev is not None:
+                localPortlst.append(_dev.port)
+                MAXON_Motor.devices.append(_dev)
 
-        print_log(f'Available ports: {localPortlst}')
+        print_log(f'Available ports: {localPortlst}, {len(portNames)} ports probed in {(time.perf_counter() - _start)*1000:.1f} ms')
         return localPortlst
 
+    @staticmethod
+    def probePort(DeviceName, ProtocolStackName, InterfaceName, PortName) -> MAXON_Motor.portSp | None:
+                                                    # baudrate selection under mxn_lock, the rest under the port lock
+        with MAXON_Motor.mxn_lock:
+            bdRate = MAXON_Motor.getMaxBaudrate(DeviceName, ProtocolStackName, InterfaceName, PortName)
+        _lock = MAXON_Motor.portLock(PortName)
+        with _lock:
+            _dev = MAXON_Motor.findDevice(DeviceName, ProtocolStackName, InterfaceName, PortName)
+        if _dev is None:
+            return None
+        return MAXON_Motor.readPort(DeviceName, ProtocolStackName, InterfaceName, PortName, bdRate, *_dev, _lock)
+
+    @staticmethod
+    def readPort(DeviceName, ProtocolStackName, InterfaceName, PortName, bdRate, keyHandle, nodeID, lock) -> MAXON_Motor.portSp | None:
+                                                    # S/N and sensor type of the found device, calls addressed to the device only
+        _start = time.perf_counter()
+        SN, nodeID, senorType = MAXON_Motor.readDevSN(keyHandle, nodeID, lock)
+        print_log(f'Port {PortName} probed in {(time.perf_counter() - _start)*1000:.1f} ms')
+        if SN == 0:
+            print_warn (f'Serial # is 0 for Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port = {PortName}')
+            return None
+        print_log(f'Adding found port for Dev = {DeviceName} Protocol = {ProtocolStackName} InterfaceName = {InterfaceName} Port = {PortName}, Baudrate = {bdRate}, SN = {SN}, nodeID = {nodeID}, senorType = {senorType}')
+        return MAXON_Motor.portSp(device=DeviceName, protocol=ProtocolStackName, interface=InterfaceName, port=PortName, baudrate=bdRate, sn=SN, nodeid=nodeID, sensortype=senorType)
+
 
     @staticmethod
     def getAvailableInterfaces(DeviceName, ProtocolStackName)->list: 
@@ -474,6 +643,14 @@ class MAXON_Motor:
                                      #Stupid MAXON stuff. The dialog windows
                                      # appears/disappears to get the S/N, 
                                      # otherwise device should be opened and initiated to get the S/N
+        _dev = MAXON_Motor.findDevice(DeviceName, ProtocolStackName, InterfaceName, portU)
+        if _dev is None:
+            return 0, 0, 0
+        return MAXON_Motor.readDevSN(*_dev)
+
+    @staticmethod
+    def findDevice(DeviceName, ProtocolStackName, InterfaceName, portU) -> tuple[int, int] | None:
+                                     # (keyHandle, nodeID) of the device on the port. Addressed to the port, under its port lock
         MaxStrSize = 100
 
         pErrorCode = c_uint()
@@ -495,54 +672,63 @@ class MAXON_Motor:
             print_log(f'ERROR. No device found for device = {DeviceName}, Protocol = {ProtocolStackName}, Interface = {InterfaceName}, Port = {portU}, \
                 pBaudrateSel = {pBaudrateSel.value}, Timeout = {pTimeout.value},\
                 pNodeId = {pNodeId.value}, pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            return 0, 0, 0
-
-
+            return None
+        return pKeyHandle.value, pNodeId.value
 
+    @staticmethod
+    def readDevSN(keyHandle, nodeID, lock = None) -> tuple[int, int, int]:
+                                     # (S/N, nodeID, sensor type), lock - port lock of the device (comm_lock)
+        pErrorCode = c_uint()
         pSensorType = c_int32()
+        pData = c_int32()
+        pNbOfBytesRead =  c_int32()
 
-        MAXON_Motor.epos.VCS_GetSensorType(pKeyHandle.value, pNodeId.value, byref(pSensorType), byref(pErrorCode))
+        with lock if lock is not None else nullcontext():
+            MAXON_Motor.epos.VCS_GetSensorType(keyHandle, nodeID, byref(pSensorType), byref(pErrorCode))
 
-        if not pErrorCode.value == 0:
-            print(f'ERROR getting Sendor Type : pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            return 0, pNodeId.value, 0
+            if not pErrorCode.value == 0:
+                print(f'ERROR getting Sendor Type : pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                return 0, nodeID, 0
 
-        pData = c_int32()
-        pNbOfBytesRead =  c_int32()
-        MAXON_Motor.epos.VCS_GetObject(pKeyHandle.value, pNodeId.value, GET_SN_CMD[0], GET_SN_CMD[1], byref(pData), \
-                                       GET_SN_CMD[2], byref(pNbOfBytesRead), byref(pErrorCode))
+            MAXON_Motor.epos.VCS_GetObject(keyHandle, nodeID, GET_SN_CMD[0], GET_SN_CMD[1], byref(pData), \
+                                           GET_SN_CMD[2], byref(pNbOfBytesRead), byref(pErrorCode))
 
         if pErrorCode.value == 0:
-            return pData.value, pNodeId.value, pSensorType.value
+            return pData.value, nodeID, pSensorType.value
         else:
             print(f'ERROR reading Serial # = {pData.value} pNbOfBytesRead = {pNbOfBytesRead.value} pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            return 0, pNodeId.value, pSensorType.value
+            return 0, nodeID, pSensorType.value
 
 
 
     @staticmethod
-    def enum_devs(mxnDevice, mxnInterface):
+    def enum_devs(mxnDevice, mxnInterface, parallel:bool = None):
 
+        _known = {_dev.port: _dev for _dev in MAXON_Motor.devices} if MAXON_Motor.devices else None
         MAXON_Motor.devices = list()
+        _start = time.perf_counter()
         try:   
-            devList = MAXON_Motor.getAvailableDevices()
+            with MAXON_Motor.mxn_lock:              # selection calls, one selection at a time
+                devList = MAXON_Motor.getAvailableDevices()
             print_log(f'-> Device List = {devList}')
 
             for devID in devList:
                 if devID == mxnDevice:
-                    protLst = MAXON_Motor.getAvailableProtocols(devID)
+                    with MAXON_Motor.mxn_lock:
+                        protLst = MAXON_Motor.getAvailableProtocols(devID)
                 else:
                     continue
 
                 print_log(f'->[{devID}]-> Protocol List = {protLst}')
 
                 for protID in protLst:
-                    InterfaceLst = MAXON_Motor.getAvailableInterfaces(devID, protID)
+                    with MAXON_Motor.mxn_lock:
+                        InterfaceLst = MAXON_Motor.getAvailableInterfaces(devID, protID)
                     print_log(f'->[{devID}]->[{protID}]-> Inteface List = {InterfaceLst}')
 
                     for InterfaceID in InterfaceLst:
                         if InterfaceID == mxnInterface:
-                            localPortlst = MAXON_Motor.getAvailablePorts(devID, protID, InterfaceID)
+                            localPortlst = MAXON_Motor.getAvailablePorts(devID, protID, InterfaceID, parallel, _known)
                         else:
                             continue
                         
@@ -552,7 +738,7 @@ class MAXON_Motor:
 
             print_log('---------------------------------------------------------')
 
-            print_log(f'Found {len(MAXON_Motor.devices)} USB MAXON_Motor.devices \n{MAXON_Motor.devices}')
+            print_log(f'Found {len(MAXON_Motor.devices)} USB MAXON_Motor.devices in {(time.perf_counter() - _start)*1000:.1f} ms\n{MAXON_Motor.devices}')
                         
             print_log('---------------------------------------------------------')          
           
@@ -570,26 +756,100 @@ class MAXON_Motor:
 
 
     @staticmethod
-    def init_devices(mxnDevice=b'EPOS4', mxnInterface=b'USB'):
+    def load_library(backend:str = None):
+        if backend is not None and backend != MAXON_Motor.backend:
+            MAXON_Motor.backend = backend
+            MAXON_Motor.epos = None
+        with MAXON_Motor.mxn_lock:
+            if MAXON_Motor.epos is None:
+                MAXON_Motor.epos = loadEposLibrary(MAXON_Motor.backend, MAXON_Motor.path, MAXON_Motor.sim_latency)
+        return MAXON_Motor.epos
 
+    @staticmethod
+    def save_device_cache(devices:list[MAXON_Motor.portSp], path:str = None) -> bool:
+        _path = path if path else MAXON_Motor.cache_file
         try:
-            init_lock = Lock()
+            _records = [{_field: (_val.decode('latin-1') if isinstance(_val, bytes) else _val) for _field, _val in _dev._asdict().items()} 
+                            for _dev in devices]
+            _tmp = f'{_path}.tmp'
+            with open(_tmp, 'w') as _f:
+                json.dump(_records, _f, indent=2)
+            os.replace(_tmp, _path)                         # never leave half written cache
+            print_log(f'Saved {len(_records)} MAXON devices to cache {_path}')
+            return True
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Error saving MAXON devices cache {_path}. Exception: {ex} of type: {type(ex)}')
+            return False
+
+    @staticmethod
+    def load_device_cache(path:str = None) -> list[MAXON_Motor.portSp] | None:
+        _path = path if path else MAXON_Motor.cache_file
+        if not os.path.isfile(_path):
+            print_log(f'No MAXON devices cache at {_path}')
+            return None
+        try:
+            with open(_path, 'r') as _f:
+                _records = json.load(_f)
+            _devices = list()
+            for _rec in _records:                           # VCS_* functions expect bytes for the names
+                for _field in ('device', 'protocol', 'interface', 'port'):
+                    _rec[_field] = _rec[_field].encode('latin-1')
+                _devices.append(MAXON_Motor.portSp(**_rec))
+            print_log(f'Loaded {len(_devices)} MAXON devices from cache {_path}')
+            return _devices
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Error loading MAXON devices cache {_path}. Exception: {ex} of type: {type(ex)}')
+            return None
 
-            cdll.LoadLibrary(MAXON_Motor.path)              # have no idea why but Maxon wants it
-            MAXON_Motor.epos = CDLL(MAXON_Motor.path)
+    @staticmethod
+    def init_devices(mxnDevice=b'EPOS4', mxnInterface=b'USB', backend:str = None, use_cache:bool = False):
+                                                    # use_cache - return last known devices without enumeration, 
+                                                    # run revalidate_devices() later to refresh the list
+
+        try:
+            MAXON_Motor.load_library(backend)
+
+            if use_cache:
+                _cached = MAXON_Motor.load_device_cache()
+                if _cached:
+                    MAXON_Motor.devices = [_dev for _dev in _cached if _dev.device == mxnDevice and _dev.interface == mxnInterface]
+                    if len(MAXON_Motor.devices) > 0:
+                        return MAXON_Motor.devices
+
+            return MAXON_Motor.revalidate_devices(mxnDevice, mxnInterface)
+
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f"Error initiating MAXON devices. Exception: {ex} of type: {type(ex)}")
+            MAXON_Motor.devices = None
+
+        
+        return MAXON_Motor.devices
+
+    @staticmethod
+    def revalidate_devices(mxnDevice=b'EPOS4', mxnInterface=b'USB') -> list[MAXON_Motor.portSp] | None:
+                                                    # full enumeration, refreshes the devices cache
+        try:
+            MAXON_Motor.load_library()
             print_log(f'Looking for maxon devices, mxnDevice = {mxnDevice}, mxnInterface = {mxnInterface}')
-            MAXON_Motor.enum_devs(mxnDevice, mxnInterface)
+            with MAXON_Motor.enum_lock:             # enum_devs() takes mxn_lock per selection / port batch
+                MAXON_Motor.enum_devs(mxnDevice, mxnInterface)
+
+            if MAXON_Motor.devices is None:
+                return None
 
+            MAXON_Motor.save_device_cache(MAXON_Motor.devices)
             if len(MAXON_Motor.devices) == 0:
                 print_log("No MAXON devices detected in the system")
                 MAXON_Motor.devices = None
                 return None
         except Exception as ex:
             exptTrace(ex)
-            print_err(f"Error initiating MAXON devices. Exception: {ex} of type: {type(ex)}")
+            print_err(f"Error enumerating MAXON devices. Exception: {ex} of type: {type(ex)}")
             MAXON_Motor.devices = None
 
-        
         return MAXON_Motor.devices
             
 
@@ -602,25 +862,15 @@ class MAXON_Motor:
 
     @staticmethod
     # def MXN_cmd(port, arr, keyHandle=None, nodeID = None, DeviceName = None, ProtocolStackName = None, InterfaceName = None, lock = None):
-    def MXN_cmd(mxnPort, arr, keyHandle=None, nodeID = None, lock = None):
-
+    def MXN_cmd(mxnPort, arr, keyHandle=None, nodeID = None, lock = None, bufs:eposCallBuffers = None):
+                                                        # bufs - preallocated buffers of the device (valid together with lock)
 
         MaxStrSize = 100
 
-        pErrorCode = c_uint()
-
-        pTimeout = c_int32()
-        pNodeId = c_int32()
-
-        pKeyHandle = c_void_p()
-        pBaudrateSel = c_int32()
+        _shared:bool = bufs is not None and lock is not None and keyHandle is not None and nodeID is not None
+        _b = bufs if _shared else eposCallBuffers()
+        pErrorCode = _b.pErrorCode
         retValues = []
-        
-
-        pProtocolStackName = create_string_buffer(MaxStrSize)
-        pDeviceNameSel = create_string_buffer(MaxStrSize)
-        pInterfaceNameSel = create_string_buffer(MaxStrSize)
-
 
 
         if len(arr) == 0:
@@ -628,15 +878,19 @@ class MAXON_Motor:
             return retValues
         
 
-        # sL = MAXON_Motor.smartLocker(lock)                  #  mutex for FH channel
-        sL = MAXON_Motor.smartLocker(MAXON_Motor.mxn_lock)                  #  mutex for FH channel
-        
         try:
             
             if keyHandle is None or nodeID is None:           # keyHandle is not available, try to resolve ot using portID    
-
-                
-                MAXON_Motor.epos.VCS_FindDeviceCommunicationSettings(
+                pTimeout = c_int32()
+                pNodeId = c_int32()
+                pKeyHandle = c_void_p()
+                pBaudrateSel = c_int32()
+                pProtocolStackName = create_string_buffer(MaxStrSize)
+                pDeviceNameSel = create_string_buffer(MaxStrSize)
+                pInterfaceNameSel = create_string_buffer(MaxStrSize)
+
+                with MAXON_Motor.mxn_lock:                      # library-global call
+                    MAXON_Motor.epos.VCS_FindDeviceCommunicationSettings(
                                             byref(pKeyHandle), byref(pDeviceNameSel), byref(pProtocolStackName), 
                                             byref(pInterfaceNameSel), mxnPort,
                                             MaxStrSize, byref(pBaudrateSel), byref(pTimeout),   
@@ -652,8 +906,9 @@ class MAXON_Motor:
                     keyHandle = pKeyHandle.value
                     nodeID = pNodeId.value
 
-
-            MAXON_Motor.epos.VCS_ClearFault(c_void_p(keyHandle) , c_uint16(nodeID), byref(pErrorCode))
+            sL = MAXON_Motor.smartLocker(lock if lock is not None else MAXON_Motor.portLock(mxnPort))
+                                                                #  mutex for the device channel
+            MAXON_Motor.epos.VCS_ClearFault(keyHandle, nodeID, _b.rErrorCode)
             if pErrorCode.value != 0:
                     print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
@@ -669,24 +924,25 @@ class MAXON_Motor:
             answData = None
             try:      
                 if len(_cmd) == 3:  
-                    pData = c_int32()                   # Using 4 bytes buffer. to support in string replace to create_string_buffer()
-                    pNbOfBytesRead =  c_int32()
-                    MAXON_Motor.epos.VCS_GetObject(keyHandle, nodeID, _cmd[0], _cmd[1], byref(pData), _cmd[2], 
-                                                   byref(pNbOfBytesRead), byref(pErrorCode))
-                    print_DEBUG(f"VCS_GetObject({mxnPort}, 0x{_cmd[0]:04x}, 0x{_cmd[1]:04x} [{_cmd[2]} bytes]) = {pData.value} / answData=0x{pData.value:04x} ({pNbOfBytesRead.value} bytes)")
+                    pData = _b.pData                    # Using 4 bytes buffer. to support in string replace to create_string_buffer()
+                    pNbOfBytesRead = _b.pNbOfBytes
+                    pData.value = 0
+                    MAXON_Motor.epos.VCS_GetObject(keyHandle, nodeID, _cmd[0], _cmd[1], _b.rData, _cmd[2], 
+                                                   _b.rNbOfBytes, _b.rErrorCode)
+                    if debug_enabled(): print_DEBUG(f"VCS_GetObject({mxnPort}, 0x{_cmd[0]:04x}, 0x{_cmd[1]:04x} [{_cmd[2]} bytes]) = {pData.value} / answData=0x{pData.value:04x} ({pNbOfBytesRead.value} bytes)")
                     if pErrorCode.value == 0:
                         answData = pData.value
                     else:
                         print_err(f'ERROR reading object: {_cmd} from port {mxnPort}')
                         answData = None
                 elif len(_cmd) == 4:
-                    pNbOfBytesWritten = c_int32()
+                    pNbOfBytesWritten = _b.pNbOfBytes
                     data =  c_int32(_cmd[2])
 
-                    print_log(f"VCS_SetObject({mxnPort}, 0x{_cmd[0]:04x}, 0x{_cmd[1]:04x}, 0x{_cmd[2]:04x}, 0x{_cmd[3]:04x}) bytes will be sent ")
+                    if debug_enabled(): print_DEBUG(f"VCS_SetObject({mxnPort}, 0x{_cmd[0]:04x}, 0x{_cmd[1]:04x}, 0x{_cmd[2]:04x}, 0x{_cmd[3]:04x}) bytes will be sent ")
                     MAXON_Motor.epos.VCS_SetObject(keyHandle, nodeID, _cmd[0], _cmd[1], byref(data), _cmd[3],   \
-                                                   byref(pNbOfBytesWritten),  byref(pErrorCode))
-                    print_log(f"VCS_SetObject() = {pNbOfBytesWritten.value} done ")
+                                                   _b.rNbOfBytes,  _b.rErrorCode)
+                    if debug_enabled(): print_DEBUG(f"VCS_SetObject() = {pNbOfBytesWritten.value} done ")
                     
                     if pErrorCode.value != 0:
                         print_err(f'ERROR writing object: {_cmd} to port {mxnPort}')
@@ -696,7 +952,7 @@ class MAXON_Motor:
                     continue
                 
                 if pErrorCode.value == 0:
-                    retValues.append(MAXON_Motor.resultType(res = pErrorCode, answData = answData, query=_cmd))
+                    retValues.append(MAXON_Motor.resultType(res = c_uint(pErrorCode.value), answData = answData, query=_cmd))
                 else:
                     print_err(f'Error executing CMD = {_cmd} with res = 0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
@@ -709,6 +965,14 @@ class MAXON_Motor:
             
         return retValues
     
+    @staticmethod
+    def portLock(mxnPort) -> threading.RLock:         # per port (communication handle) mutex
+        _lock = MAXON_Motor.port_locks.get(mxnPort)
+        if _lock is None:
+            with MAXON_Motor.mxn_lock:
+                _lock = MAXON_Motor.port_locks.setdefault(mxnPort, threading.RLock())
+        return _lock
+
     def __setUpCommunication(self)->bool:
         MaxStrSize = 100
         pErrorCode = c_uint()
@@ -726,8 +990,8 @@ class MAXON_Motor:
             
             if self.__keyHandle == None:           # keyHandle is not available, try to resolve ot using portID    
 
-                
-                MAXON_Motor.epos.VCS_FindDeviceCommunicationSettings(
+                with MAXON_Motor.mxn_lock:              # library-global call
+                    MAXON_Motor.epos.VCS_FindDeviceCommunicationSettings(
                                             byref(pKeyHandle), byref(pDeviceNameSel), byref(pProtocolStackName), 
                                             byref(pInterfaceNameSel), self.mDev_port,
                                             MaxStrSize, byref(pBaudrateSel), byref(pTimeout),   
@@ -773,19 +1037,229 @@ class MAXON_Motor:
 
         return True
     def mDev_get_actual_current(self) -> int:
-        pCurrentIs = c_int32(0)
-        pErrorCode = c_uint()
+        _b = self._bufs
 
-        MAXON_Motor.epos.VCS_GetCurrentIs(self.keyHandle, self.mDev_nodeID, byref(pCurrentIs), byref(pErrorCode))
-        actualCurrentValue:int = s16(pCurrentIs.value)
+        with self.comm_lock:
+            MAXON_Motor.epos.VCS_GetCurrentIs(self.keyHandle, self.mDev_nodeID, _b.rCurrent, _b.rErrorCode)
+            actualCurrentValue:int = s16(_b.pCurrent.value)
+            _error:int = _b.pErrorCode.value
 
-        if pErrorCode.value != 0:
-            print_err(f'Getting Actual Current Value on port  {self.mDev_port} failed. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)} ')
+        if _error != 0:
+            print_err(f'Getting Actual Current Value on port  {self.mDev_port} failed. pErrorCode =  0x{_error:08x} / {ErrTxt(_error)} ')
             return -1
         else:
             self.actual_current = actualCurrentValue
             return actualCurrentValue
-        
+
+
+    def read_snapshot(self, blocking:bool = True) -> MAXON_Motor.telemetrySnapshot | None:
+                                            # position, velocity, current, statusword and torque in one lock acquisition.
+                                            # Quick stop, state and target reached are decoded from the statusword.
+                                            # blocking = False - None when the device is busy (comm_lock is held)
+        _epos = MAXON_Motor.epos
+        _handle = self.keyHandle
+        _node = self.mDev_nodeID
+        _b = self._bufs
+        _error:int = 0
+
+        if not self.comm_lock.acquire(blocking):
+            return None
+        try:
+            _epos.VCS_GetPositionIs(_handle, _node, _b.rPosition, _b.rErrorCode)
+            _error = _error or _b.pErrorCode.value
+            _epos.VCS_GetVelocityIs(_handle, _node, _b.rVelocity, _b.rErrorCode)
+            _error = _error or _b.pErrorCode.value
+            _epos.VCS_GetCurrentIs(_handle, _node, _b.rCurrent, _b.rErrorCode)
+            _error = _error or _b.pErrorCode.value
+            _b.pData.value = 0
+            _epos.VCS_GetObject(_handle, _node, STATUS_WORD_QUERY[0], STATUS_WORD_QUERY[1], _b.rData, \
+                                STATUS_WORD_QUERY[2], _b.rNbOfBytes, _b.rErrorCode)
+            _error = _error or _b.pErrorCode.value
+            _status:int = _b.pData.value & 0xffff
+            _b.pData.value = 0
+            _epos.VCS_GetObject(_handle, _node, TORQUE_ACTUAL_QUERY[0], TORQUE_ACTUAL_QUERY[1], _b.rData, \
+                                TORQUE_ACTUAL_QUERY[2], _b.rNbOfBytes, _b.rErrorCode)
+            _error = _error or _b.pErrorCode.value
+            _position:int = _b.pPosition.value
+            _velocity:int = _b.pVelocity.value
+            _current:int = _b.pCurrent.value
+            _torque:int = _b.pData.value
+            _inputs:int | None = None
+            if self.quick_stop_input is not None:
+                _b.pData.value = 0
+                _epos.VCS_GetObject(_handle, _node, DIG_INP_STATE_QUERY[0], DIG_INP_STATE_QUERY[1], _b.rData, \
+                                    DIG_INP_STATE_QUERY[2], _b.rNbOfBytes, _b.rErrorCode)
+                _error = _error or _b.pErrorCode.value
+                _inputs = _b.pData.value & 0xffff
+        finally:
+            self.comm_lock.release()
+        _timestamp = time.monotonic()
+
+        if _error != 0:
+            print_err(f'Reading telemetry snapshot on port {self.mDev_port} failed. pErrorCode =  0x{_error:08x} / {ErrTxt(_error)}')
+
+        _state, _qStop = statusword2state(_status)
+        self.mDev_pos = _position
+        self.mDev_vel = _velocity
+        self.actual_current = s16(_current)
+        self.actual_torque = s16(_torque)
+        self.snapshot = MAXON_Motor.telemetrySnapshot(timestamp=_timestamp, position=self.mDev_pos, velocity=self.mDev_vel,
+                                                      current=self.actual_current, torque=self.actual_torque, statusword=_status,
+                                                      state=_state, quick_stop=_qStop,
+                                                      target_reached=bool(_status & TARGET_REACHED_MASK), error=_error,
+                                                      inputs=_inputs, hw_quick_stop=bool(_inputs and _inputs & (1 << (self.quick_stop_input - 1))))
+        return self.snapshot
+
+    def mDev_config_quick_stop_input(self, input:int = DIG_INP_4_CONF, active_low:bool = False, enable:bool = True) -> bool:
+                                            # maps a digital input (1..DIG_INP_COUNT) to the drive quick stop function
+                                            # (enable = False - back to general purpose) and sets its polarity.
+                                            # The drive stops on the input in firmware, the watchdog reports it
+        if not 1 <= input <= DIG_INP_COUNT:
+            print_err(f'Wrong digital input {input} on port {self.mDev_port}, 1..{DIG_INP_COUNT} expected')
+            return False
+        _cmd = MAXON_Motor.MXN_cmd
+        _kwargs = dict(keyHandle=self.keyHandle, nodeID=self.mDev_nodeID, lock=self.comm_lock, bufs=self._bufs)
+        try:
+            _polarity = _cmd(self.mDev_port, [DIG_INP_POLARITY_QUERY], **_kwargs)
+            if len(_polarity) == 0:
+                print_err(f'Reading digital inputs polarity on port {self.mDev_port} failed')
+                return False
+            _mask:int = 1 << (input - 1)
+            _value:int = (_polarity[0].answData | _mask) if active_low else (_polarity[0].answData & ~_mask)
+            if input == DIG_INP_4_CONF:
+                _function = ACTIVATE_QUICK_STOP if enable else DEACTIVATE_QUICK_STOP
+            else:
+                _function = [(DIG_INP_CNTL, input, QUICK_STOP if enable else GENERAL_PURPOSE_D, 0x2)]
+            _arr = [(INP_POLARITY_CTL, DIG_INP_POLARITY_SUB, _value & 0xffff, 0x2)] + _function
+            if len(_cmd(self.mDev_port, _arr, **_kwargs)) != len(_arr):
+                print_err(f'Configuring quick stop input {input} on port {self.mDev_port} failed')
+                return False
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Configuring quick stop input {input} on port {self.mDev_port} failed. Exception: {ex} of type: {type(ex)}.')
+            return False
+
+        if enable:
+            self.quick_stop_input = input
+        elif self.quick_stop_input == input:
+            self.quick_stop_input = None
+        print_log(f'{self.devName}: digital input {input} {"mapped to quick stop" if enable else "set to general purpose"}, active {"low" if active_low else "high"}, port = {self.mDev_port}')
+        return True
+
+    def mDev_get_inputs(self) -> int | None:            # digital inputs logic state, None - read failed
+        _inputs = MAXON_Motor.MXN_cmd(self.mDev_port, [DIG_INP_STATE_QUERY], keyHandle=self.keyHandle, nodeID=self.mDev_nodeID,
+                                      lock=self.comm_lock, bufs=self._bufs)
+        return _inputs[0].answData & 0xffff if len(_inputs) > 0 else None
+
+
+    def __recorder_call(self, func:str, *args) -> bool:       # call under comm_lock
+        _b = self._bufs
+        getattr(MAXON_Motor.epos, func)(self.keyHandle, self.mDev_nodeID, *args, _b.rErrorCode)
+        if _b.pErrorCode.value != 0:
+            print_err(f'{func} failed on port {self.mDev_port}. pErrorCode =  0x{_b.pErrorCode.value:08x} / {ErrTxt(_b.pErrorCode.value)}')
+            return False
+        return True
+
+    def recorder_configure(self, channels:list[str] = ('current', 'velocity'), sampling_period:int = 10, 
+                           preceding_samples:int = 0, trigger:int = RECORDER_TRIGGER_MOVEMENT_START) -> bool:
+                                            # sampling_period - in RECORDER_BASE_PERIOD units, 
+                                            # trigger - RECORDER_TRIGGER_* (may be OR-ed)
+        if len(channels) == 0 or len(channels) > RECORDER_MAX_CHANNELS:
+            print_err(f'Wrong recorder channels list {channels}, 1..{RECORDER_MAX_CHANNELS} channels expected')
+            return False
+        for _name in channels:
+            if _name not in MAXON_Motor.RECORDER_CHANNELS:
+                print_err(f'Unknown recorder channel {_name}. Available channels: {list(MAXON_Motor.RECORDER_CHANNELS)}')
+                return False
+        try:
+            with self.comm_lock:
+                if not (self.__recorder_call('VCS_StopRecorder') and self.__recorder_call('VCS_DeactivateAllChannels') \
+                        and self.__recorder_call('VCS_DisableAllTriggers')):
+                    return False
+                for _num, _name in enumerate(channels, start=1):
+                    _ch = MAXON_Motor.RECORDER_CHANNELS[_name]
+                    if not self.__recorder_call('VCS_ActivateChannel', _num, _ch.index, _ch.subindex, _ch.size):
+                        return False
+                if not (self.__recorder_call('VCS_SetRecorderParameter', int(sampling_period), int(preceding_samples)) \
+                        and self.__recorder_call('VCS_EnableTrigger', trigger)):
+                    return False
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Exception: {ex} of type: {type(ex)} configuring data recorder on port {self.mDev_port}.')
+            return False
+
+        self.recorder_channels = list(channels)
+        self.recorder_period = int(sampling_period) * RECORDER_BASE_PERIOD
+        self.recorder_preceding = int(preceding_samples)
+        print_log(f'Data recorder configured on port {self.mDev_port}: channels = {self.recorder_channels}, period = {self.recorder_period*1000:.1f} ms, preceding samples = {self.recorder_preceding}, trigger = 0x{trigger:02x}')
+        return True
+
+    def recorder_arm(self) -> bool:         # start recording, the trigger (e.g. movement start) fixes the capture window
+        if not self.recorder_channels:
+            print_err(f'Data recorder is not configured on port {self.mDev_port}')
+            return False
+        with self.comm_lock:
+            return self.__recorder_call('VCS_StartRecorder')
+
+    def recorder_trigger(self) -> bool:     # software trigger
+        with self.comm_lock:
+            return self.__recorder_call('VCS_ForceTrigger')
+
+    def recorder_stop(self) -> bool:
+        with self.comm_lock:
+            return self.__recorder_call('VCS_StopRecorder')
+
+    def recorder_status(self) -> tuple[bool, bool] | None:       # (running, triggered)
+        _b = self._bufs
+        with self.comm_lock:
+            if not self.__recorder_call('VCS_IsRecorderRunning', _b.rBool):
+                return None
+            _running = bool(_b.pBool.value)
+            if not self.__recorder_call('VCS_IsRecorderTriggered', _b.rBool):
+                return None
+            return _running, bool(_b.pBool.value)
+
+    def recorder_read(self, timeout:float = 0.0) -> dict[str, np.ndarray] | None:
+                                            # waits up to timeout sec for the capture to complete, stops the recorder and
+                                            # uploads the channels in bulk. 'time' - sec relative to the trigger
+        if not self.recorder_channels:
+            print_err(f'Data recorder is not configured on port {self.mDev_port}')
+            return None
+        try:
+            _deadline = time.monotonic() + timeout
+            while True:
+                _status = self.recorder_status()
+                if _status is None:
+                    return None
+                if not _status[0] or time.monotonic() >= _deadline:
+                    break
+                time.sleep(self.WATCHDOG_PERIOD)
+            if not _status[1]:
+                print_warn(f'Data recorder was not triggered on port {self.mDev_port}')
+
+            _b = self._bufs
+            _traces:dict[str, np.ndarray] = dict()
+            with self.comm_lock:
+                if _status[0] and not self.__recorder_call('VCS_StopRecorder'):
+                    return None
+                if not self.__recorder_call('VCS_ReadChannelVectorSize', _b.rState):
+                    return None
+                _samples = _b.pState.value
+                for _num, _name in enumerate(self.recorder_channels, start=1):
+                    _ch = MAXON_Motor.RECORDER_CHANNELS[_name]
+                    _buf = (c_uint8 * (_samples * _ch.size))()
+                    if not self.__recorder_call('VCS_ReadChannelDataVector', _num, byref(_buf), len(_buf)):
+                        return None
+                    _traces[_name] = np.frombuffer(_buf, dtype=_ch.dtype, count=_samples)
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Exception: {ex} of type: {type(ex)} reading data recorder on port {self.mDev_port}.')
+            return None
+
+        _traces['time'] = (np.arange(_samples) - min(self.recorder_preceding, _samples)) * self.recorder_period
+        print_log(f'Data recorder on port {self.mDev_port}: {_samples} samples x {len(self.recorder_channels)} channels uploaded')
+        return _traces
+
 
     def _is_pos_reached(self, target_pos:int, ex_limit:int) -> bool:
         pErrorCode = c_uint()
@@ -793,7 +1267,7 @@ class MAXON_Motor:
         try:
             MAXON_Motor.epos.VCS_GetMovementState(self.keyHandle, self.mDev_nodeID, byref(pTargetReached), byref(pErrorCode))
 
-            print_DEBUG(f'MAXON: POSITION REACHED (bit 10 at statusword  )={pTargetReached.value}')
+            if debug_enabled(): print_DEBUG(f'MAXON: POSITION REACHED (bit 10 at statusword  )={pTargetReached.value}')
             if pErrorCode.value == 0:
 
 
@@ -809,17 +1283,8 @@ class MAXON_Motor:
         return False
     
 
-    def is_motor_in_motion(self) -> bool:
-        
-        try:
-           if self.wd is not None and self.wd.is_alive():
-                return True
-           else:
-                return False
-        except Exception as ex:
-            e_type, e_filename, e_line_number, e_message = exptTrace(ex)
-            print_err(f'Exception: {ex} of type: {type(ex)} on checking POSITION REACHED status for port {self.mDev_port}.')
-            return False
+    def is_motor_in_motion(self) -> bool:       # False already in the completion callback of the move
+        return self.__wd_active
         
     
         
@@ -827,115 +1292,105 @@ class MAXON_Motor:
         
         print_log (f'>>> WatchDog MAXON  started on  port = {self.mDev_port}, dev = {self.devName}, position = {self.mDev_pos}')
         time.sleep(self.MEASUREMENT_DELAY)                 # waif for a half of sec
+        try:
+            self._watch_dog_begin()
+            while self.mDev_watch_dog_step() is not None:
+                if self.__stop_motion.wait(self.__wd_interval):
+                    break
+            self._watch_dog_check()
+            self._watch_dog_finish()
+        except BaseException:
+            self.__wd_active = False            # not in finally: the completion callback may have started the next move
+            raise
+        return
+
+    def _watch_dog_begin(self):
         self.success_flag = True
         self.__stop_motion.clear()              # reset stop event
         self.start_time = time.time()   
 
         self.devNotificationQ.queue.clear()        # clear notification queue
 
-        max_GRC:int = 0
+        self.__max_GRC = 0
         print_log(f' WatchDog MAXON: Starting monitoring loop for port = {self.mDev_port}, position = {self.mDev_pos}, el_current_limit = {self.el_current_limit} mA, time_control_mode = {self.time_control_mode}, rotationTime = {self.rotationTime} sec, possition_control_mode = {self.possition_control_mode} ')
-        while (not self.__stop_motion.is_set()):
-            try:
-                pCurrentIs = c_int32(0)
-                pErrorCode = c_uint()
-                pTargetReached = c_bool(False)
-                pQuickStop = c_bool(False)
-                pState = c_uint()
-                pVelocityIs = c_long()
-
-#------------------------
-                # MAXON_Motor.epos.VCS_GetCurrentIs(self.keyHandle, self.mDev_nodeID, byref(pCurrentIs), byref(pErrorCode))
-                # actualCurrentValue:int = s16(pCurrentIs.value)
-                actualCurrentValue:int = self.mDev_get_actual_current()
-#------------------------
-
-                print_DEBUG(f'WatchDog MAXHON Actual Current Value = {actualCurrentValue}')
-                if pErrorCode.value == 0:
-                   
-                    max_GRC = abs(actualCurrentValue) if abs(actualCurrentValue) > max_GRC else max_GRC
-
-                    if (int(abs(actualCurrentValue)) > int(self.el_current_limit)):
-                        print_log(f' WatchDog MAXON: Actual Current Value = {actualCurrentValue}, Limit = {self.el_current_limit}')
-                        _pos = self.mDev_get_cur_pos()
-                        self.mDev_get_cur_velocity()
-                        if abs(_pos - self.new_pos) > self.EX_LIMIT:
-                            print_log(f'Desired position [{self.new_pos}] is not reached. Current position = {_pos}')
-                            self.success_flag = False
-                        break
 
+    def mDev_watch_dog_step(self, blocking:bool = True) -> MAXON_Motor.telemetrySnapshot | None:
+                                            # one watchdog tick. None - monitoring completed.
+                                            # blocking = False - the tick is skipped when the device is busy
+        if self.__stop_motion.is_set():
+            return None
+        try:
+            _snap:MAXON_Motor.telemetrySnapshot = self.read_snapshot(blocking)
+            if _snap is None:
+                self.wd_skipped += 1
+                return self.snapshot if self.snapshot is not None else MAXON_Motor.WD_SKIPPED
+            actualCurrentValue:int = _snap.current
+
+            if debug_enabled(): print_DEBUG(f'WatchDog MAXHON Actual Current Value = {actualCurrentValue}')
+            if _snap.hw_quick_stop:
+                print_warn(f'WARNING, MAXON quick stop input {self.quick_stop_input} is active on port {self.mDev_port} (inputs = {num2binstr(_snap.inputs)}). Exiting watchdog')
+                self.success_flag = False
+                return None
 
-                else:
-                    print_err(f'WatchDog MAXON failed get Actual Current Value on port  {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)} ')
+            if _snap.error == 0:
+               
+                self.__max_GRC = abs(actualCurrentValue) if abs(actualCurrentValue) > self.__max_GRC else self.__max_GRC
 
+                if (int(abs(actualCurrentValue)) > int(self.el_current_limit)):
+                    print_log(f' WatchDog MAXON: Actual Current Value = {actualCurrentValue}, Limit = {self.el_current_limit}')
+                    if abs(_snap.position - self.new_pos) > self.EX_LIMIT:
+                        print_log(f'Desired position [{self.new_pos}] is not reached. Current position = {_snap.position}')
+                        self.success_flag = False
+                    return None
 
-                
 
-                if self.time_control_mode:
-                    end_time = time.time()
-                    if end_time - self.start_time > self.rotationTime:
-                        print_log(f' WatchDog MAXON: TIME/DIST ROTATOR operation completed, port = {self.mDev_port}, actual current value = {actualCurrentValue}, Limit = {self.el_current_limit}, max GRC = {max_GRC} ')
-                        break
+            else:
+                print_err(f'WatchDog MAXON failed read telemetry on port  {self.mDev_port}. pErrorCode =  0x{_snap.error:08x} / {ErrTxt(_snap.error)} ')
 
-               
-                MAXON_Motor.epos.VCS_GetQuickStopState(self.keyHandle, self.mDev_nodeID, byref(pQuickStop), byref(pErrorCode))
 
-                print_DEBUG(f'WatchDog MAXON: QuickStop status ={pQuickStop.value}')
-                if pErrorCode.value == 0:
-                    _status:int = 0
-                    _qStop:bool =  False
-
-############        
-                    _statusWord = MAXON_Motor.MXN_cmd(self.mDev_port, [STATUS_WORD_QUERY], keyHandle=self.__keyHandle, nodeID=self.__nodeID, lock=MAXON_Motor.mxn_lock)
-                    if len(_statusWord) > 0:
-                        _status  = _statusWord[0].answData
-                        # _qStop:bool = bool(_status & 0x10)
-                        _qStop = ((_status & 0x0f) == 0b0111) and (((_status >> 5) & 0x03) == 0b00) 
-                                                            # quick stop : xxxx xxxx x00x 0111
-                    
-                    if not (_qStop == bool(pQuickStop.value)):
-                        print_err(f'WARNING!!!! _qStop = {_qStop}(status =  0x{_status}:02x <> {num2binstr(_status)}) //  pQuickStop.value = { pQuickStop.value} ')
+            
 
-                    MAXON_Motor.epos.VCS_GetVelocityIs(self.keyHandle, self.mDev_nodeID, byref(pVelocityIs), byref(pErrorCode))
+            if self.time_control_mode:
+                end_time = time.time()
+                if end_time - self.start_time > self.rotationTime:
+                    print_log(f' WatchDog MAXON: TIME/DIST ROTATOR operation completed, port = {self.mDev_port}, actual current value = {actualCurrentValue}, Limit = {self.el_current_limit}, max GRC = {self.__max_GRC} ')
+                    return None
 
-                    MAXON_Motor.epos.VCS_GetState(self.keyHandle, self.mDev_nodeID, byref(pState), byref(pErrorCode))
-                    _qStop_state:bool = (pState.value == 0x0002)                 # QuickStop state
-                         
+           
+            if debug_enabled(): print_DEBUG(f'WatchDog MAXON: QuickStop status ={_snap.quick_stop}')
+            if _snap.error == 0:
+                _qStop_state:bool = (_snap.state == ST_QUICKSTOP)                 # QuickStop state
+                     
 ###########                       Disabling quick stop status check 
-                    if pQuickStop.value or _qStop or _qStop_state or ( (time.time() - self.start_time > self.CURRENT_WAIT_TIME)  \
-                                and  ((abs(actualCurrentValue) <= self.IDLE_DEV_CURRENT) or (abs(pVelocityIs.value) <= self.IDLE_DEV_VELOCITY))):        # Quick stop is active 
+                if _snap.quick_stop or _qStop_state or ( (time.time() - self.start_time > self.CURRENT_WAIT_TIME)  \
+                            and  ((abs(actualCurrentValue) <= self.IDLE_DEV_CURRENT) or (abs(_snap.velocity) <= self.IDLE_DEV_VELOCITY))):        # Quick stop is active 
 
-                        print_warn(f'WARNING, MAXON entered QuickStop condition on port {self.mDev_port}. ')
-                        # print_log(f'MAXON entered QuickStop state at port {self.mDev_port}. Exiting watchdog')
-                        print_log(f'{self.devName}: _qStop = {_qStop}(status =  0x{_status:02x} <> {num2binstr(_status)}) // state = {pState.value} (QuckStop by state = {_qStop_state}) //  pQuickStop.value = { pQuickStop.value} //  current = {actualCurrentValue}mA // velocity = {pVelocityIs.value}')
+                    print_warn(f'WARNING, MAXON entered QuickStop condition on port {self.mDev_port}. ')
+                    print_log(f'{self.devName}: _qStop = {_snap.quick_stop}(status =  0x{_snap.statusword:02x} <> {num2binstr(_snap.statusword)}) // state = {_snap.state} (QuckStop by state = {_qStop_state}) //  current = {actualCurrentValue}mA // velocity = {_snap.velocity}')
 
+            if self.possition_control_mode:
 
-                else:
-                    print_err(f'WatchDog MAXON failed read QuickStop status on port = {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                if debug_enabled(): print_DEBUG(f'WatchDog MAXON: POSITION REACHED (bit 10 at statusword  )={_snap.target_reached}')
+                if _snap.error == 0:
 
-                if self.possition_control_mode:
+                    if _snap.target_reached:        # Position reached - bit 10 at statusword 
+                        print_log(f'POSITION REACHED on  MAXON port {self.mDev_port}. Exiting watchdog')
 
-                    MAXON_Motor.epos.VCS_GetMovementState(self.keyHandle, self.mDev_nodeID, byref(pTargetReached), byref(pErrorCode))
+                        return None
 
-                    print_DEBUG(f'WatchDog MAXON: POSITION REACHED (bit 10 at statusword  )={pTargetReached.value}')
-                    if pErrorCode.value == 0:
+            self.__wd_interval = self.poll_policy.interval(active = True,
+                            pos_error = (self.new_pos - _snap.position) if self.possition_control_mode else None,
+                            current = actualCurrentValue, current_limit = self.el_current_limit,
+                            time_left = (self.rotationTime - (time.time() - self.start_time)) if self.time_control_mode else None)
+            return _snap
 
+        except Exception as ex:
+            e_type, e_filename, e_line_number, e_message = exptTrace(ex)
+            print_err(f'WatchDog MAXON failed on port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
+            self.success_flag = False
+            return None
 
-                        if pTargetReached.value:        # Position reached - bit 10 at statusword 
-                            print_log(f'POSITION REACHED on  MAXON port {self.mDev_port}. Exiting watchdog')
-
-                            break
-                    else:
-                        print_err(f'WatchDog MAXON failed read POSITION REACHED status on port = {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-
-            except Exception as ex:
-                e_type, e_filename, e_line_number, e_message = exptTrace(ex)
-                print_err(f'WatchDog MAXON failed on port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
-                self.success_flag = False
-                break
-            finally:
-                pass
-            
+    def _watch_dog_check(self):                 # operation duration check
         end_time = time.time()
         print_log(f' WatchDog MAXON: Start time = {self.start_time}, end time ={end_time}, delta = {end_time - self.start_time}')
         print_log (f'>>> WatchDog MAXON  completed on  port = {self.mDev_port}, dev = {self.devName}, position = {self.mDev_pos}, minimal operation time = {self.MINIMAL_OP_DURATION}')
@@ -943,31 +1398,62 @@ class MAXON_Motor:
             print_log(f' WatchDog MAXON: Abnormal termination on port = {self.mDev_port}')
             self.success_flag = False
 
-        time.sleep(0.1)
-
-    
+    def _watch_dog_finish(self):                # the move is over: stop, final state, release the device, report the completion.
+                                                # Nothing of this watchdog runs after the callback (it may start the next move)
         if not self.__stop_motion.is_set():
             print_log(f'Thread is being stoped')
             self.mDev_stop()
-            
+        self._watch_dog_end()
+        self.__wd_active = False
         
         if self.dev_lock.locked():
             self.dev_lock.release()
         else:
             print_err(f'-WARNING unlocket mutual access mutex')
 
+        self._complete(self.success_flag)
 
-        self.mDev_pos = self.mDev_get_cur_pos()
-        self.mDev_vel = self.mDev_get_cur_velocity()
-        self.actual_current = self.mDev_get_actual_current()
+    def _complete(self, success:bool):          # fires the completion callback of the current move once
+        _on_complete, self.on_complete = self.on_complete, None
+        if _on_complete is None:
+            return
+        try:
+            _on_complete(success)
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'MAXON completion callback failed on port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
+
+    def _watch_dog_end(self):                   # final state and the queue notification
+        self.read_snapshot()                        # updates mDev_pos, mDev_vel, actual_current and actual_torque
         print_log(f'Motor final position = {self.mDev_pos} actual current = {self.actual_current} and status = {self.success_flag}  on port = {self.mDev_port}')
         self.devNotificationQ.put(self.success_flag)
-        
-        return
-    
+
+    def __reactor_step(self):                   # watchdog as a station reactor job, must not block:
+                                                # busy device - tick skipped, the completion goes to the executor
+        if self.__wd_phase == 'begin':
+            self._watch_dog_begin()
+            self.__wd_phase = 'run'
+        _snap = self.mDev_watch_dog_step(blocking=False)
+        if _snap is not None:
+            return _snap
+        self._watch_dog_check()
+        if self.executor is None or not self.executor(f'watchdog-{self.mDev_port}', self._watch_dog_finish):
+            self._watch_dog_finish()
+        return stationReactor.DONE
+
+    def __reactor_period(self) -> float:
+        return self.__wd_interval
 
     def  mDev_watch_dog(self):
         # self.start_time = time.time()
+        self.__wd_active = True
+        if self.reactor is not None:
+            self.__wd_phase = 'begin'
+            self.__wd_interval = self.poll_policy.active
+            self.__stop_motion.clear()
+            self.wd = self.reactor.add_job(f'maxon-{self.mDev_port}', self.__reactor_step, self.__reactor_period, 
+                                           delay=self.MEASUREMENT_DELAY)
+            return self.wd
         self.wd = threading.Thread(target=self.mDev_watch_dog_thread, daemon=True)
         self.wd.start()
         return self.wd
@@ -976,18 +1462,19 @@ class MAXON_Motor:
 
     
         try:
-            pErrorCode = c_uint()
-            MAXON_Motor.epos.VCS_SetQuickStopState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+            with self.comm_lock:
+                pErrorCode = c_uint()
+                MAXON_Motor.epos.VCS_SetQuickStopState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
             
-            if self.STALL_RELEASE:
-                MAXON_Motor.epos.VCS_SetDisableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                if self.STALL_RELEASE:
+                    MAXON_Motor.epos.VCS_SetDisableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
                 
 
-            self.__stop_motion.set()    
+                self.__stop_motion.set()    
 
-            print_log(f'Motor is being disabled on port: {self.mDev_port}')
-            if pErrorCode.value != 0:
-                print_err(f'ERROR MAXON failed disable port = {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                print_log(f'Motor is being disabled on port: {self.mDev_port}')
+                if pErrorCode.value != 0:
+                    print_err(f'ERROR MAXON failed disable port = {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
         except Exception as ex:
             e_type, e_filename, e_line_number, e_message = exptTrace(ex)
             print_err(f'ERROR MAXON failed disable port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
@@ -998,28 +1485,50 @@ class MAXON_Motor:
         self.actual_current = self.mDev_get_actual_current()
         return True
 
+    def mDev_quick_stop(self, requested:float = None)-> bool:
+                                            # emergency stop fast path: the quick stop call only, under the device lock only,
+                                            # no disable and no status reads (mDev_stop() completes the stop).
+                                            # requested - time.perf_counter() of the stop request (latency metric)
+        _b = self._bufs
+        try:
+            with self.comm_lock:
+                if requested is not None:
+                    self.quick_stop_latency = time.perf_counter() - requested
+                MAXON_Motor.epos.VCS_SetQuickStopState(self.keyHandle, self.mDev_nodeID, _b.rErrorCode)
+                _error:int = _b.pErrorCode.value
+            self.__stop_motion.set()
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'ERROR MAXON quick stop failed on port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
+            return False
+        if _error != 0:
+            print_err(f'ERROR MAXON quick stop failed on port = {self.mDev_port}. pErrorCode =  0x{_error:08x} / {ErrTxt(_error)}')
+            return False
+        return True
+
     def velocityModeMove(self, _velocity = None):
         pErrorCode = c_uint()
         print_log(f'Velocity Mode Movement, dev = {self.devName}, velocity = {_velocity}')
         try:
-            if not (_velocity == 0):
-                MAXON_Motor.epos.VCS_ActivateProfileVelocityMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetVelocityProfile(self.keyHandle, self.mDev_nodeID, self.ACCELERATION, self.DECELERATION, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    print_err(f'WARNING: Setting Velocity Profile: VCS_SetVelocityProfile(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, (-1)*_velocity, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            with self.comm_lock:
+                if not (_velocity == 0):
+                    MAXON_Motor.epos.VCS_ActivateProfileVelocityMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetVelocityProfile(self.keyHandle, self.mDev_nodeID, self.ACCELERATION, self.DECELERATION, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        print_err(f'WARNING: Setting Velocity Profile: VCS_SetVelocityProfile(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, (-1)*_velocity, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
-            else:           # speed == 0
-                MAXON_Motor.epos.VCS_HaltVelocityMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR halting device (speed = 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                else:           # speed == 0
+                    MAXON_Motor.epos.VCS_HaltVelocityMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR halting device (speed = 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
             
                                                                                                             
         except Exception as ex:
@@ -1032,26 +1541,30 @@ class MAXON_Motor:
         pErrorCode = c_uint()
         print_log(f'Moving using current mode. Dev: {self.devName}, voltage = {_voltage}')
         try:
-            MAXON_Motor.epos.VCS_ActivateCurrentMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR Activation Current Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            with self.comm_lock:
+                MAXON_Motor.epos.VCS_ActivateCurrentMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR Activation Current Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
             
-            MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
-            MAXON_Motor.epos.VCS_SetCurrentMustEx(self.keyHandle, self.mDev_nodeID, _voltage, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR: Setting Current: VCS_SetCurrentMustEx(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                MAXON_Motor.epos.VCS_SetCurrentMustEx(self.keyHandle, self.mDev_nodeID, _voltage, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR: Setting Current: VCS_SetCurrentMustEx(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
         except Exception as ex:
             e_type, e_filename, e_line_number, e_message = exptTrace(ex)
             print_err(f'MAXON current mode move failed on port = {self.mDev_port}. Exception: [{ex}].')
             raise ex
 
 
-    def go2pos(self, new_position, velocity = None, acceleration = None, deceleration = None, stall=None)->bool:
+    def go2pos(self, new_position, velocity = None, acceleration = None, deceleration = None, stall=None,
+               on_complete:Callable[[bool], None] = None)->bool:
+                                            # on_complete(success) - called once when a started move is over
         if not self.mutualControl():
             return False
+        self.on_complete = on_complete
         if  acceleration == None:
             acceleration = self.ACCELERATION
         if  deceleration == None:
@@ -1066,37 +1579,39 @@ class MAXON_Motor:
         self.time_control_mode = False 
         print_log(f'MAXON GO2POS {new_position} velocity = {velocity}, Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, acc = {acceleration}, dec = {deceleration} ')
         try:
-            pErrorCode = c_uint()
-
-            MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
-            if pErrorCode.value != 0:
-                print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            with self.comm_lock:
+                pErrorCode = c_uint()
 
-            if (velocity != 0):
-                MAXON_Motor.epos.VCS_ActivateProfilePositionMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
                 if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetPositionProfile(self.keyHandle, self.mDev_nodeID, int(velocity), \
-                                                        int(acceleration), int(deceleration), byref(pErrorCode)) 
-                if pErrorCode.value != 0:
-                    print_err(f'WARNING setting Position Profile. Handle={self.keyHandle}, nodeID = {self.mDev_nodeID}, velocity = {velocity}, pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_MoveToPosition(self.keyHandle, self.mDev_nodeID, new_position, True, True, byref(pErrorCode)) 
-                print_log(f'Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, position to move = {new_position}')
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Moving to position. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            else:               # speed = 0
-                MAXON_Motor.epos.VCS_HaltPositionMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR halting the device (speed == 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+
+                if (velocity != 0):
+                    MAXON_Motor.epos.VCS_ActivateProfilePositionMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetPositionProfile(self.keyHandle, self.mDev_nodeID, int(velocity), \
+                                                            int(acceleration), int(deceleration), byref(pErrorCode)) 
+                    if pErrorCode.value != 0:
+                        print_err(f'WARNING setting Position Profile. Handle={self.keyHandle}, nodeID = {self.mDev_nodeID}, velocity = {velocity}, pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_MoveToPosition(self.keyHandle, self.mDev_nodeID, new_position, True, True, byref(pErrorCode)) 
+                    print_log(f'Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, position to move = {new_position}')
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Moving to position. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                else:               # speed = 0
+                    MAXON_Motor.epos.VCS_HaltPositionMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR halting the device (speed == 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
             
 
         except Exception as ex:
             e_type, e_filename, e_line_number, e_message = exptTrace(ex)
             print_err(f'MAXON go2pos  failed on port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
             self.success_flag = False
+            self.on_complete = None
             self.mDev_stop()
             if self.dev_lock.locked():
                 self.dev_lock.release()
@@ -1110,7 +1625,7 @@ class MAXON_Motor:
         pTorqueIs = c_int32(0)
         pErrorCode = c_uint()
 
-        _actualTorque = MAXON_Motor.MXN_cmd(self.mDev_port, [TORQUE_ACTUAL_QUERY], keyHandle=self.__keyHandle, nodeID=self.__nodeID, lock=MAXON_Motor.mxn_lock)
+        _actualTorque = MAXON_Motor.MXN_cmd(self.mDev_port, [TORQUE_ACTUAL_QUERY], keyHandle=self.__keyHandle, nodeID=self.__nodeID, lock=self.comm_lock, bufs=self._bufs)
 
         if len(_actualTorque) > 0:
             actualTorqueValue:int = s16(_actualTorque[0].answData)  
@@ -1128,7 +1643,7 @@ class MAXON_Motor:
 
 
         try:
-            MAXON_Motor.MXN_cmd(self.mDev_port, STALL_CMD_LST, keyHandle=self.__keyHandle, nodeID=self.__nodeID, lock = MAXON_Motor.mxn_lock)
+            MAXON_Motor.MXN_cmd(self.mDev_port, STALL_CMD_LST, keyHandle=self.__keyHandle, nodeID=self.__nodeID, lock = self.comm_lock, bufs=self._bufs)
 
         except Exception as ex:
             e_type, e_filename, e_line_number, e_message = exptTrace(ex)
@@ -1146,9 +1661,12 @@ class MAXON_Motor:
 
     
 
-    def  mDev_forward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool=None, stall = None)->bool:
+    def  mDev_forward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool=None, stall = None,
+                    on_complete:Callable[[bool], None] = None)->bool:
+                                            # on_complete(success) - called once when a started move is over
         if not self.mutualControl():
             return False
+        self.on_complete = on_complete
         
         if  acceleration == None:
             acceleration = self.ACCELERATION
@@ -1170,39 +1688,41 @@ class MAXON_Motor:
             self.time_control_mode = False
         
         try:
-            pErrorCode = c_uint()
+            with self.comm_lock:
+                pErrorCode = c_uint()
 
-            MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
-            if pErrorCode.value != 0:
-                print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            
-            if self.rpm == 0:
-                print_log(f'Going stall on port = {self.mDev_port}')
-                MAXON_Motor.epos.VCS_HaltVelocityMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
                 if pErrorCode.value != 0:
-                    raise Exception(f'ERROR halting device (speed = 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            
+                if self.rpm == 0:
+                    print_log(f'Going stall on port = {self.mDev_port}')
+                    MAXON_Motor.epos.VCS_HaltVelocityMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR halting device (speed = 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
            
-            elif (self.rpm != 0):
-                print_log(f'Going forward on port = {self.mDev_port}, velocity = {self.rpm}, Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, acc = {acceleration}, dec = {deceleration}')
+                elif (self.rpm != 0):
+                    print_log(f'Going forward on port = {self.mDev_port}, velocity = {self.rpm}, Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, acc = {acceleration}, dec = {deceleration}')
 
-                MAXON_Motor.epos.VCS_ActivateProfileVelocityMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetVelocityProfile(self.keyHandle, self.mDev_nodeID, int(acceleration), int(deceleration), byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    print_err(f'WARNING: Setting Velocity Profile: VCS_SetVelocityProfile(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, self.rpm, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_ActivateProfileVelocityMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetVelocityProfile(self.keyHandle, self.mDev_nodeID, int(acceleration), int(deceleration), byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        print_err(f'WARNING: Setting Velocity Profile: VCS_SetVelocityProfile(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, self.rpm, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
                                                                                           
         except Exception as ex:
                 e_type, e_filename, e_line_number, e_message = exptTrace(ex)
                 print_err(f'MAXON forward failed on port = {self.mDev_port}. Exception: [{ex}] of type: {type(ex)}.')
                 self.success_flag = False
+                self.on_complete = None
                 self.mDev_stop()
                 if self.dev_lock.locked():
                     self.dev_lock.release()
@@ -1214,7 +1734,9 @@ class MAXON_Motor:
         if  self.rpm:                       # no need watchdog for zero speed
             self.mDev_watch_dog()
         else: 
-            return self.mDev_stop()
+            _status = self.mDev_stop()
+            self._complete(_status)
+            return _status
 
         return True
     
@@ -1227,10 +1749,11 @@ class MAXON_Motor:
             return False
 
         try:
-            pErrorCode = c_uint()
-            MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, self.rpm, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            with self.comm_lock:
+                pErrorCode = c_uint()
+                MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, self.rpm, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
                                                                                           
         except Exception as ex:
@@ -1244,10 +1767,12 @@ class MAXON_Motor:
 
     
 
-    def  mDev_backward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool=None, stall = None)->bool:
-
+    def  mDev_backward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool=None, stall = None,
+                    on_complete:Callable[[bool], None] = None)->bool:
+                                            # on_complete(success) - called once when a started move is over
         if not self.mutualControl():
             return False
+        self.on_complete = on_complete
         
         if  acceleration == None:
             acceleration = self.ACCELERATION
@@ -1272,39 +1797,41 @@ class MAXON_Motor:
 
       
         try:
-            pErrorCode = c_uint()
+            with self.comm_lock:
+                pErrorCode = c_uint()
 
-            MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
-            if pErrorCode.value != 0:
-                print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            
-            if self.rpm == 0:
-                print_log(f'Going stall on port = {self.mDev_port}')
-                MAXON_Motor.epos.VCS_HaltVelocityMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
                 if pErrorCode.value != 0:
-                    raise Exception(f'ERROR halting device (speed = 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            
+                if self.rpm == 0:
+                    print_log(f'Going stall on port = {self.mDev_port}')
+                    MAXON_Motor.epos.VCS_HaltVelocityMovement(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR halting device (speed = 0). pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
            
-            elif (self.rpm != 0):
-                print_log(f'Going backward on port = {self.mDev_port}, velocity = {self.rpm}, Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, acc = {acceleration}, dec = {deceleration}')
+                elif (self.rpm != 0):
+                    print_log(f'Going backward on port = {self.mDev_port}, velocity = {self.rpm}, Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID}, acc = {acceleration}, dec = {deceleration}')
 
-                MAXON_Motor.epos.VCS_ActivateProfileVelocityMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_SetVelocityProfile(self.keyHandle, self.mDev_nodeID, int(acceleration), int(deceleration), byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    print_err(f'WARNING: Setting Velocity Profile: VCS_SetVelocityProfile(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-                MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, (-1)*self.rpm, byref(pErrorCode))
-                if pErrorCode.value != 0:
-                    raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_ActivateProfileVelocityMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_SetVelocityProfile(self.keyHandle, self.mDev_nodeID, int(acceleration), int(deceleration), byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        print_err(f'WARNING: Setting Velocity Profile: VCS_SetVelocityProfile(Handle = {self.keyHandle}, nodeID = {self.mDev_nodeID})  pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                    MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, (-1)*self.rpm, byref(pErrorCode))
+                    if pErrorCode.value != 0:
+                        raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
                                                                                           
         except Exception as ex:
                 e_type, e_filename, e_line_number, e_message = exptTrace(ex)
                 print_err(f'MAXON backward failed on port = {self.mDev_port}. Exception: [{ex}] of type: {type(ex)}.')
                 self.success_flag = False
+                self.on_complete = None
                 self.mDev_stop()
                 if self.dev_lock.locked():
                     self.dev_lock.release()
@@ -1316,7 +1843,9 @@ class MAXON_Motor:
         if  self.rpm:                       # no need watchdog for zero speed
             self.mDev_watch_dog()
         else: 
-            return self.mDev_stop()
+            _status = self.mDev_stop()
+            self._complete(_status)
+            return _status
 
         return True
     
@@ -1329,10 +1858,11 @@ class MAXON_Motor:
             return False
 
         try:
-            pErrorCode = c_uint()
-            MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, (-1)*self.rpm, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+            with self.comm_lock:
+                pErrorCode = c_uint()
+                MAXON_Motor.epos.VCS_MoveWithVelocity(self.keyHandle, self.mDev_nodeID, (-1)*self.rpm, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
 
                                                                                           
         except Exception as ex:
@@ -1351,12 +1881,12 @@ class MAXON_Motor:
 
     def mDev_get_cur_velocity(self) -> int:
         try:
-            pVelocityIs=c_long()
-            pErrorCode=c_uint()
-            ret = MAXON_Motor.epos.VCS_GetVelocityIs(self.keyHandle, self.mDev_nodeID, byref(pVelocityIs), byref(pErrorCode))
-            if pErrorCode.value != 0:
-                print_err (f'ERROR geting MAXON {self.devName}  velocity on port {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            self.mDev_vel = pVelocityIs.value
+            with self.comm_lock:
+                _b = self._bufs
+                ret = MAXON_Motor.epos.VCS_GetVelocityIs(self.keyHandle, self.mDev_nodeID, _b.rVelocity, _b.rErrorCode)
+                if _b.pErrorCode.value != 0:
+                    print_err (f'ERROR geting MAXON {self.devName}  velocity on port {self.mDev_port}. pErrorCode =  0x{_b.pErrorCode.value:08x} / {ErrTxt(_b.pErrorCode.value)}')
+                self.mDev_vel = _b.pVelocity.value
         except Exception as ex:
             e_type, e_filename, e_line_number, e_message = exptTrace(ex)
             print_err(f"ERROR retriving velocity on device = {self.devName}, port={self.mDev_port},  Unexpected Exception: {ex}")
@@ -1366,12 +1896,12 @@ class MAXON_Motor:
 
     def mDev_get_cur_pos(self) -> int:
         try:
-            pPositionIs=c_long()
-            pErrorCode=c_uint()
-            ret = MAXON_Motor.epos.VCS_GetPositionIs(self.keyHandle, self.mDev_nodeID, byref(pPositionIs), byref(pErrorCode))
-            if pErrorCode.value != 0:
-                print_err (f'ERROR geting MAXON {self.devName}  position on port {self.mDev_port}. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            self.mDev_pos = pPositionIs.value
+            with self.comm_lock:
+                _b = self._bufs
+                ret = MAXON_Motor.epos.VCS_GetPositionIs(self.keyHandle, self.mDev_nodeID, _b.rPosition, _b.rErrorCode)
+                if _b.pErrorCode.value != 0:
+                    print_err (f'ERROR geting MAXON {self.devName}  position on port {self.mDev_port}. pErrorCode =  0x{_b.pErrorCode.value:08x} / {ErrTxt(_b.pErrorCode.value)}')
+                self.mDev_pos = _b.pPosition.value
         except Exception as ex:
             e_type, e_filename, e_line_number, e_message = exptTrace(ex)
             print_err(f"ERROR retriving position on device = {self.devName}, port={self.mDev_port},  Unexpected Exception: {ex}")
@@ -1388,26 +1918,27 @@ class MAXON_Motor:
         print_log (f"MAXON {self.devName} starting HOMING on port = {self.mDev_port} /  position = {self.mDev_pos}" ) 
 
         try:
+            with self.comm_lock:
 
-            MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
-            if pErrorCode.value != 0:
-                print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                MAXON_Motor.epos.VCS_ClearFault(c_void_p(self.keyHandle) , c_uint16(self.mDev_nodeID), byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    print_err(f'ERROR clearing Faults. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
                 
-            MAXON_Motor.epos.VCS_ActivateHomingMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
-            # MAXON_Motor.epos.VCS_DefinePosition(self.keyHandle, self.mDev_nodeID, self.mDev_pos, byref(pErrorCode))
-            MAXON_Motor.epos.VCS_DefinePosition(self.keyHandle, self.mDev_nodeID, 0, byref(pErrorCode))
-            if pErrorCode.value != 0:
-                raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                MAXON_Motor.epos.VCS_ActivateHomingMode(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR Activation Profile Velocity Mode. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                MAXON_Motor.epos.VCS_SetEnableState(self.keyHandle, self.mDev_nodeID, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR enabling Device. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
+                # MAXON_Motor.epos.VCS_DefinePosition(self.keyHandle, self.mDev_nodeID, self.mDev_pos, byref(pErrorCode))
+                MAXON_Motor.epos.VCS_DefinePosition(self.keyHandle, self.mDev_nodeID, 0, byref(pErrorCode))
+                if pErrorCode.value != 0:
+                    raise Exception(f'ERROR Operating moving with Velocity. pErrorCode =  0x{pErrorCode.value:08x} / {ErrTxt(pErrorCode.value)}')
             
 
 
-            self.mDev_get_cur_pos()              # updating current position
-            print_log (f"MAXON {self.devName}  HOMED on port = {self.mDev_port} /  position = {self.mDev_pos}" ) 
+                self.mDev_get_cur_pos()              # updating current position
+                print_log (f"MAXON {self.devName}  HOMED on port = {self.mDev_port} /  position = {self.mDev_pos}" ) 
 
 
         except Exception as ex:
@@ -1445,6 +1976,8 @@ class MAXON_Motor:
 # Stub class for MAXON motor for unit testing without hardware
 class MAXON_Motor_Stub: 
     operation = namedtuple("operation", ["fw", "bw", "g2p", "stop"])
+    STUB_SPEED = 100                                    # inc/sec, simulated motion speed
+    poll_policy:pollPolicy = pollPolicy(idle=0.5, active=0.1, near=0.02, position_band=20)
     devices:list[MAXON_Motor.portSp] = [
         MAXON_Motor.portSp('stub_dev', 'stub_protocol', 'stub_usb','stub_port', '9600', '12345', 1, 'stub_sensor')
         # , MAXON_Motor.portSp('stub_dev2', 'stub_protocol', 'stub_usb','stub_port2', '9600', '67890', 2, 'stub_sensor2')
@@ -1457,7 +1990,15 @@ class MAXON_Motor_Stub:
         self.mDev_vel:int = 0                                 #  current velocity
         self.actual_current:int = 0                          #  actual current
 
-        self.wd = None                                      # watch dog identificator
+        self.wd = None                                      # watch dog identificator (thread or reactor job)
+        self.reactor:stationReactor | None = None           # station reactor running the watchdog, None - own thread
+        self.on_complete:Callable[[bool], None] | None = None   # current move completion callback
+        self.quick_stop_latency:float | None = None         # sec, last mDev_quick_stop() request to stop
+        self.executor:Callable[[str, Callable[[], Any]], bool] | None = None   # not used, the stub completion doesn't block
+        self.quick_stop_input:int | None = None             # digital input mapped to the drive quick stop
+        self.__wd_last:float = 0.0                          # last watchdog tick time
+        self.__wd_remainder:float = 0.0                     # position fraction not applied yet
+        self.__wd_active:bool = False                       # watchdog running, cleared before the completion is reported
         self.mDev_SN = mxnDev.sn                                   # Serial N (0x1018:0x04)
         self.__stop_motion:threading.Event = threading.Event()  # Event to stop motion thread
         self.__operation:MAXON_Motor_Stub.operation = MAXON_Motor_Stub.operation.stop  # Operations enum
@@ -1482,17 +2023,38 @@ class MAXON_Motor_Stub:
         return MAXON_Motor_Stub.devices
 
     @staticmethod
-    def init_devices(mxnDevice=b'EPOS4', mxnInterface=b'USB')->list[MAXON_Motor.portSp]:
+    def init_devices(mxnDevice=b'EPOS4', mxnInterface=b'USB', backend:str = None, use_cache:bool = False)->list[MAXON_Motor.portSp]:
         print_log(f'Initializing MAXON Stub devices with Device={mxnDevice} Interface={mxnInterface}')
         return MAXON_Motor_Stub.devices
+
+    @staticmethod
+    def revalidate_devices(mxnDevice=b'EPOS4', mxnInterface=b'USB')->list[MAXON_Motor.portSp]:
+        print_log(f'Revalidating MAXON Stub devices with Device={mxnDevice} Interface={mxnInterface}')
+        return MAXON_Motor_Stub.devices
     
     def init_dev(self) -> bool:
         print_log(f'Initializing MAXON Stub device on port {self.mDev_port}, dev = {self.devName}')
         return True
 
     def mDev_get_actual_current(self) -> int:
-        return self.actual_current 
-        
+        return self.actual_current
+
+    def read_snapshot(self, blocking:bool = True) -> MAXON_Motor.telemetrySnapshot | None:
+        _in_motion:bool = self.is_motor_in_motion()
+        _status:int = 0x0027 if _in_motion else 0x0427             # operation enabled (+ target reached when idle)
+        return MAXON_Motor.telemetrySnapshot(timestamp=time.monotonic(), position=self.mDev_pos, velocity=self.mDev_vel,
+                                             current=self.actual_current, torque=self.mDev_get_actual_torque(), statusword=_status,
+                                             state=ST_ENABLED, quick_stop=False, target_reached=not _in_motion, error=0,
+                                             inputs=0 if self.quick_stop_input is not None else None, hw_quick_stop=False)
+
+    def mDev_config_quick_stop_input(self, input:int = DIG_INP_4_CONF, active_low:bool = False, enable:bool = True) -> bool:
+        print_log(f'MAXON Stub quick stop input {input}, enable = {enable}, active_low = {active_low}, port = {self.mDev_port}')
+        self.quick_stop_input = input if enable else None
+        return True
+
+    def mDev_get_inputs(self) -> int | None:
+        return 0
+
 
     def _is_pos_reached(self, target_pos:int, ex_limit:int) -> bool:
         print_log (f'Checking position reached on MAXON Stub port = {self.mDev_port}, dev = {self.devName}, target_pos = {target_pos}, ex_limit = {ex_limit}, current_pos = {self.mDev_pos}')
@@ -1500,17 +2062,8 @@ class MAXON_Motor_Stub:
             return True
         return False
     
-    def is_motor_in_motion(self) -> bool:
-        
-        try:
-           if self.wd is not None and self.wd.is_alive():
-                return True
-           else:
-                return False
-        except Exception as ex:
-            e_type, e_filename, e_line_number, e_message = exptTrace(ex)
-            print_err(f'Exception: {ex} of type: {type(ex)} on checking POSITION REACHED status for port {self.mDev_port}.')
-            return False
+    def is_motor_in_motion(self) -> bool:       # False already in the completion callback of the move
+        return self.__wd_active
         
 
     def  mDev_update_forward_velocity(self, velocity = None)->bool:
@@ -1539,32 +2092,76 @@ class MAXON_Motor_Stub:
         return True
         
     def  mDev_watch_dog_thread(self):
+        self._watch_dog_begin()
+        while self.mDev_watch_dog_step() is not None:
+            self.__stop_motion.wait(self.__wd_interval())
+        self._watch_dog_end()
+        return
+
+    def _watch_dog_begin(self):
         self.__stop_motion.clear()
         self.devNotificationQ.queue.clear()
         print_log (f'>>> WatchDogStub MAXON  started on  port = {self.mDev_port}, dev = {self.devName}, position = {self.mDev_pos}, operation = {self.__operation}')
-        while (not self.__stop_motion.is_set()):
-            if self.__operation == self.operation.fw:
-                    self.mDev_pos += 10
-            elif self.__operation == self.operation.bw:
-                self.mDev_pos -= 10
-            elif self.__operation == self.operation.g2p:
-                if self.mDev_pos < self.new_pos:
-                    self.mDev_pos += 10
-                elif self.mDev_pos > self.new_pos:
-                    self.mDev_pos -= 10
-                else:
-                    print_log (f'<<< WatchDogStub MAXON reached position on  port = {self.mDev_port}, dev = {self.devName}, position = {self.mDev_pos}')
-                    break
-            time.sleep(0.1)
+        self.__wd_last = time.time()
+        self.__wd_remainder = 0.0
+
+    def mDev_watch_dog_step(self) -> int | None:      # one watchdog tick. None - monitoring completed
+        if self.__stop_motion.is_set():
+            return None
+        _now = time.time()
+        self.__wd_remainder += MAXON_Motor_Stub.STUB_SPEED * (_now - self.__wd_last)      # position advances with time, not with ticks
+        self.__wd_last = _now
+        _step = int(self.__wd_remainder)
+        self.__wd_remainder -= _step
+        if self.__operation == self.operation.fw:
+                self.mDev_pos += _step
+        elif self.__operation == self.operation.bw:
+            self.mDev_pos -= _step
+        elif self.__operation == self.operation.g2p:
+            if self.mDev_pos < self.new_pos:
+                self.mDev_pos = min(self.mDev_pos + _step, self.new_pos)
+            elif self.mDev_pos > self.new_pos:
+                self.mDev_pos = max(self.mDev_pos - _step, self.new_pos)
+            else:
+                print_log (f'<<< WatchDogStub MAXON reached position on  port = {self.mDev_port}, dev = {self.devName}, position = {self.mDev_pos}')
+                return None
+        return self.mDev_pos
 
-        self.devNotificationQ.put(True)
+    def __wd_interval(self) -> float:
+        return self.poll_policy.interval(active = True, 
+                            pos_error = (self.new_pos - self.mDev_pos) if self.__operation == self.operation.g2p else None)
+
+    def _watch_dog_end(self):
         self.__operation = self.operation.stop
         print_log (f'<<< WatchDogStub MAXON stopped on  port = {self.mDev_port}, dev = {self.devName}, position = {self.mDev_pos}')
-        return
+        self.devNotificationQ.put(True)
+        self.__wd_active = False
+        self._complete(True)
+
+    def _complete(self, success:bool):
+        _on_complete, self.on_complete = self.on_complete, None
+        if _on_complete is None:
+            return
+        try:
+            _on_complete(success)
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'MAXON Stub completion callback failed on port = {self.mDev_port}. Exception: {ex} of type: {type(ex)}.')
+
+    def __reactor_step(self):
+        if self.mDev_watch_dog_step() is not None:
+            return self.mDev_pos
+        self._watch_dog_end()
+        return stationReactor.DONE
     
 
     def  mDev_watch_dog(self):
         # self.start_time = time.time()
+        self.__wd_active = True
+        if self.reactor is not None:
+            self._watch_dog_begin()
+            self.wd = self.reactor.add_job(f'maxon-{self.mDev_port}', self.__reactor_step, self.__wd_interval)
+            return self.wd
         self.wd = threading.Thread(target=self.mDev_watch_dog_thread, daemon=True)
         self.wd.start()
         return self.wd
@@ -1575,8 +2172,17 @@ class MAXON_Motor_Stub:
         self.actual_current = 12
         return True
 
-    def go2pos(self, new_position, velocity = None, acceleration = None, deceleration = None, stall=None)->bool:
+    def mDev_quick_stop(self, requested:float = None)-> bool:
+        if requested is not None:
+            self.quick_stop_latency = time.perf_counter() - requested
+        self.__stop_motion.set()
+        self.mDev_vel = 0
+        return True
+
+    def go2pos(self, new_position, velocity = None, acceleration = None, deceleration = None, stall=None,
+               on_complete:Callable[[bool], None] = None)->bool:
         print_log(f'MAXON Stub GO2POS {new_position} velocity = {velocity}, dev = {self.devName}, port = {self.mDev_port}')
+        self.on_complete = on_complete
         self.__operation = self.operation.g2p
         self.new_pos = new_position
         self.actual_current = 320
@@ -1587,8 +2193,10 @@ class MAXON_Motor_Stub:
     def mDev_stall(self)->bool:
         return True
 
-    def  mDev_forward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool=None, stall = None)->bool:
+    def  mDev_forward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool=None, stall = None,
+                    on_complete:Callable[[bool], None] = None)->bool:
         print_log(f'MAXON Stub FORWARD velocity = {velocity}, dev = {self.devName}, port = {self.mDev_port}, timeout={timeout}')
+        self.on_complete = on_complete
         self.__operation = self.operation.fw
         self.actual_current = 320
         self.mDev_watch_dog()
@@ -1596,8 +2204,10 @@ class MAXON_Motor_Stub:
         self.rpm = int(velocity) if velocity else 2000
         return True
     
-    def  mDev_backward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool = None, stall = None)-> bool:
+    def  mDev_backward(self, velocity = None, acceleration = None, deceleration = None, timeout=None, polarity:bool = None, stall = None,
+                    on_complete:Callable[[bool], None] = None)-> bool:
         print_log(f'MAXON Stub BACKWARD velocity = {velocity}, dev = {self.devName}, port = {self.mDev_port}, timeout={timeout}')
+        self.on_complete = on_complete
         self.__operation = self.operation.bw                    # no need watchdog for zero speed
         self.actual_current = 320
         self.mDev_watch_dog()
@@ -26,9 +26,10 @@ from queue import Queue
 
 from servo_motor import servoMotor, servoParameters
 from serial_scale import serialScale
+from station_reactor import stationReactor
 
 from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace, print_trace, \
-                        print_call_stack
+                        print_call_stack, enableAsyncLogging
 
 def qt_message_handler(mode: QtMsgType, context, message: str):
     # logger = logging.getLogger("QML")
@@ -75,6 +76,8 @@ class AppInfo(QObject):
 # ─── Application run ─────────────────────────────────────────────────────
 if __name__ == "__main__":
 
+    enableAsyncLogging(level=None)              # console/file output rendered by the log listener thread,
+                                                # the root level set by common_utils (DEBUG) is kept
     qInstallMessageHandler(qt_message_handler)  # Install custom Qt message handler
     
 
@@ -84,8 +87,9 @@ if __name__ == "__main__":
     engine = QQmlApplicationEngine()        # Create QML application engine
 
     # Register context objects
-    motor_ctrl = servoMotor()                   # Create motor controller object
-    scale = serialScale()                    # Create scale controller object  
+    reactor = stationReactor('station')         # one I/O thread for all the station devices watchdogs
+    motor_ctrl = servoMotor(reactor=reactor)    # Create motor controller object
+    scale = serialScale(reactor=reactor)     # Create scale controller object  
     appInfo = AppInfo()                      # Create application info object
 
     # Set context properties for QML
@@ -96,6 +100,7 @@ if __name__ == "__main__":
     # Connect aboutToQuit signal to cleanup functions 
     app.aboutToQuit.connect(motor_ctrl.stopMotor)
     app.aboutToQuit.connect(scale.disconnect)
+    app.aboutToQuit.connect(reactor.stop)
 
     # Load QML file and start the application
     qml_file = Path(__file__).parent / "panelQML.qml"
@@ -0,0 +1,51 @@
+from __future__ import annotations
+from dataclasses import dataclass
+
+
+#
+#   Adaptive watchdog polling.
+#   Devices poll slowly when idle, at the normal rate while active (motion / value changes) and fast
+#   close to the target position, to the current limit or to a timeout deadline.
+#   Every device owns its own policy instance (see MAXON_Motor.poll_policy, servoMotor, serialScale, WLCscale)
+#
+
+MIN_POLL_INTERVAL = 0.001                   # sec
+
+@dataclass
+class pollPolicy:
+    idle: float = 0.5                       # sec, nothing happens
+    active: float = 0.1                     # sec, motion in progress / polled value changes
+    near: float = 0.02                      # sec, close to the target, the current limit or the deadline
+    position_band: int = 5000               # inc, |target - position| treated as close to the target
+    current_band: float = 0.8               # part of the current limit treated as close to the limit
+    deadline_band: float = 0.5              # sec, time left to the deadline treated as close to the deadline
+    change_band: float = 0.0                # minimal change of the polled value treated as activity
+    hold: float = 2.0                       # sec, stay active after the last activity
+
+    @staticmethod
+    def fixed(period:float) -> pollPolicy:   # constant rate (legacy behavior)
+        return pollPolicy(idle=period, active=period, near=period)
+
+    def interval(self, active:bool, pos_error:float = None, current:float = None, current_limit:float = None,
+                 time_left:float = None) -> float:
+        if not active:
+            return self.idle
+
+        _interval = self.active
+        if pos_error is not None and abs(pos_error) <= self.position_band:
+            _interval = self.near
+        elif current is not None and current_limit and abs(current) >= self.current_band * abs(current_limit):
+            _interval = self.near
+
+        if time_left is not None:
+            if time_left <= self.deadline_band:
+                _interval = min(_interval, self.near)
+            _interval = min(_interval, time_left)           # never sleep past the deadline
+
+        return max(_interval, MIN_POLL_INTERVAL)
+
+    def changed(self, new_value:float, old_value:float) -> bool:
+        return abs(new_value - old_value) > self.change_band
+
+    def is_active(self, last_activity:float, now:float) -> bool:
+        return now - last_activity <= self.hold
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import threading
+from collections import namedtuple
+import numpy as np
+
+
+#
+#   Fixed capacity ring buffer of timestamped scale samples (monotonic time, weight, flags).
+#   Every sample is written twice (at i and i + capacity), so any window of up to capacity
+#   latest samples is a contiguous slice: queries return numpy views, no copy.
+#   Views stay valid until capacity more samples are appended - copy them to keep longer.
+#   Single writer (scale watchdog / reader), any number of readers.
+#
+
+FLAG_STABLE = 0x01                          # scale reported a stable weight
+
+class sampleBuffer:
+    window = namedtuple("window", ["time", "weight", "flags"])
+
+    def __init__(self, capacity:int = 65536):   # ~24 min at the WLC native rate
+        self.capacity:int = capacity
+        self.__time = np.zeros(2 * capacity, dtype=np.float64)
+        self.__weight = np.zeros(2 * capacity, dtype=np.float64)
+        self.__flags = np.zeros(2 * capacity, dtype=np.uint8)
+        self.__count:int = 0                    # samples appended since creation / clear
+        self.__run_start:int | None = None      # sample counter at the run start
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self.__count, self.capacity)
+
+    def __repr__(self):
+        return f'sampleBuffer({len(self)}/{self.capacity}, total={self.__count})'
+
+    @property
+    def total(self) -> int:                     # samples appended, including overwritten ones
+        return self.__count
+
+    def clear(self):
+        with self.__lock:
+            self.__count = 0
+            self.__run_start = None
+
+    def append(self, t:float, weight:float, flags:int = 0):
+        with self.__lock:
+            _i = self.__count % self.capacity
+            _j = _i + self.capacity
+            self.__time[_i] = self.__time[_j] = t
+            self.__weight[_i] = self.__weight[_j] = weight
+            self.__flags[_i] = self.__flags[_j] = flags
+            self.__count += 1
+
+    def extend(self, t:np.ndarray, weight:np.ndarray, flags:np.ndarray | int = 0):
+        t = np.asarray(t, dtype=np.float64)
+        weight = np.asarray(weight, dtype=np.float64)
+        flags = np.broadcast_to(np.asarray(flags, dtype=np.uint8), t.shape)
+        with self.__lock:
+            if t.size > self.capacity:          # older samples would be overwritten anyway
+                _skip = t.size - self.capacity
+                t, weight, flags = t[_skip:], weight[_skip:], flags[_skip:]
+                self.__count += _skip
+            _done = 0
+            while _done < t.size:
+                _i = self.__count % self.capacity
+                _n = min(t.size - _done, self.capacity - _i)
+                for _buf, _src in ((self.__time, t), (self.__weight, weight), (self.__flags, flags)):
+                    _buf[_i:_i + _n] = _src[_done:_done + _n]
+                    _buf[_i + self.capacity:_i + self.capacity + _n] = _src[_done:_done + _n]
+                self.__count += _n
+                _done += _n
+
+    def mark_run_start(self):                   # next appended sample starts a run
+        with self.__lock:
+            self.__run_start = self.__count
+
+    def last_n(self, n:int) -> sampleBuffer.window:
+        with self.__lock:
+            return self.__window(min(n, self.__count, self.capacity))
+
+    def last_seconds(self, seconds:float, now:float = None) -> sampleBuffer.window:
+                                                # samples not older than seconds before now (default - the latest sample)
+        with self.__lock:
+            _all = self.__window(min(self.__count, self.capacity))
+            if not len(_all.time):
+                return _all
+            _from = (_all.time[-1] if now is None else now) - seconds
+            return self.__slice(_all, int(np.searchsorted(_all.time, _from, side='left')))
+
+    def since(self, t:float) -> sampleBuffer.window:
+        with self.__lock:
+            _all = self.__window(min(self.__count, self.capacity))
+            return self.__slice(_all, int(np.searchsorted(_all.time, t, side='left')))
+
+    def since_run_start(self) -> sampleBuffer.window:   # limited by capacity for long runs
+        with self.__lock:
+            if self.__run_start is None:
+                return self.__window(0)
+            return self.__window(min(self.__count - self.__run_start, self.capacity))
+
+    def latest(self) -> tuple[float, float, int] | None:
+        with self.__lock:
+            if not self.__count:
+                return None
+            _i = (self.__count - 1) % self.capacity
+            return float(self.__time[_i]), float(self.__weight[_i]), int(self.__flags[_i])
+
+    def __window(self, n:int) -> sampleBuffer.window:   # n latest samples, contiguous views
+        _end = self.__count % self.capacity + self.capacity
+        _start = _end - n
+        return sampleBuffer.window(self.__time[_start:_end], self.__weight[_start:_end], self.__flags[_start:_end])
+
+    @staticmethod
+    def __slice(win:sampleBuffer.window, start:int) -> sampleBuffer.window:
+        return sampleBuffer.window(win.time[start:], win.weight[start:], win.flags[start:])
@@ -0,0 +1,138 @@
+from __future__ import annotations
+import struct
+import threading
+import time
+from typing import Callable, Iterator
+
+from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace
+
+
+#
+#   Raw scale serial capture and replay.
+#   Capture file: header (magic, start monotonic time f64), then one record per received chunk:
+#   time since the previous record in microseconds (u32), chunk length (u16), raw bytes.
+#   Replay feeds the chunks back into WLCscale._feed_bytes (the same splitting, parsing and filtering)
+#   at the recorded pace (speed 1.0, 2.0, ...) or as fast as possible (speed 0) with the recorded timestamps.
+#
+
+CAPTURE_MAGIC = b'WLCCAP1\n'
+_HEADER = struct.Struct('<8sd')
+_RECORD = struct.Struct('<IH')
+_MAX_CHUNK = 0xFFFF
+_MAX_DELTA_US = 0xFFFFFFFF
+
+class scaleCapture:                         # capture writer, thread safe
+    def __init__(self, path:str):
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__file = open(path, 'wb')      # buffered, flushed on close
+        self.__start:float | None = None
+        self.__last_us:int = 0
+        self.records:int = 0
+        self.bytes:int = 0
+        print_log(f'Scale capture started: {path}')
+
+    def __repr__(self):
+        return f'scaleCapture({self.path}, records={self.records}, bytes={self.bytes})'
+
+    def write(self, t:float, data:bytes):
+        with self.__lock:
+            if self.__file is None:
+                return
+            if self.__start is None:
+                self.__start = t
+                self.__file.write(_HEADER.pack(CAPTURE_MAGIC, t))
+            _us = max(int((t - self.__start) * 1e6), self.__last_us)
+            for _i in range(0, len(data), _MAX_CHUNK):
+                _chunk = data[_i:_i + _MAX_CHUNK]
+                self.__file.write(_RECORD.pack(min(_us - self.__last_us, _MAX_DELTA_US), len(_chunk)))
+                self.__file.write(_chunk)
+                self.__last_us = _us
+                self.records += 1
+            self.bytes += len(data)
+
+    def close(self):
+        with self.__lock:
+            if self.__file is None:
+                return
+            self.__file.close()
+            self.__file = None
+        print_log(f'Scale capture closed: {self}')
+
+
+def readCapture(path:str) -> Iterator[tuple[float, bytes]]:     # (monotonic time at capture, raw bytes)
+    with open(path, 'rb') as _file:
+        _header = _file.read(_HEADER.size)
+        if len(_header) < _HEADER.size:
+            return
+        _magic, _t = _HEADER.unpack(_header)
+        if _magic != CAPTURE_MAGIC:
+            raise ValueError(f'{path} is not a scale capture file')
+        while True:
+            _record = _file.read(_RECORD.size)
+            if len(_record) < _RECORD.size:
+                return
+            _delta_us, _length = _RECORD.unpack(_record)
+            _data = _file.read(_length)
+            if len(_data) < _length:
+                print_warn(f'Scale capture {path} is truncated')
+                return
+            _t += _delta_us / 1e6
+            yield _t, _data
+
+
+class scaleReplay:
+    def __init__(self, path:str, feed:Callable[[bytes, float], int]):
+                                            # feed - WLCscale._feed_bytes or compatible (data, t)
+        self.path = path
+        self.feed = feed
+        self.__stop = threading.Event()
+        self.chunks:int = 0
+        self.samples:int = 0
+
+    def __repr__(self):
+        return f'scaleReplay({self.path}, chunks={self.chunks}, samples={self.samples})'
+
+    def stop(self):
+        self.__stop.set()
+
+    def run(self, speed:float = 1.0, retime:bool = None) -> int:
+                                            # speed 0 - as fast as possible; retime - samples get replay time
+                                            # (default for paced replay), otherwise the captured times
+        retime = speed > 0 if retime is None else retime
+        self.__stop.clear()
+        self.chunks = self.samples = 0
+        _t0:float | None = None
+        _replay_t0 = time.monotonic()
+        _start = time.perf_counter()
+        for _t, _data in readCapture(self.path):
+            if self.__stop.is_set():
+                break
+            if _t0 is None:
+                _t0 = _t
+            if speed > 0:
+                _wait = _replay_t0 + (_t - _t0) / speed - time.monotonic()
+                if _wait > 0 and self.__stop.wait(_wait):
+                    break
+            _n = self.feed(_data, _replay_t0 + (_t - _t0) / (speed if speed > 0 else 1.0) if retime else _t)
+            self.chunks += 1
+            self.samples += _n or 0
+        print_log(f'Scale replay {self.path}: {self.chunks} chunks, {self.samples} samples in {time.perf_counter() - _start:.3f} sec, speed = {speed or "max"}')
+        return self.samples
+
+
+#  =====  REPLAY  =====
+
+if __name__ == "__main__":
+    import sys
+    from WLCscale import WLCscale
+
+    if len(sys.argv) < 2:
+        print_err(f'Usage: python {sys.argv[0]} <capture file> [speed (0 - max)]')
+        sys.exit(1)
+    scale = WLCscale(f'replay:{sys.argv[1]}')          # not connected, fed by the replay
+    replay = scaleReplay(sys.argv[1], scale._feed_bytes)
+    replay.run(speed=float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)
+    samples = scale.drain_samples()
+    if samples:
+        print_log(f'First sample {samples[0]}, last sample {samples[-1]}, final weight = {scale.weight}')
@@ -0,0 +1,181 @@
+from __future__ import annotations
+import os
+import sys
+import threading
+import weakref
+from collections import namedtuple
+from typing import Callable
+
+import serial.tools.list_ports
+
+from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace
+
+
+#
+#   Scale serial ports discovery.
+#   The matched ports are cached; the cache is filled by a background scan and then updated incrementally:
+#   on Linux tty devices appearing / disappearing in /sys/class/tty are checked one by one, elsewhere
+#   the ports are rescanned periodically. Changes are published as added / removed events,
+#   ports() never scans and never blocks.
+#
+
+SYS_TTY = '/sys/class/tty'
+
+class scaleDiscovery:
+    portEvent = namedtuple("portEvent", ["event", "port"])
+    ADDED = 'added'
+    REMOVED = 'removed'
+    WATCH_PERIOD = 1.0                      # sec, /sys/class/tty check period
+    RESCAN_PERIOD = 5.0                     # sec, full rescan period where hotplug can't be watched
+
+    def __init__(self, match:Callable[[object], bool], scan:Callable[[], list[str]] = None, name:str = 'scales'):
+                                            # match - ListPortInfo filter, scan - full list provider replacing
+                                            # the serial ports enumeration (stubs), no hotplug watching then
+        self.name = name
+        self.match = match
+        self.scan = scan
+        self.__ports:dict[str, str] = dict()           # device -> description
+        self.__lock = threading.Lock()
+        self.__subscribers:list[Callable[[], Callable | None]] = list()    # weak references to bound methods
+        self.__ready = threading.Event()               # first scan completed
+        self.__stop = threading.Event()
+        self.__rescan = threading.Event()              # full rescan requested
+        self.__thread:threading.Thread | None = None
+        self.__watch_sysfs:bool = scan is None and sys.platform.startswith('linux') and os.path.isdir(SYS_TTY)
+
+    def __repr__(self):
+        return f'scaleDiscovery({self.name}, ports={self.ports()})'
+
+    def start(self) -> bool:
+        with self.__lock:
+            if self.__thread is not None and self.__thread.is_alive():
+                return True
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__run, name=f'discovery-{self.name}', daemon=True)
+            self.__thread.start()
+        return True
+
+    def stop(self):
+        self.__stop.set()
+        self.__rescan.set()
+
+    def ports(self) -> list[str]:           # cached ports, never blocks
+        with self.__lock:
+            return sorted(self.__ports)
+
+    def is_ready(self) -> bool:
+        return self.__ready.is_set()
+
+    def wait_ready(self, timeout:float = None) -> bool:
+        return self.__ready.wait(timeout)
+
+    def refresh(self):                      # full rescan in the background
+        self.start()
+        self.__rescan.set()
+
+    def subscribe(self, callback:Callable[[scaleDiscovery.portEvent], None]):
+                                            # bound methods are kept by weak reference, the subscription
+                                            # doesn't keep the controller alive
+        with self.__lock:
+            if callback in self.__callbacks():
+                return
+            self.__subscribers.append(weakref.WeakMethod(callback) if hasattr(callback, '__self__') 
+                                      else (lambda _cb=callback: _cb))
+
+    def unsubscribe(self, callback:Callable[[scaleDiscovery.portEvent], None]):
+        with self.__lock:
+            self.__subscribers = [_ref for _ref in self.__subscribers if _ref() not in (None, callback)]
+
+    def __callbacks(self) -> list[Callable[[scaleDiscovery.portEvent], None]]:
+        return [_cb for _cb in (_ref() for _ref in self.__subscribers) if _cb is not None]
+
+    def __run(self):
+        print_log(f'Scale discovery {self.name} started, hotplug watching = {self.__watch_sysfs}')
+        _ttys:set[str] = self.__sysfs_ttys()
+        self.__full_scan()
+        self.__ready.set()
+        _period = scaleDiscovery.WATCH_PERIOD if self.__watch_sysfs else scaleDiscovery.RESCAN_PERIOD
+        while not self.__stop.is_set():
+            if self.__rescan.wait(_period):
+                self.__rescan.clear()
+                if self.__stop.is_set():
+                    break
+                _ttys = self.__sysfs_ttys()
+                self.__full_scan()
+                continue
+            try:
+                if not self.__watch_sysfs:
+                    self.__full_scan()
+                    continue
+                _current = self.__sysfs_ttys()
+                if _current == _ttys:
+                    continue
+                for _tty in sorted(_current - _ttys):
+                    self.__check_tty(_tty)
+                for _tty in sorted(_ttys - _current):
+                    self.__remove(f'/dev/{_tty}')
+                _ttys = _current
+            except Exception as ex:
+                exptTrace(ex)
+                print_err(f'Scale discovery {self.name} failed. Exception: {ex} of type: {type(ex)}')
+        print_log(f'Scale discovery {self.name} stopped')
+
+    def __sysfs_ttys(self) -> set[str]:
+        if not self.__watch_sysfs:
+            return set()
+        try:
+            return set(os.listdir(SYS_TTY))
+        except OSError as ex:
+            print_warn(f'Scale discovery {self.name} can not watch {SYS_TTY}: {ex}')
+            return set()
+
+    def __check_tty(self, tty:str):         # a new tty device, only this one is queried
+        try:
+            from serial.tools.list_ports_linux import SysFS
+            _info = SysFS(f'/dev/{tty}')
+        except Exception as ex:
+            print_DEBUG(f'Scale discovery {self.name}: {tty} info not available: {ex}')
+            return
+        if self.match(_info):
+            self.__add(_info.device, _info.description)
+
+    def __full_scan(self):
+        try:
+            if self.scan is not None:
+                _found = {_port: _port for _port in self.scan()}
+            else:
+                _found = {_p.device: _p.description for _p in serial.tools.list_ports.comports() if self.match(_p)}
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Scale discovery {self.name} scan failed. Exception: {ex} of type: {type(ex)}')
+            return
+        for _port in self.ports():
+            if _port not in _found:
+                self.__remove(_port)
+        for _port, _description in _found.items():
+            self.__add(_port, _description)
+
+    def __add(self, port:str, description:str):
+        with self.__lock:
+            if port in self.__ports:
+                return
+            self.__ports[port] = description
+        print_log(f'Scale discovery {self.name}: scale port {port} added ({description})')
+        self.__publish(scaleDiscovery.portEvent(scaleDiscovery.ADDED, port))
+
+    def __remove(self, port:str):
+        with self.__lock:
+            if self.__ports.pop(port, None) is None:
+                return
+        print_log(f'Scale discovery {self.name}: scale port {port} removed')
+        self.__publish(scaleDiscovery.portEvent(scaleDiscovery.REMOVED, port))
+
+    def __publish(self, event:scaleDiscovery.portEvent):
+        with self.__lock:
+            _subscribers = self.__callbacks()
+        for _subscriber in _subscribers:
+            try:
+                _subscriber(event)
+            except Exception as ex:
+                exptTrace(ex)
+                print_err(f'Scale discovery {self.name}: subscriber {_subscriber} failed on {event}. Exception: {ex}')
@@ -2,10 +2,17 @@ from PySide6.QtCore import QObject, Signal, Property, Slot, QUrl
 from WLCscale import WLCscale, WLCscaleStub
 import threading    
 import time
-from collections import deque
+import random
+from poll_policy import pollPolicy
+from station_reactor import stationReactor, reactorJob
+from sample_buffer import sampleBuffer, FLAG_STABLE
+from flow_estimator import flowEstimators
+from weight_filters import filterChain
+from async_scale import asyncScaleHub
+from scale_discovery import scaleDiscovery
 
 from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace, print_trace, \
-                        print_call_stack
+                        print_call_stack, debug_enabled
 
 # Scale = WLCscaleStub  # For testing without actual scale, replace with WLCscale for real scale
 Scale = WLCscale         # For production
@@ -17,30 +24,69 @@ class serialScale(QObject):
     rocChanged = Signal()
     connectionChanged = Signal(bool)
     currentPortChanged = Signal()   # Signal emitted when current port changes (for compatibility)
+    availablePortsChanged = Signal()
+    scaleAdded = Signal(str)        # scale port plugged in
+    scaleRemoved = Signal(str)      # scale port unplugged
+    staleChanged = Signal(bool)     # no valid frame within stale_age / frames again
+    dataAgeChanged = Signal()
     # _ports: list[str] | None = None
     _scales: list[str] | None = None
+    discovery:scaleDiscovery | None = None  # scale ports discovery, shared by all the scale controllers
+    HISTORY_CAPACITY = 65536                # samples kept in the history buffer (~24 min at the WLC native rate)
+    FLOW_WINDOWS = (1.0, 10.0, 60.0)        # sec, flow rate estimation windows (short / mid / long)
+    STALE_AGE = 2.0                         # sec, data older than this is stale
+    STALE_RECONNECT = 10.0                  # sec, an open but silent port is reopened after
+    RECONNECT_MIN = 0.5                     # sec, first reconnect delay
+    RECONNECT_MAX = 30.0                    # sec, reconnect delay limit
+    RECONNECT_JITTER = 0.2                  # +/- part of the delay, spreads reconnects of several scales
 
     @staticmethod
-    def listScales() -> list[str]:
-        serialScale._scales = Scale.listScales()
+    def _discovery() -> scaleDiscovery:
+        if serialScale.discovery is None:
+            serialScale.discovery = scaleDiscovery(match=WLCscale.is_scale_port, 
+                                                   scan=None if Scale is WLCscale else Scale.listScales)
+            serialScale.discovery.start()               # first scan runs in background
+        return serialScale.discovery
+
+    @staticmethod
+    def listScales() -> list[str]:                      # discovered ports, never scans
+        serialScale._scales = serialScale._discovery().ports()
         return serialScale._scales
 
-    def __init__(self, serial_port: str = None, poll_interval: float = 0.1, parent=None):
+    def __init__(self, serial_port: str = None, poll_interval: float = 0.1, parent=None, poll_policy:pollPolicy = None,
+                 reactor:stationReactor = None, streaming:bool = False, flow_windows:tuple[float, ...] = None,
+                 filters:filterChain | list[tuple[str, dict]] = None, hub:asyncScaleHub = None,
+                 stale_age:float = None, stale_reconnect:float = None):
         super().__init__(parent)
+        self.stale_age:float = stale_age if stale_age is not None else serialScale.STALE_AGE
+        self.stale_reconnect:float = stale_reconnect if stale_reconnect is not None else serialScale.STALE_RECONNECT
+        self.__stale:bool = False                       # connection supervisor state
+        self.__connected_at:float = time.monotonic()    # last (re)connection time
+        self.__reconnect_at:float = 0.0                 # next reconnect attempt time
+        self.__reconnect_delay:float = serialScale.RECONNECT_MIN
+        self.reconnect_attempts:int = 0                 # attempts since the data stopped
+        self.hub:asyncScaleHub | None = hub             # asyncio hub reading the scale port, samples are pushed by the hub
+        self.reactor:stationReactor | None = reactor    # station reactor running the watchdogs, None - own threads
+        self.poll_policy:pollPolicy = poll_policy if poll_policy is not None \
+                                        else pollPolicy(idle=max(poll_interval, 0.5), active=poll_interval, near=poll_interval)
+                                                        # UI updates slow down while the weight is stable
         # self._port = serial_port if serial_port else (serialScale.listScales()[0] if serialScale.listScales() else "")
         self._weight = 0.0
-        self.__last_weight = 0                          # For calculating rate of change (ROC)
-        self.__last_time = time.time()                  # For calculating rate of change (ROC)
-        self.__last_roc = 0.0                            # Store last ROC value to return if time difference is zero
         self._connected: bool = False                       # Connection status
         self._poll_interval = poll_interval                     # Polling interval for watchdog
+        self.__scale_args:dict = dict(streaming=streaming,     # scale reader parameters (scale may be opened on hotplug)
+                                      filters=filterChain.from_config(filters) if isinstance(filters, list) else filters)
         self._scale:Scale | None = None             # Scale instance
-        self.__wd:threading.Thread | None = None                  # Watchdog thread
+        self.__open_lock:threading.Lock = threading.Lock()  # the scale is opened by __init__ or by the discovery thread
+        self.__wd:threading.Thread | reactorJob | None = None     # Watchdog thread (or reactor job)
+        self.__wd_last_weight:float = 0.0               # watchdog: last published weight
+        self.__wd_last_change:float = time.monotonic()  # watchdog: last weight change time
         self.__wd_stop:threading.Event = threading.Event() # Event to stop watchdog thread
-        # Queue for smoothing delta (up to 10 samples)
-        self.delta_history = deque(maxlen=10)
+        self.flow:flowEstimators = flowEstimators(flow_windows if flow_windows else serialScale.FLOW_WINDOWS)
+                                                        # least-squares weight slopes, ROC is the shortest window
         self.smooth_delta = 0
-        self.delta_history.clear()
+        self.history:sampleBuffer = sampleBuffer(serialScale.HISTORY_CAPACITY)
+                                                        # every scale sample, shared by ROC, charts, logging and dosing
 
         self.__wd_stop.clear()  
         self._watch_dog_run()
@@ -53,33 +99,59 @@ class serialScale(QObject):
         # self.counterChanged.connect(self.rocChanged)
 
 
-        if serialScale._scales is None:
-            print_log('Listing scales for the first time in serialScale init')
-            serialScale._scales = serialScale.listScales()
-
-
-        self._port = serial_port if serial_port else (serialScale._scales[0] if serialScale._scales else "")
+        self._port = serial_port if serial_port else ""
+        serialScale._discovery().subscribe(self.__on_port_event)
+                                                        # subscribed before the ports snapshot, a port added by the
+                                                        # first (background) scan in between is not missed
+        serialScale.listScales()
 
         print_log(f'Available scales: {serialScale._scales}, requested port: {self._port}')
 
-        if not self._port:
-            print_err('No serial port specified and no scales found')
+        if self._port and self._port not in serialScale._scales:
+            if serialScale.discovery.is_ready():
+                serialScale.discovery.unsubscribe(self.__on_port_event)
+                raise ValueError(f'Serial scale with port {self._port} not found among available ports: {serialScale._scales}')
+            print_warn(f'Serial scale port {self._port} is not discovered yet, opening anyway')
+
+        if not self._port and not serialScale._scales:
+            print_warn('No serial port specified and no scales found yet, the first discovered scale will be opened')
             return
 
-        if self._port not in serialScale._scales:
-            raise ValueError(f'Serial scale with port {self._port} not found among available ports: {serialScale._scales}')
-        
-        if self._port:
-            self._scale = Scale(self._port, poll_interval)
-        else:
-            raise ValueError('No serial port specified for serialScale')
+        self.__open_port(self._port if self._port else serialScale._scales[0])
+
+    def __open_port(self, port:str) -> bool:            # init or discovery thread, the scale is opened once
+        with self.__open_lock:
+            if self._scale is not None or self._port not in ("", port):
+                return False
+            self._port = port
+            self.__open_scale()
+        return True
+
+    def __open_scale(self):
+        self._scale = Scale(self._port, self._poll_interval, reactor=self.reactor, hub=self.hub, **self.__scale_args)
+                                                        # own reader policy, same rates
+        if self.hub is not None:
+            self._scale.subscribe(self.__on_samples)
         
         if self._port and self._scale is not None:
             self.connect( ) 
 
         self._connected = self.isConnected
 
+    def __on_port_event(self, event:scaleDiscovery.portEvent):     # discovery thread
+        serialScale._scales = serialScale.discovery.ports()
+        if event.event == scaleDiscovery.ADDED:
+            self.scaleAdded.emit(event.port)
+            if self._scale is None and self._port in ("", event.port) and self.__open_port(event.port):
+                print_log(f'Opened discovered scale on port {event.port}')
+                self.currentPortChanged.emit()
+        else:
+            self.scaleRemoved.emit(event.port)
+        self.availablePortsChanged.emit()
+
     def __del__(self):
+        if serialScale.discovery is not None:
+            serialScale.discovery.unsubscribe(self.__on_port_event)
         self.disconnect()
 
     def __repr__(self):
@@ -91,13 +163,14 @@ class serialScale(QObject):
     
     @Property(str, notify=currentPortChanged)
     def currentSerialPort(self) -> str:
-        print_DEBUG(f'Getting current serial port: {self._port}')
+        if debug_enabled(): print_DEBUG(f'Getting current serial port: {self._port}')
         return self._port if self._port else ""
 
     @currentSerialPort.setter
     def currentSerialPort(self, port: str):
-        print_DEBUG(f'Setting current serial port from {self._port} to {port}')
-        self.delta_history.clear()
+        if debug_enabled(): print_DEBUG(f'Setting current serial port from {self._port} to {port}')
+        self.flow.reset()
+        self.history.clear()
 
         if port != self._port:
             self._port = port
@@ -106,9 +179,9 @@ class serialScale(QObject):
             self.currentPortChanged.emit()
 
     # @Property(list, constant=True)
-    @Property(list, notify=currentPortChanged)
+    @Property(list, notify=availablePortsChanged)
     def availablePorts(self):              # list of available serial ports
-        print_DEBUG(f'Getting available serial ports: {serialScale._scales}')
+        if debug_enabled(): print_DEBUG(f'Getting available serial ports: {serialScale._scales}')
         return serialScale._scales if serialScale._scales is not None else []
     
 
@@ -121,43 +194,39 @@ class serialScale(QObject):
                                                                     # (e.g., keep in grams, convert litters, etc.)
 
 
-    def calcilateSmoothROC(self):
-        __time = time.time()
-        new_weight = self._scale.weight if self._scale else 0.0  # Get current weight, if scale is not available, assume weight is zero 
-                                                                # (or we could choose to return None or some error value)
-        
-        if new_weight== 0:          # If weight is zero, we can assume that the scale is either not connected or not reading properly, 
-                                    # so we return 0 for ROC to avoid misleading values.
-            return 
-        
-        _roc:float = 0
-        if __time != self.__last_time:          # Avoid division by zero 
-            _roc = (new_weight - self.__last_weight) / (__time - self.__last_time) 
+    @Property(bool, notify=weightChanged)
+    def isStable(self) -> bool:                     # stability flag of the last frame reported by the scale
+        _latest = self.history.latest()
+        return bool(_latest[2] & FLAG_STABLE) if _latest is not None else False
 
-        else:
-            return 
-
-        self.delta_history.append(_roc)
-
-        self.smooth_delta = sum(self.delta_history) / len(self.delta_history)   # Simple moving average for smoothing, adjust as needed 
-                                                                                # (e.g., weighted average, exponential smoothing, etc.)
-
-        # print_DEBUG(f'ROC = {_roc}, {new_weight}-{self.__last_weight} = {new_weight - self.__last_weight} gr, time_diff={__time - self.__last_time if self.__last_time else "N/A"} P={self.smooth_delta}, len = {len(self.delta_history)}')
-
-        self.__last_weight = new_weight 
-        self.__last_time = __time
-        self.__last_roc = _roc
 
+    def calcilateSmoothROC(self):
+        self.smooth_delta = self.flow.rate(0)       # weight units / sec over the shortest window
         return 
 
+    @staticmethod
+    def __per_minute(rate:float) -> float:
+        return rate / 1000  * 60  # Convert to per minute for better readability, adjust as needed
 
+    @Property(float, notify=rocChanged)
+    def ROC(self):
+        return serialScale.__per_minute(self.smooth_delta)
 
+    @Property(float, notify=rocChanged)
+    def flowRateShort(self):                        # FLOW_WINDOWS[0] (1 sec)
+        return serialScale.__per_minute(self.flow.rate(0))
 
-
+    @Property(float, notify=rocChanged)
+    def flowRateMid(self):                          # FLOW_WINDOWS[1] (10 sec)
+        return serialScale.__per_minute(self.flow.rate(1))
 
     @Property(float, notify=rocChanged)
-    def ROC(self):
-        return self.smooth_delta / 1000  * 60  # Convert to per minute for better readability, adjust as needed
+    def flowRateLong(self):                         # FLOW_WINDOWS[2] (60 sec)
+        return serialScale.__per_minute(self.flow.rate(2))
+
+    @Property(list, constant=True)
+    def flowWindows(self):
+        return list(self.flow.windows)
 
 
     @Property(bool, notify=connectionChanged)
@@ -166,6 +235,15 @@ class serialScale(QObject):
         # print_DEBUG(f'Checking connection status for scale on port {self._port}: {self._scale} ->{self._scale.is_connected() if self._scale else False}')
         return self._connected
     
+    @Property(float, notify=dataAgeChanged)
+    def dataAge(self) -> float:                 # sec since the last valid frame, -1 - no frame yet
+        _age = self._scale.data_age() if self._scale else None
+        return _age if _age is not None else -1.0
+
+    @Property(bool, notify=staleChanged)
+    def isStale(self) -> bool:
+        return self.__stale
+
     @Slot(result=bool)
     def disconnect(self)->bool:
         try:
@@ -199,7 +277,7 @@ class serialScale(QObject):
 
     @Slot(str)
     def update_serial_port(self, port: str):
-        print_DEBUG(f'Updating serial port to {self._port}-> {port}')
+        if debug_enabled(): print_DEBUG(f'Updating serial port to {self._port}-> {port}')
         if not self._scale:
             print_err(f'No scale instance to update port to {port}')
             return
@@ -207,9 +285,16 @@ class serialScale(QObject):
         self._scale.update_serial_port(port)
         self.connectionChanged.emit(self.isConnected)
 
+    @Slot()
+    def startRun(self):                             # history.since_run_start() returns samples from now on
+        print_log(f'Run started on scale {self._port}, {self.history}')
+        self.history.mark_run_start()
+
     @Slot(float)
     def update_poll_interval(self, interval: float):
         self._poll_interval = interval
+        self.poll_policy.active = self.poll_policy.near = interval
+        self.poll_policy.idle = max(self.poll_policy.idle, interval)
         if self._scale:
             self._scale.updatePollInterval(interval)
 
@@ -218,12 +303,18 @@ class serialScale(QObject):
         if not self._scale:
             print_err('No scale instance to connect')
             return False
-        self._connected = True
-        self._scale.connect()
-        self.connectionChanged.emit(True)
-        return True
+        if not self._scale.is_connected():          # WLCscale.connect() toggles an open port
+            self._scale.connect()
+        self._connected = self._scale.is_connected()
+        self.__connected_at = time.monotonic()
+        self.connectionChanged.emit(self._connected)
+        return self._connected
     
-    def  _watch_dog_run(self)->threading.Thread:
+    def  _watch_dog_run(self)->threading.Thread | reactorJob:
+        if self.reactor is not None:
+            print_log(f'Running whatch dog job on station reactor {self.reactor.name}')
+            self.__wd = self.reactor.add_job(f'scale-ui-{id(self):x}', self.__reactor_step, self.__poll_interval)
+            return self.__wd
         print_log(f'Running whatch dog thread')         
         self.__wd = threading.Thread(target=self.__watch_dog_thread , daemon=True)
                                                         # Start watchdog thread
@@ -233,23 +324,91 @@ class serialScale(QObject):
     def __watch_dog_thread(self):
         print_log(f'Watch dog thread started')
         while True:
-            try:
-                self.connectionChanged.emit(self.isConnected)                                # Monitor operation status
-
-                if self._scale and self._scale.is_connected():
-                    self.weightChanged.emit(self.weight)
-                else:
-                    if self._scale:                 # connection lost, but we have a scale instance, so we can try to reconnect
-                        print_warn(f'Scale on port {self._port} is not connected or not available. Reconnecting...')
-                        self.connect()
-
-                self.calcilateSmoothROC()  # Update ROC based on current weight and time, this will update self.smooth_delta which is returned by ROC property
-                self.rocChanged.emit()
-                if self.__wd_stop.wait(float(self._poll_interval)):
-                    break
+            self.__watch_dog_step()
+            if self.__wd_stop.wait(self.__poll_interval()):
+                break
                 # time.sleep(self._poll_interval)
-            except Exception as e:
-                print_log(f'Error in watch dog thread: {e}')
-                exptTrace(e)
         
         print_log(f'Watch dog thread stopped with weight={self.weight}')
+
+    def __reactor_step(self):
+        if self.__wd_stop.is_set():
+            print_log(f'Watch dog job stopped with weight={self.weight}')
+            return stationReactor.DONE
+        return self.__watch_dog_step()
+
+    def __poll_interval(self) -> float:
+        return self.poll_policy.interval(active = self.poll_policy.is_active(self.__wd_last_change, time.monotonic()))
+
+    def __watch_dog_step(self) -> float:            # one watchdog tick, returns the published weight
+        try:
+            self.connectionChanged.emit(self.isConnected)                                # Monitor operation status
+
+            if self._scale and self._scale.is_connected():
+                if self.hub is None:
+                    self.__store_samples(self._scale.drain_samples())
+                _weight = self.weight
+                if self.poll_policy.changed(_weight, self.__wd_last_weight):
+                    self.__wd_last_change = time.monotonic()
+                self.__wd_last_weight = _weight
+                self.weightChanged.emit(_weight)
+            else:
+                if self._scale:                 # connection lost, but we have a scale instance, so we can try to reconnect
+                    self.__reconnect()
+            self.__supervise()
+
+            self.calcilateSmoothROC()  # Update ROC based on current weight and time, this will update self.smooth_delta which is returned by ROC property
+            self.rocChanged.emit()
+        except Exception as e:
+            print_log(f'Error in watch dog thread: {e}')
+            exptTrace(e)
+        return self.__wd_last_weight
+
+    def __on_samples(self, samples:list):          # hub loop thread: new samples pushed by the scale
+        self.__store_samples(samples)
+        self.calcilateSmoothROC()
+        self.weightChanged.emit(self.weight)
+        self.rocChanged.emit()
+
+    def __store_samples(self, _samples:list):     # moves the samples received by the scale reader to the history buffer
+        if _samples:
+            _times = [_s.time for _s in _samples]
+            _weights = [_s.weight for _s in _samples]
+            self.history.extend(_times, _weights, [FLAG_STABLE if _s.stable else 0 for _s in _samples])
+            self.flow.extend(_times, _weights)
+
+    def __reconnect(self):                      # reconnect attempts with exponential backoff and jitter
+        _now = time.monotonic()
+        if _now < self.__reconnect_at:
+            return
+        self.reconnect_attempts += 1
+        print_warn(f'Scale on port {self._port} is not connected or not available. Reconnecting, attempt {self.reconnect_attempts}...')
+        if self.connect():
+            print_log(f'Scale on port {self._port} reconnected')
+        self.__reconnect_at = _now + self.__reconnect_delay * random.uniform(1 - serialScale.RECONNECT_JITTER, 
+                                                                             1 + serialScale.RECONNECT_JITTER)
+        self.__reconnect_delay = min(self.__reconnect_delay * 2, serialScale.RECONNECT_MAX)
+
+    def __supervise(self):                      # stale data detection
+        _age = self._scale.data_age() if self._scale else None
+        _now = time.monotonic()
+        _stale = _age is None or _age > self.stale_age
+        if _stale != self.__stale:
+            self.__stale = _stale
+            if _stale:
+                print_warn(f'Scale on port {self._port} data is stale, age = {_age} sec')
+            else:
+                print_log(f'Scale on port {self._port} data is fresh again after {self.reconnect_attempts} reconnect attempts')
+            self.staleChanged.emit(_stale)
+
+        if _age is not None and _age <= self.stale_age:
+            self.__reconnect_delay = serialScale.RECONNECT_MIN    # data flows - backoff reset
+            self.__reconnect_at = 0.0
+            self.reconnect_attempts = 0
+        elif self._scale and self._scale.is_connected() and _now >= self.__reconnect_at \
+                and (_silent := _now - self.__connected_at if _age is None else min(_age, _now - self.__connected_at)) > self.stale_reconnect:
+                                                # silence - since the last frame, or since the (re)connection if later
+            print_warn(f'Scale on port {self._port} is open but silent for {_silent:.1f} sec, reopening')
+            self._scale.disconnect()
+            self.__reconnect()
+        self.dataAgeChanged.emit()
@@ -1,13 +1,18 @@
+from __future__ import annotations
 from queue import Queue
 import threading
+from collections import namedtuple
 from enum import Enum
 from dataclasses import dataclass
 import time
 from maxon import MAXON_Motor, MAXON_Motor_Stub          # Assuming maxon is a module for servo motor control
 from PySide6.QtCore import QObject, Signal, Property, Slot, QUrl
 from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace, print_trace, \
-                        print_call_stack
+                        print_call_stack, debug_enabled
 from shiboken6 import isValid
+from poll_policy import pollPolicy
+from station_reactor import stationReactor, reactorJob
+from command_worker import commandWorker
 
 motServo = MAXON_Motor_Stub # For testing purposes, replace with MAXON_Motor for actual implementation
 # motServo = MAXON_Motor      #   For actual implementation
@@ -31,6 +36,9 @@ class servoMotor(QObject):
         ERROR = "ERROR"
 
     opType = Enum("opType", ["forward", "backward", "go2pos", "stoped"])
+    MOTION = 'motion'                   # supersede key of the motion commands (a newer move drops the queued ones)
+    VELOCITY = 'velocity'               # supersede key of the running velocity updates
+    stopLatencyStats = namedtuple("stopLatencyStats", ["count", "last", "max", "avg"])     # sec, stop() to quick stop call
 
     _motors:list[MAXON_Motor.portSp] | None = None      # Class variable to hold available motors
 
@@ -45,11 +53,18 @@ class servoMotor(QObject):
 
     velocityChanged = Signal(int)       # Current velocity in units
     actualCurrentChanged = Signal(int)  # Current actual current in mA
+    actualTorqueChanged = Signal(int)   # Current actual torque
+
+    availableMotorsChanged = Signal()   # Signal emitted when background revalidation changes the motors list
+    motorsListUpdated = Signal(list, list)  # added SNs, removed SNs (background revalidation result)
+    commandFinished = Signal(int, bool, str)    # command id, success, message (command slots return the id)
+    stopLatencyChanged = Signal(float)  # last stop latency in ms (STOP request to the quick stop library call)
+    hardwareStopChanged = Signal(bool)  # quick stop digital input (E-stop / level switch) state
 
 
     @classmethod
-    def listMotors(cls)->list[str]:       # List available servo motors SNs
-        cls._motors = motServo.init_devices()      
+    def listMotors(cls, use_cache:bool = False)->list[str]:       # List available servo motors SNs
+        cls._motors = motServo.init_devices(use_cache = use_cache)      
         sn_motors:list[str] = list()
 
         if cls._motors is not None:
@@ -61,16 +76,23 @@ class servoMotor(QObject):
 
         return  sn_motors
     
-    def __init__(self, serial_number:str = None, parent=None):
+    def __init__(self, serial_number:str = None, parent=None, poll_policy:pollPolicy = None, reactor:stationReactor = None):
         super().__init__(parent)
+        self.reactor:stationReactor | None = reactor    # station reactor running the watchdogs, None - own threads
+        self.poll_policy:pollPolicy = poll_policy if poll_policy is not None else pollPolicy(idle=0.5, active=0.1, near=0.02)
+                                                        # watchdog polling (idle / running / close to target or timeout)
+        self.__target_pos:int | None = None             # go2pos target, None for velocity moves
         self.devNotificationQ:Queue = Queue()           # Queue for notifications from watchdog thread 
                                                         # when opeartion completes
-        self.__wd:threading.Thread | None = None                  # Watchdog thread
+        self.__wd:threading.Thread | reactorJob | None = None     # Watchdog thread (or reactor job)
+        self.__wd_status:bool = True                    # watchdog completion status
         self.__wd_stop:threading.Event = threading.Event() # Event to stop watchdog thread
         self.__position:int = 0                             # Current position of servo motor
         self.__velocity:int = 0                             # Current velocity of servo motor
         self.__actual_current:int = 0                       # Current actual current of servo motor
         self.__actual_torque:int = 0                        # Current actual torque of servo motor
+        self.__hardware_stop:bool = False                   # quick stop digital input is active
+        self.__snapshot:MAXON_Motor.telemetrySnapshot | None = None  # last telemetry snapshot, properties are served from it
         self.__current_op:servoMotor.opType = servoMotor.opType.stoped          # Current operation
         self.__op_lock:threading.Lock = threading.Lock()  # Lock for current operation
         self.__start_time:float = 0.0                     # Start time of current operation
@@ -80,22 +102,28 @@ class servoMotor(QObject):
         self.__timeout:float | None = None                  # Timeout for operations
         self.__current_limit_mA:int = MAXON_Motor.default_curr_limit               # Current limit in mA
         self._motor:motServo | None = None
+        self.__revalidate_thread:threading.Thread | None = None   # background devices enumeration
+        self.__stop_latency:list[float] = [0, 0.0, 0.0, 0.0]     # count, last, max, total (sec)
 
                     
         self._state = servoMotor.mState.OFF.value
-        if servoMotor._motors is None:
-            servoMotor.listMotors()
+        _revalidate:bool = servoMotor._motors is None
+        if _revalidate:
+            servoMotor.listMotors(use_cache = True)         # last known devices, full enumeration runs in background
             print_log(f'Listing available servo motors for first time...')
 
 
         self._current_sn = serial_number if serial_number else (str(servoMotor._motors[0].sn) if servoMotor._motors else '') 
         # print_log(f'Available servo motors->{servoMotor._motors}, s/n selected={self._current_sn}')
+        self.__commands:commandWorker = commandWorker(f'servo-{self._current_sn}')     # slots commands run here
         print_log('Available servo motors->%s, s/n selected=%s', str(servoMotor._motors), self._current_sn)
 
         try:
             for m in servoMotor._motors:
                 if str(m.sn) == self._current_sn:
                     self._motor = motServo(m)          # Initialize motor instance
+                    self._motor.reactor = self.reactor
+                    self._motor.executor = self.__execute
                     self.__current_motor = m
                     self._state = servoMotor.mState.IDLE.value
                     break
@@ -106,10 +134,7 @@ class servoMotor(QObject):
                     raise ValueError(f'Servo motor with serial number {self._current_sn} not found')
                 return
             
-            self.__position = self._motor.mDev_get_cur_pos()
-            self.__velocity = self._motor.mDev_get_cur_velocity()
-            self.__actual_current = self._motor.mDev_get_actual_current()
-            self.__actual_torque = self._motor.mDev_get_actual_torque()
+            self.__apply_snapshot(self._motor.read_snapshot(), force=True)
             print_log(f'Servo motor {self._current_sn} initialized successfully: {self._motor }. Position={self.position} Velocity={self.velocity} Actual Current={self.actualCurrent} Actual Torque={self.actualTorque}')
             self.currentLimitChanged.emit()
             self._watch_dog_run()
@@ -119,31 +144,67 @@ class servoMotor(QObject):
             if self._motor:
                 del self._motor
                 self._motor = None
+        finally:
+            if _revalidate:                                 # after the motor is open: the enumeration doesn't delay it
+                self._revalidate_run()                      # and skips the opened port
 
         
     def __repr__(self):
         return f'servoMotor(SN={self._current_sn})'
 
-    @Property(list, constant=True)
+    def _revalidate_run(self):
+        if self.__revalidate_thread is not None and self.__revalidate_thread.is_alive():
+            return
+        self.__revalidate_thread = threading.Thread(target=self._revalidate_motors, name='servoRevalidate', daemon=True)
+        self.__revalidate_thread.start()
+
+    def _revalidate_motors(self):            # full enumeration, publishes the differences from the cached list
+        try:
+            _start = time.time()
+            _found = motServo.revalidate_devices()
+            print_log(f'Servo motors revalidation took {time.time() - _start:.2f} sec, found: {_found}')
+            if _found is None:
+                _found = list()
+
+            _old_sns = set(str(m.sn) for m in servoMotor._motors) if servoMotor._motors else set()
+            _new_sns = set(str(m.sn) for m in _found)
+            _old_ports = set((str(m.sn), m.port) for m in servoMotor._motors) if servoMotor._motors else set()
+            _new_ports = set((str(m.sn), m.port) for m in _found)
+            if _old_ports == _new_ports:
+                print_log('Cached servo motors list is up to date')
+                return
+
+            _added = sorted(_new_sns - _old_sns)
+            _removed = sorted(_old_sns - _new_sns)
+            print_warn(f'Servo motors list changed. Added: {_added}, removed: {_removed}')
+            servoMotor._motors = list(_found)
+            if isValid(self):
+                self.motorsListUpdated.emit(_added, _removed)
+                self.availableMotorsChanged.emit()
+        except Exception as ex:
+            print_err(f'Error revalidating servo motors: {ex}')
+            exptTrace(ex)
+
+    @Property(list, notify=availableMotorsChanged)
     def availableMotors(self):              # list of available motor serial numbers
-        print_DEBUG(f'Getting available motors: {servoMotor._motors}')
+        if debug_enabled(): print_DEBUG(f'Getting available motors: {servoMotor._motors}')
         # return servoMotor._motors  if servoMotor._motors is not None else []
         return [str(m.sn) for m in servoMotor._motors] if servoMotor._motors else []
     
-    @Property(list, constant=True)
+    @Property(list, notify=availableMotorsChanged)
     def availableMotorObjects(self):              # list of available motor serial numbers
-        print_DEBUG(f'Getting available motors: {servoMotor._motors}')
+        if debug_enabled(): print_DEBUG(f'Getting available motors: {servoMotor._motors}')
         # return servoMotor._motors  if servoMotor._motors is not None else []
         return servoMotor._motors if servoMotor._motors else []
 
     @Property(int, notify=currentLimitChanged)
     def currentLimit(self) -> int:
-        print_DEBUG(f'Getting current limit: {self.__current_limit_mA} mA')
+        if debug_enabled(): print_DEBUG(f'Getting current limit: {self.__current_limit_mA} mA')
         return self.__current_limit_mA
 
     @currentLimit.setter
     def currentLimit(self, limit_mA: int):  
-        print_DEBUG(f'Setting current limit from {self.__current_limit_mA} mA to {limit_mA} mA')
+        if debug_enabled(): print_DEBUG(f'Setting current limit from {self.__current_limit_mA} mA to {limit_mA} mA')
         try:
             if limit_mA != self.__current_limit_mA:
                 self.__current_limit_mA = limit_mA
@@ -156,12 +217,12 @@ class servoMotor(QObject):
 
     @Property(str, notify=currentMotorChanged)
     def currentSerialNumber(self) -> str:
-        print_DEBUG(f'Getting current serial number: {self._current_sn}')
+        if debug_enabled(): print_DEBUG(f'Getting current serial number: {self._current_sn}')
         return str(self._current_sn) if self._current_sn else ""
 
     @currentSerialNumber.setter
     def currentSerialNumber(self, sn: str):
-        print_DEBUG(f'Setting current serial number from {self._current_sn} to {sn}')
+        if debug_enabled(): print_DEBUG(f'Setting current serial number from {self._current_sn} to {sn}')
         try:
             if sn != self._current_sn:
                 self._current_sn = sn
@@ -172,6 +233,8 @@ class servoMotor(QObject):
                 for m in servoMotor._motors:
                     if str(m.sn) == sn:
                         self._motor = motServo(m)          # Initialize motor instance
+                        self._motor.reactor = self.reactor
+                        self._motor.executor = self.__execute
                         self.__current_motor = m
                         self._state = servoMotor.mState.IDLE.value 
                         break
@@ -191,52 +254,47 @@ class servoMotor(QObject):
 
 
     @Property(int, notify=positionChanged)
-    def position(self) -> int:
-        try:
-            if not self._motor:
-                return 0
-            self.__position = self._motor.mDev_get_cur_pos()
-        except Exception as ex:
-            print_err(f'Error getting position for motor {self._current_sn}: {ex}')
-            exptTrace(ex)
-            return 0
-        return self.__position if self._motor else 0
+    def position(self) -> int:                  # properties are served from the last telemetry snapshot,
+        return self.__position if self._motor else 0    # the hardware is read by the watchdog only
     
-    @Property(int, notify=positionChanged)
+    @Property(int, notify=velocityChanged)
     def velocity(self) -> int:
-        try:
-            if not self._motor:
-                return 0
-            self.__velocity = self._motor.mDev_get_cur_velocity()
-        except Exception as ex:
-            print_err(f'Error getting velocity for motor {self._current_sn}: {ex}')
-            exptTrace(ex)
-            return 0
         return self.__velocity if self._motor else 0
     
-    @Property(int, notify=positionChanged)
+    @Property(int, notify=actualCurrentChanged)
     def actualCurrent(self) -> int:
-        try:
-            if not self._motor:
-                return 0
-            self.__actual_current = self._motor.mDev_get_actual_current()
-        except Exception as ex:
-            print_err(f'Error getting actual current for motor {self._current_sn}: {ex}')
-            exptTrace(ex)
-            return 0
         return self.__actual_current if self._motor else 0
     
-    @Property(int, notify=positionChanged)
+    @Property(int, notify=actualTorqueChanged)
     def actualTorque(self) -> int:
-        try:
-            if not self._motor:
-                return 0
-            self.__actual_torque = self._motor.mDev_get_actual_torque()
-        except Exception as ex:
-            print_err(f'Error getting actual torque for motor {self._current_sn}: {ex}')
-            exptTrace(ex)
-            return 0
         return self.__actual_torque if self._motor else 0
+
+    @Property(bool, notify=hardwareStopChanged)
+    def hardwareStop(self) -> bool:
+        return self.__hardware_stop if self._motor else False
+
+    @property
+    def snapshot(self) -> MAXON_Motor.telemetrySnapshot | None:
+        return self.__snapshot
+
+    def __apply_snapshot(self, snap:MAXON_Motor.telemetrySnapshot, force:bool = False):
+                                                # caches the telemetry and notifies the changed fields only
+        self.__snapshot = snap
+        if force or snap.position != self.__position:
+            self.__position = snap.position
+            self.positionChanged.emit(self.__position)
+        if force or snap.velocity != self.__velocity:
+            self.__velocity = snap.velocity
+            self.velocityChanged.emit(self.__velocity)
+        if force or snap.current != self.__actual_current:
+            self.__actual_current = snap.current
+            self.actualCurrentChanged.emit(self.__actual_current)
+        if force or snap.torque != self.__actual_torque:
+            self.__actual_torque = snap.torque
+            self.actualTorqueChanged.emit(self.__actual_torque)
+        if force or snap.hw_quick_stop != self.__hardware_stop:
+            self.__hardware_stop = snap.hw_quick_stop
+            self.hardwareStopChanged.emit(self.__hardware_stop)
     
     @Property(str, notify=stateChanged)
     def state(self) -> str:
@@ -245,55 +303,89 @@ class servoMotor(QObject):
     @Slot(int, result=QObject)
     def get_motor_by_index(self, index):
         _selected_motor: MAXON_Motor.portSp = self._motors[index] if self._motors and 0 <= index < len(self._motors) else None
-        print_DEBUG(f'Getting motor by index {index}: {_selected_motor}')
+        if debug_enabled(): print_DEBUG(f'Getting motor by index {index}: {_selected_motor}')
         return _selected_motor
     
     # ----- Compatability with MotorController interface -----
-    @Slot(float, float, float, int, result=bool)
-    def moveAbsolute(self, position: float, vel: float, acc: float, timeout: int)->bool:   # Move to absolute position
-                                                                        # for compatibility with MotorController
-        print_log(f'Move absolute command received in MotorController for motor:{self} to position {position} with vel={vel}, acc={acc}')   
+    # command slots return immediately with the command id (commandWorker.REJECTED on failure),
+    # the command runs in the motor command worker and reports commandFinished(id, success, message)
+    def __submit(self, name:str, func, *args, supersede:str = None, keep:bool = False) -> int:
         if not self._motor:
             print_err('No motor initialized')
-            return False
+            return commandWorker.REJECTED
+        return self.__commands.submit(name, func, *args, supersede=supersede, keep=keep, on_done=self.__command_done)
+
+    def __execute(self, name:str, func) -> bool:   # motor reactor watchdog: the blocking completion runs in the command worker
+        return self.__commands.submit(name, lambda: func() or True) != commandWorker.REJECTED
+
+    def __command_done(self, command_id:int, success:bool, message:str):     # command worker thread
+        if debug_enabled(): print_DEBUG(f'Command {command_id} for motor {self._current_sn} finished: success = {success}, {message}')
+        if isValid(self):
+            self.commandFinished.emit(command_id, success, message)
+
+    @Slot(float, float, float, int, result=int)
+    def moveAbsolute(self, position: float, vel: float, acc: float, timeout: int)->int:   # Move to absolute position
+                                                                        # for compatibility with MotorController
+        print_log(f'Move absolute command received in MotorController for motor:{self} to position {position} with vel={vel}, acc={acc}')   
         params = servoParameters(velocity=vel, acceleration=acc, timeout=timeout)
-        self.go2pos(position, params)
-        return True
+        return self.__submit('moveAbsolute', self.go2pos, position, params, supersede=servoMotor.MOTION)
     
-    @Slot(result=bool)
-    def stop(self)->bool:
-        print_log(f'Stop command received in MotorController for motor:{self}')
-        if not self._motor:
+    @Slot(result=int)
+    def stop(self)->int:                    # emergency stop fast path: the quick stop is issued right here, ahead of
+                                            # the running command, then the queued moves are dropped and the full stop
+                                            # (disable, status reads) is queued to the command worker
+        _requested = time.perf_counter()
+        _motor = self._motor
+        if not _motor:
             print_err('No motor initialized')
-            return False
-        print_log(f'Stop command received in MotorController for motor:{self._current_sn} // {self._motor.mDev_SN}')
-        self.stopMotor()
-        return True
+            return commandWorker.REJECTED
+        _stopped:bool = _motor.mDev_quick_stop(requested=_requested)
+        _id = self.__submit('stop', self.stopMotor, supersede=servoMotor.MOTION, keep=True)
+        if not _stopped:
+            print_err(f'Quick stop failed for motor {self._current_sn}, the full stop follows')
+        elif _motor.quick_stop_latency is not None:
+            self.__record_stop_latency(_motor.quick_stop_latency)
+        print_log(f'Stop command received in MotorController for motor:{self}, quick stop latency = {self.stopLatency:.3f} ms')
+        return _id
+
+    def __record_stop_latency(self, latency:float):
+        _stats = self.__stop_latency
+        _stats[0] += 1
+        _stats[1] = latency
+        _stats[2] = max(_stats[2], latency)
+        _stats[3] += latency
+        self.stopLatencyChanged.emit(latency * 1000)
+
+    def stop_latency_stats(self) -> servoMotor.stopLatencyStats:
+        _count, _last, _max, _total = self.__stop_latency
+        return servoMotor.stopLatencyStats(count=_count, last=_last, max=_max, avg=_total / _count if _count else 0.0)
+
+    @Property(float, notify=stopLatencyChanged)
+    def stopLatency(self) -> float:         # ms, last STOP request to the quick stop library call
+        return self.__stop_latency[1] * 1000
+
+    @Property(float, notify=stopLatencyChanged)
+    def stopLatencyMax(self) -> float:      # ms
+        return self.__stop_latency[2] * 1000
     
-    @Slot(float, float, int, result=bool)
-    def moveForward(self, vel: float, acc: float, timeout: int)->bool:
+    @Slot(float, float, int, result=int)
+    def moveForward(self, vel: float, acc: float, timeout: int)->int:
         print_log(f'Move forward command received in MotorController for motor:vel={vel}, acc={acc}  motor:{self}')
-        if not self._motor:
-            print_err('No motor initialized')
-            return False
         params = servoParameters(velocity=vel, acceleration=acc, timeout=timeout)
-        self.forward(params)
-        return True
+        return self.__submit('moveForward', self.forward, params, supersede=servoMotor.MOTION)
     
-    @Slot(float, float, int, result=bool)
-    def moveBackward(self, vel: float, acc: float, timeout: int)->bool:
+    @Slot(float, float, int, result=int)
+    def moveBackward(self, vel: float, acc: float, timeout: int)->int:
         print_log(f'Move backward command received in MotorController for motor:vel={vel}, acc={acc}  motor:{self}')
-        if not self._motor:
-            print_err('No motor initialized')
-            return False
         params = servoParameters(velocity=vel, acceleration=acc, timeout=timeout)
-        self.backward(params)
-        return True
+        return self.__submit('moveBackward', self.backward, params, supersede=servoMotor.MOTION)
     
-    @Slot(int, result=bool)
-    def updateRunningVelocity(self, vel: int) -> bool:
+    @Slot(int, result=int)
+    def updateRunningVelocity(self, vel: int) -> int:
         print_log(f'Update running velocity command received: vel={vel} for motor:{self}')
+        return self.__submit('updateRunningVelocity', self.__update_running_velocity, vel, supersede=servoMotor.VELOCITY)
 
+    def __update_running_velocity(self, vel: int) -> bool:
         if not self._motor:
             print_err('No motor initialized')
             return False
@@ -318,11 +410,7 @@ class servoMotor(QObject):
                 print_warn(f'Velocity update is allowed only for forward/backward, current op={current_op}')
                 return False
 
-            if status:
-                self.__velocity = self._motor.mDev_get_cur_velocity()
-                self.velocityChanged.emit(self.__velocity)
-
-            return status
+            return status                       # the new velocity is published by the watchdog
 
         except Exception as ex:
             print_err(f'Error updating running velocity to {vel}: {ex}')
@@ -342,15 +430,18 @@ class servoMotor(QObject):
         return self._state == servoMotor.mState.RUNNING.value
 
     # ---------------------------------------------------------
-    @Slot(result=bool)
-    def home(self)->bool:
+    @Slot(result=int)
+    def home(self)->int:
+        return self.__submit('home', self.__home, supersede=servoMotor.MOTION)
+
+    def __home(self)->bool:
         try:
             if not self._motor:
                 print_err('No motor initialized')
                 return False    
             self._motor.devNotificationQ.queue.clear()        # clear notification queue
             self._motor.mDev_reset_pos()
-            print_DEBUG(f'home command issued')
+            if debug_enabled(): print_DEBUG(f'home command issued')
             return True
         except Exception as ex:
             print_err(f'Error in home: {ex}')
@@ -365,14 +456,15 @@ class servoMotor(QObject):
             self._state = servoMotor.mState.RUNNING.value
             self.stateChanged.emit(self._state)
             self.__timeout = _parms.timeout
+            self.__target_pos = int(new_position) if new_position and isinstance(new_position, (int, float)) else 0
             self._motor.devNotificationQ.queue.clear()        # clear notification queue
             self._motor.go2pos(int(new_position) if new_position and isinstance(new_position, (int, float)) else 0, 
                                 velocity=_parms.velocity,
                                 acceleration=_parms.acceleration,
                                 deceleration=_parms.deceleration,
-                                stall=_parms.stall)
-            self.positionChanged.emit(self.position)
-            print_DEBUG(f'go2pos command issued to position {new_position} with parms: {_parms}')
+                                stall=_parms.stall,
+                                on_complete=self.__on_motion_complete)
+            if debug_enabled(): print_DEBUG(f'go2pos command issued to position {new_position} with parms: {_parms}')
 
         except Exception as ex:
             print_err(f'Error in go2pos: {ex}')
@@ -390,14 +482,15 @@ class servoMotor(QObject):
             self._state = servoMotor.mState.RUNNING.value
             self.stateChanged.emit(self._state)
             self.__timeout = _parms.timeout
+            self.__target_pos = None
             self._motor.devNotificationQ.queue.clear()        # clear notification queue
             self._motor.mDev_forward(velocity=_parms.velocity,
                                 acceleration=_parms.acceleration,
                                 deceleration=_parms.deceleration,
                                 timeout=_parms.timeout,
                                 polarity=None,
-                                stall=_parms.stall)
-            self.positionChanged.emit(self.position)
+                                stall=_parms.stall,
+                                on_complete=self.__on_motion_complete)
         except Exception as ex:
             print_err(f'Error in forward: {ex}')
             exptTrace(ex)
@@ -414,15 +507,15 @@ class servoMotor(QObject):
             self._state = servoMotor.mState.RUNNING.value
             self.stateChanged.emit(self._state)
             self.__timeout = _parms.timeout
+            self.__target_pos = None
             self._motor.devNotificationQ.queue.clear()        # clear notification queue
             self._motor.mDev_backward(velocity=_parms.velocity,
                                   acceleration=_parms.acceleration,
                                   deceleration=_parms.deceleration,
                                   timeout=_parms.timeout,
                                   polarity=None,
-                                  stall=_parms.stall)
-            self.positionChanged.emit(self.position)
-            self.operationFinished.emit(True, "Reached")
+                                  stall=_parms.stall,
+                                  on_complete=self.__on_motion_complete)
         except Exception as ex:
             print_err(f'Error in backward: {ex}')
             exptTrace(ex)
@@ -433,8 +526,9 @@ class servoMotor(QObject):
     
 
     def __del__(self):
+        self.__commands.stop()
         if self._state == servoMotor.mState.RUNNING.value:
-            self.stop()
+            self.stopMotor()
         self.__wd_stop.set()                      # Signal watchdog thread to stop
         if self._motor:
             del self._motor
@@ -452,8 +546,6 @@ class servoMotor(QObject):
             self._state = servoMotor.mState.IDLE.value
             if isValid(self):                                                   # Check if the QObject is still valid
                 self.stateChanged.emit(self._state)
-                self.positionChanged.emit(self.position)
-                self.positionChanged.emit(self.velocity)
                 self.operationFinished.emit(True, "Stopped")
             else:
                 print_err("Object Qt already deleted, skipping emit")
@@ -464,7 +556,22 @@ class servoMotor(QObject):
             exptTrace(ex)
         return _status
 
-    def  _watch_dog_run(self)->threading.Thread:
+    def __poll_interval(self) -> float:
+        _running:bool = self._state == servoMotor.mState.RUNNING.value
+        _time_left = None
+        if _running and self.__timeout is not None and self.__timeout > 0:
+            _time_left = self.__timeout - (time.time() - self.__start_time)
+        return self.poll_policy.interval(active = _running,
+                                         pos_error = (self.__target_pos - self.__position) if self.__target_pos is not None else None,
+                                         current = self.__actual_current, current_limit = self.__current_limit_mA,
+                                         time_left = _time_left)
+
+    def  _watch_dog_run(self)->threading.Thread | reactorJob:
+        if self.reactor is not None:
+            print_log(f'Running whatch dog job on station reactor {self.reactor.name}')
+            self.__watch_dog_begin()
+            self.__wd = self.reactor.add_job(f'servo-{self._current_sn}', self.__reactor_step, self.__poll_interval)
+            return self.__wd
         print_log(f'Running whatch dog thread')         
         self.__wd = threading.Thread(target=self.__watch_dog_thread , daemon=True)
                                                         # Start watchdog thread
@@ -472,55 +579,70 @@ class servoMotor(QObject):
         return self.__wd
         
     def __watch_dog_thread(self):
+        self.__watch_dog_begin()
+        while self.__watch_dog_step() is not None:
+            self.__wd_stop.wait(self.__poll_interval())
+        self.__watch_dog_end()
+
+    def __reactor_step(self):
+        _snap = self.__watch_dog_step(blocking=False)
+        if _snap is not None:
+            return _snap
+        self.__watch_dog_end()
+        return stationReactor.DONE
+
+    def __watch_dog_begin(self):
         print_log(f'Watch dog thread started')
         self.devNotificationQ.queue.clear()        # clear notification queue
         self._motor.devNotificationQ.queue.clear()        # clear notification queue
+        self.__wd_status = True
 
-        _status = True
-        try:
-            while not self.__wd_stop.is_set():
-                self.positionChanged.emit(self.position)                                # Monitor operation status
-                self.velocityChanged.emit(self.velocity)
-                # self.actualCurrentChanged.emit(self.actualCurrent)
-                # self.positionChanged.emit(self.actualTorque)
-                
-                motor_exists = getattr(self, '_motor', None)    and self._motor is not None
-                if motor_exists:
-                    self.__position = self.position           
-                    self.__velocity = self.velocity                                # Monitor operation status
-                    self.__actual_current = self.actualCurrent
-                    self.__actual_torque = self.actualTorque
-                else:   
-                    print_err('Motor instance no longer exists, stopping watchdog thread')
-                    time.sleep(0.5)
-                    self.__wd_stop.set()
-                    continue
-
-                if self._state == servoMotor.mState.RUNNING.value:
-                    if self.__timeout is not None and self.__timeout > 0:
-                        if (time.time() - self.__start_time) > self.__timeout:
-                            print_log(f'Operation timed out')
-                            _status = True
-                            self.stopMotor(_status=_status)
-                    if self._motor.devNotificationQ.qsize() > 0:
-                        _status = self._motor.devNotificationQ.get()
-                        print_log(f'Operation completed with status {_status}')
-                        self.stopMotor(_status=_status)
-                time.sleep(0.1)
+    def __watch_dog_step(self, blocking:bool = True) -> MAXON_Motor.telemetrySnapshot | None:
+                                                    # one watchdog tick. None - watchdog stopped.
+                                                    # blocking = False - the telemetry is not read while the device is busy
+        if self.__wd_stop.is_set():
             print_log(f'Watch dog thread stopped at position {self.__position}')
+            return None
+        try:
+            motor_exists = getattr(self, '_motor', None)    and self._motor is not None
+            if not motor_exists:
+                print_err('Motor instance no longer exists, stopping watchdog thread')
+                self.__wd_stop.set()
+                return None
+
+            _snap = self._motor.read_snapshot(blocking)             # one batched telemetry read per tick
+            if _snap is None:                                       # device busy, tick skipped
+                return self.__snapshot
+            self.__apply_snapshot(_snap)                            # Monitor operation status
+
+            if self._state == servoMotor.mState.RUNNING.value:
+                if self.__timeout is not None and self.__timeout > 0:
+                    if (time.time() - self.__start_time) > self.__timeout:
+                        print_log(f'Operation timed out')
+                        self.__wd_status = True
+                        self.stopMotor(_status=self.__wd_status)
+            return _snap
         except Exception as e:
             print_log(f'Error in watch dog thread: {e}')
             exptTrace(e)
-            _status = False
+            self.__wd_status = False
+            return None
+
+    def __on_motion_complete(self, success:bool):  # motor watchdog context: the move is over
+        print_log(f'Operation completed with status {success}')
+        self.__wd_status = success
+        if self._state == servoMotor.mState.RUNNING.value:
+            self.stopMotor(_status=success)
 
+    def __watch_dog_end(self):
         with self.__op_lock:    
             self.__current_op = servoMotor.opType.stoped         # Update current operation
 
-        self.devNotificationQ.put(_status)          # Notify operation completion
-        self.positionChanged.emit(self.position)                                # Monitor operation status
-        self.positionChanged.emit(self.velocity)
-        self.positionChanged.emit(self.actualCurrent)
-        self.positionChanged.emit(self.actualTorque)
-        # self.velocityChanged.emit(self.velocity)
-        # self.actualCurrentChanged.emit(self.actualCurrent)
+        self.devNotificationQ.put(self.__wd_status)          # Notify operation completion
+        try:
+            if self._motor is not None and isValid(self):
+                self.__apply_snapshot(self._motor.read_snapshot(), force=True)     # final state
+        except Exception as ex:
+            print_err(f'Error reading final telemetry for motor {self._current_sn}: {ex}')
+            exptTrace(ex)
         return
\ No newline at end of file
@@ -0,0 +1,230 @@
+from __future__ import annotations
+import threading
+import time
+import heapq
+import itertools
+from collections import namedtuple
+from typing import Callable, Any
+
+from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace, debug_enabled
+
+
+#
+#   Pump station I/O reactor.
+#   One scheduling thread per station runs all periodic device jobs (motor watchdog, scale reader, UI updates).
+#   A job is a step function called at its period (fixed value or callable, e.g. pollPolicy based).
+#   The step returns the result published to the job subscribers, or stationReactor.DONE to finish the job.
+#   Jobs must not block: a step longer than its period is counted (and reported) as an overrun.
+#
+
+class reactorJob:
+    jobStats = namedtuple("jobStats", ["name", "runs", "overruns", "max_lateness", "max_duration", "avg_duration"])
+
+    def __init__(self, name:str, step:Callable[[], Any], period:float | Callable[[], float],
+                 on_done:Callable[[], None] = None):
+        self.name = name
+        self.step = step
+        self.period = period
+        self.on_done = on_done                          # called in the reactor thread when the job finishes
+        self.subscribers:list[Callable[[Any], None]] = list()
+        self.due:float = 0.0
+        self.cancelled = False
+        self.__done = threading.Event()
+        self.runs:int = 0
+        self.overruns:int = 0
+        self.max_lateness:float = 0.0
+        self.max_duration:float = 0.0
+        self.total_duration:float = 0.0
+        self.last_overrun_report:float = 0.0
+
+    def __repr__(self):
+        return f'reactorJob({self.name})'
+
+    def next_period(self) -> float:
+        return self.period() if callable(self.period) else self.period
+
+    def finish(self):
+        self.__done.set()
+
+    def is_alive(self) -> bool:                         # threading.Thread compatible
+        return not self.__done.is_set()
+
+    def join(self, timeout:float = None) -> bool:       # threading.Thread compatible
+        return self.__done.wait(timeout)
+
+    def stats(self) -> reactorJob.jobStats:
+        return reactorJob.jobStats(name=self.name, runs=self.runs, overruns=self.overruns, max_lateness=self.max_lateness,
+                                   max_duration=self.max_duration, avg_duration=self.total_duration / self.runs if self.runs else 0.0)
+
+
+class stationReactor:
+    DONE = object()                                     # step result finishing the job
+    OVERRUN_REPORT_PERIOD = 5.0                         # sec, overrun warnings rate limit per job
+
+    def __init__(self, name:str = 'station'):
+        self.name = name
+        self.__jobs:dict[str, reactorJob] = dict()
+        self.__heap:list = list()                       # (due, seq, job)
+        self.__seq = itertools.count()
+        self.__cond = threading.Condition()
+        self.__stop = False
+        self.__thread:threading.Thread | None = None
+        self.loop_overruns:int = 0                      # jobs started later than their period after due time
+
+    def __repr__(self):
+        return f'stationReactor({self.name}, jobs={list(self.__jobs)})'
+
+    def start(self) -> bool:
+        with self.__cond:
+            if self.__thread is not None and self.__thread.is_alive():
+                return True
+            self.__stop = False
+            self.__thread = threading.Thread(target=self.__loop, name=f'reactor-{self.name}', daemon=True)
+            self.__thread.start()
+        print_log(f'Station reactor {self.name} started')
+        return True
+
+    def stop(self, timeout:float = 2.0):
+        with self.__cond:
+            self.__stop = True
+            self.__cond.notify_all()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+        for _job in list(self.__jobs.values()):
+            _job.finish()
+        print_log(f'Station reactor {self.name} stopped. Stats: {self.stats()}')
+
+    def is_running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def add_job(self, name:str, step:Callable[[], Any], period:float | Callable[[], float], delay:float = 0.0,
+                on_done:Callable[[], None] = None, subscribers:list[Callable[[Any], None]] = None) -> reactorJob:
+                                                        # job with the same name is replaced
+        _job = reactorJob(name, step, period, on_done)
+        if subscribers:
+            _job.subscribers.extend(subscribers)
+        with self.__cond:
+            _old = self.__jobs.get(name)
+            if _old is not None:
+                _old.cancelled = True
+                _old.finish()
+            self.__jobs[name] = _job
+            _job.due = time.monotonic() + delay
+            heapq.heappush(self.__heap, (_job.due, next(self.__seq), _job))
+            self.__cond.notify_all()
+        if not self.is_running():
+            self.start()
+        return _job
+
+    def remove_job(self, name:str) -> bool:
+        with self.__cond:
+            _job = self.__jobs.pop(name, None)
+            if _job is None:
+                return False
+            _job.cancelled = True                       # lazily dropped from the heap
+            self.__cond.notify_all()
+        _job.finish()
+        return True
+
+    def subscribe(self, name:str, callback:Callable[[Any], None]) -> bool:
+        with self.__cond:
+            _job = self.__jobs.get(name)
+            if _job is None:
+                print_err(f'Station reactor {self.name}: no job {name} to subscribe to')
+                return False
+            _job.subscribers.append(callback)
+        return True
+
+    def unsubscribe(self, name:str, callback:Callable[[Any], None]) -> bool:
+        with self.__cond:
+            _job = self.__jobs.get(name)
+            if _job is None or callback not in _job.subscribers:
+                return False
+            _job.subscribers.remove(callback)
+        return True
+
+    def job(self, name:str) -> reactorJob | None:
+        return self.__jobs.get(name)
+
+    def stats(self) -> list[reactorJob.jobStats]:
+        with self.__cond:
+            return [_job.stats() for _job in self.__jobs.values()]
+
+    def __loop(self):
+        print_log(f'Station reactor {self.name} loop started')
+        while True:
+            with self.__cond:
+                while not self.__stop:
+                    while self.__heap and self.__heap[0][2].cancelled:
+                        heapq.heappop(self.__heap)
+                    if not self.__heap:
+                        self.__cond.wait()
+                        continue
+                    _wait = self.__heap[0][0] - time.monotonic()
+                    if _wait <= 0:
+                        break
+                    self.__cond.wait(_wait)
+                if self.__stop:
+                    break
+                _due, _, _job = heapq.heappop(self.__heap)
+
+            self.__run(_job, _due)
+
+        print_log(f'Station reactor {self.name} loop stopped')
+
+    def __run(self, job:reactorJob, due:float):
+        _start = time.monotonic()
+        _lateness = _start - due
+        try:
+            _result = job.step()
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'Station reactor {self.name}: job {job.name} failed. Exception: {ex} of type: {type(ex)}')
+            _result = stationReactor.DONE
+        _end = time.monotonic()
+        _duration = _end - _start
+
+        job.runs += 1
+        job.total_duration += _duration
+        job.max_duration = max(job.max_duration, _duration)
+        job.max_lateness = max(job.max_lateness, _lateness)
+
+        if _result is stationReactor.DONE or job.cancelled:
+            self.__finish(job)
+            return
+
+        for _subscriber in list(job.subscribers):
+            try:
+                _subscriber(_result)
+            except Exception as ex:
+                exptTrace(ex)
+                print_err(f'Station reactor {self.name}: subscriber {_subscriber} of job {job.name} failed. Exception: {ex}')
+
+        _period = job.next_period()
+        _next = due + _period                           # fixed rate
+        _now = time.monotonic()
+        if _next <= _now:                               # the step (or the jobs before it) took longer than the period
+            job.overruns += 1
+            self.loop_overruns += 1
+            if _now - job.last_overrun_report >= stationReactor.OVERRUN_REPORT_PERIOD:
+                job.last_overrun_report = _now
+                print_warn(f'Station reactor {self.name}: job {job.name} overrun #{job.overruns}, period = {_period*1000:.1f} ms, lateness = {_lateness*1000:.1f} ms, duration = {_duration*1000:.1f} ms')
+            _next = _now + _period
+        with self.__cond:
+            if job.cancelled or self.__jobs.get(job.name) is not job:
+                return
+            job.due = _next
+            heapq.heappush(self.__heap, (_next, next(self.__seq), job))
+
+    def __finish(self, job:reactorJob):
+        with self.__cond:
+            if self.__jobs.get(job.name) is job:
+                del self.__jobs[job.name]
+        if job.on_done is not None and not job.cancelled:
+            try:
+                job.on_done()
+            except Exception as ex:
+                exptTrace(ex)
+                print_err(f'Station reactor {self.name}: job {job.name} completion failed. Exception: {ex}')
+        job.finish()
+        if debug_enabled(): print_DEBUG(f'Station reactor {self.name}: job {job.name} finished. {job.stats()}')
@@ -0,0 +1,27 @@
+import gc
+import os
+import sys
+
+#
+#   Flat module layout: the repository root is the import root of the tests.
+#
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+SIM_DEVICES = ((b'USB0', 0x1234, 1), (b'USB1', 0x5678, 1))     # (port, S/N, node id)
+
+
+@pytest.fixture
+def eposSim(tmp_path, monkeypatch):
+                                            # MAXON_Motor on a fresh simulated EPOS4 library, own devices cache file
+    from maxon import MAXON_Motor
+    from epos_backend import eposSimulator, simDevice
+
+    _epos = eposSimulator(devices=[simDevice(port=_port, sn=_sn, nodeid=_node, sensortype=1) for _port, _sn, _node in SIM_DEVICES])
+    for _attr, _value in (('backend', 'sim'), ('epos', _epos), ('devices', None), ('activated_devs', list()),
+                          ('port_locks', dict()), ('cache_file', str(tmp_path / 'maxon_devices.json'))):
+        monkeypatch.setattr(MAXON_Motor, _attr, _value)
+    yield _epos
+    gc.collect()                            # motors released while the simulator is still loaded
@@ -0,0 +1,95 @@
+import threading
+
+from command_worker import commandWorker
+
+TIMEOUT = 5.0
+
+
+class _recorder:
+    def __init__(self):
+        self.done:dict[int, tuple[bool, str]] = dict()
+        self.ran:list[str] = list()
+        self.__cond = threading.Condition()
+
+    def on_done(self, id:int, success:bool, message:str):
+        with self.__cond:
+            self.done[id] = (success, message)
+            self.__cond.notify_all()
+
+    def command(self, name:str, result=True):
+        def _func():
+            self.ran.append(name)
+            return result
+        return _func
+
+    def wait(self, *ids:int) -> bool:
+        with self.__cond:
+            return self.__cond.wait_for(lambda: all(_id in self.done for _id in ids), TIMEOUT)
+
+
+def _blocked_worker(rec:_recorder) -> tuple[commandWorker, threading.Event, int]:
+    _worker = commandWorker('test')                     # the first command holds the worker, the next ones stay queued
+    _release = threading.Event()
+    _started = threading.Event()
+    def _block():
+        _started.set()
+        return _release.wait(TIMEOUT)
+    _id = _worker.submit('block', _block, on_done=rec.on_done)
+    assert _started.wait(TIMEOUT)
+    return _worker, _release, _id
+
+
+def test_commands_run_in_order_with_results():
+    _rec = _recorder()
+    _worker = commandWorker('test')
+    _ids = [_worker.submit(f'cmd{_i}', _rec.command(f'cmd{_i}', _i != 1), on_done=_rec.on_done) for _i in range(3)]
+    _ids.append(_worker.submit('raise', lambda: 1 / 0, on_done=_rec.on_done))
+    assert _rec.wait(*_ids)
+    assert _rec.ran == ['cmd0', 'cmd1', 'cmd2']
+    assert [_rec.done[_id][0] for _id in _ids] == [True, False, True, False]
+    assert _worker.executed == 4 and _worker.failed == 2
+    _worker.stop()
+
+
+def test_supersede_drops_queued_commands_with_the_key():
+    _rec = _recorder()
+    _worker, _release, _block = _blocked_worker(_rec)
+    _move1 = _worker.submit('move1', _rec.command('move1'), supersede='motion', on_done=_rec.on_done)
+    _other = _worker.submit('other', _rec.command('other'), supersede='config', on_done=_rec.on_done)
+    _move2 = _worker.submit('move2', _rec.command('move2'), supersede='motion', on_done=_rec.on_done)
+    assert _rec.done[_move1] == (False, commandWorker.SUPERSEDED)
+    _release.set()
+    assert _rec.wait(_block, _other, _move2)
+    assert _rec.ran == ['other', 'move2']
+    assert _worker.superseded == 1
+    _worker.stop()
+
+
+def test_kept_command_is_not_superseded():
+    _rec = _recorder()
+    _worker, _release, _block = _blocked_worker(_rec)
+    _move = _worker.submit('move', _rec.command('move'), supersede='motion', on_done=_rec.on_done)
+    _stop = _worker.submit('stop', _rec.command('stop'), supersede='motion', keep=True, on_done=_rec.on_done)
+    _next = _worker.submit('move2', _rec.command('move2'), supersede='motion', on_done=_rec.on_done)
+    assert _rec.done[_move] == (False, commandWorker.SUPERSEDED)
+    _release.set()
+    assert _rec.wait(_block, _stop, _next)
+    assert _rec.ran == ['stop', 'move2']
+    _worker.stop()
+
+
+def test_full_queue_rejects_and_stop_cancels():
+    _rec = _recorder()
+    _worker, _release, _block = _blocked_worker(_rec)
+    _worker.maxsize = 2
+    _queued = [_worker.submit(f'cmd{_i}', _rec.command(f'cmd{_i}'), on_done=_rec.on_done) for _i in range(2)]
+    assert _worker.submit('cmd2', _rec.command('cmd2'), on_done=_rec.on_done) == commandWorker.REJECTED
+    assert _worker.rejected == 1 and _worker.pending() == 2
+    _stopper = threading.Thread(target=_worker.stop)  # drops the queue, then waits for the running command
+    _stopper.start()
+    assert _rec.wait(*_queued)
+    _release.set()
+    _stopper.join(TIMEOUT)
+    assert [_rec.done[_id] for _id in _queued] == [(False, 'Cancelled')] * 2
+    assert _rec.wait(_block) and _rec.ran == []
+    assert _worker.submit('late', _rec.command('late')) == commandWorker.REJECTED
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from flow_estimator import slopeEstimator, flowEstimators
+
+
+def _polyfit_slope(t:np.ndarray, w:np.ndarray) -> float:
+    return float(np.polyfit(t, w, 1)[0])
+
+
+def test_slope_matches_polyfit_over_sliding_window():
+    _rng = np.random.default_rng(0)
+    _t = 1000.0 + np.cumsum(_rng.uniform(0.01, 0.05, 5000))    # irregular sampling, large absolute times
+    _w = 2.5 * (_t - _t[0]) + _rng.normal(0.0, 0.05, _t.size)
+    _est = slopeEstimator(1.0)
+    for _i, (_ti, _wi) in enumerate(zip(_t, _w)):
+        _est.add(_ti, _wi)
+        if _i % 500 == 499:
+            _in = _t >= _ti - 1.0
+            _in[_i + 1:] = False
+            assert len(_est) == _in.sum()
+            assert _est.slope == pytest.approx(_polyfit_slope(_t[_in], _w[_in]), rel=1e-6, abs=1e-9)
+
+
+def test_slope_needs_two_distinct_times():
+    _est = slopeEstimator(1.0)
+    assert _est.slope == 0.0
+    _est.add(1.0, 5.0)
+    _est.add(1.0, 6.0)
+    assert _est.slope == 0.0
+    _est.reset()
+    assert len(_est) == 0
+
+
+def test_flow_estimators_windows():
+    _flow = flowEstimators((1.0, 10.0))
+    _t = np.arange(0.0, 20.0, 0.02)
+    _flow.extend(_t, np.where(_t < 15.0, 0.0, 3.0 * (_t - 15.0)))   # flow starts at 15 sec
+    assert _flow.rate(0) == pytest.approx(3.0)
+    assert 0.0 < _flow.rate(1) < 3.0
+    assert _flow.rate(5) == 0.0
@@ -0,0 +1,62 @@
+import json
+import os
+
+from maxon import MAXON_Motor
+from epos_backend import eposSimulator, simDevice
+
+
+def test_enumeration_writes_the_cache(eposSim):
+    assert not os.path.exists(MAXON_Motor.cache_file)
+    _devs = MAXON_Motor.init_devices(backend='sim', use_cache=True)
+    assert len(_devs) == 2
+    assert MAXON_Motor.load_device_cache() == _devs
+
+
+def test_cached_devices_need_no_library_calls(eposSim, monkeypatch):
+    _devs = MAXON_Motor.init_devices(backend='sim')
+    _epos = eposSimulator(devices=eposSim.devices)
+    monkeypatch.setattr(MAXON_Motor, 'epos', _epos)
+    assert MAXON_Motor.init_devices(backend='sim', use_cache=True) == _devs
+    assert _epos.calls == 0
+
+
+def test_cache_is_filtered_by_device_and_interface(eposSim):
+    MAXON_Motor.init_devices(backend='sim')
+    with open(MAXON_Motor.cache_file) as _f:
+        _records = json.load(_f)
+    _records[0]['interface'] = 'RS232'
+    with open(MAXON_Motor.cache_file, 'w') as _f:
+        json.dump(_records, _f)
+    _devs = MAXON_Motor.init_devices(backend='sim', use_cache=True)
+    assert [_dev.port for _dev in _devs] == [b'USB1']
+
+
+def test_broken_cache_falls_back_to_enumeration(eposSim):
+    with open(MAXON_Motor.cache_file, 'w') as _f:
+        _f.write('[{"device": ')
+    assert MAXON_Motor.load_device_cache() is None
+    assert len(MAXON_Motor.init_devices(backend='sim', use_cache=True)) == 2
+    assert len(MAXON_Motor.load_device_cache()) == 2
+
+
+def test_revalidation_does_not_probe_open_ports(eposSim, monkeypatch):
+    _devs = MAXON_Motor.init_devices(backend='sim', use_cache=True)
+    _motor = MAXON_Motor(_devs[0])
+    assert _motor.mDev_status
+    _probed:list[bytes] = list()
+    _readPort = MAXON_Motor.readPort
+    def _record(*args):
+        _probed.append(args[3])
+        return _readPort(*args)
+    monkeypatch.setattr(MAXON_Motor, 'readPort', staticmethod(_record))
+    assert MAXON_Motor.revalidate_devices() == _devs
+    assert _probed == [_devs[1].port]
+    assert _motor.read_snapshot().error == 0            # the open device is still usable
+
+
+def test_revalidation_drops_removed_devices(eposSim, monkeypatch):
+    MAXON_Motor.init_devices(backend='sim', use_cache=True)
+    monkeypatch.setattr(MAXON_Motor, 'epos', eposSimulator(devices=[simDevice(port=b'USB1', sn=0x5678, nodeid=1, sensortype=1)]))
+    _devs = MAXON_Motor.revalidate_devices()
+    assert [_dev.port for _dev in _devs] == [b'USB1']
+    assert MAXON_Motor.load_device_cache() == _devs
@@ -0,0 +1,108 @@
+import threading
+import time
+
+from maxon import MAXON_Motor
+from epos_backend import eposSimulator, simDevice
+from conftest import SIM_DEVICES
+
+TIMEOUT = 10.0
+
+
+def _open(port_index:int = 0) -> MAXON_Motor:
+    _devs = MAXON_Motor.init_devices(backend='sim')
+    _motor = MAXON_Motor(_devs[port_index])
+    assert _motor.mDev_status
+    return _motor
+
+
+def test_enumeration(eposSim):
+    _devs = MAXON_Motor.init_devices(backend='sim')
+    assert [(_dev.port, _dev.sn, _dev.nodeid) for _dev in _devs] == list(SIM_DEVICES)
+    assert all(_dev.device == b'EPOS4' and _dev.interface == b'USB' for _dev in _devs)
+
+
+def test_parallel_enumeration_finds_the_same_devices(eposSim, monkeypatch):
+    _serial = MAXON_Motor.init_devices(backend='sim')
+    monkeypatch.setattr(MAXON_Motor, 'enum_parallel', True)
+    assert MAXON_Motor.revalidate_devices() == _serial
+
+
+def test_snapshot_after_move(eposSim):
+    _motor = _open()
+    _snap = _motor.read_snapshot()
+    assert _snap.error == 0 and _snap.position == 0 and _snap.velocity == 0
+    assert _snap.inputs is None and not _snap.hw_quick_stop
+
+    _done = threading.Event()              # a move shorter than MINIMAL_OP_DURATION is reported failed
+    _result:list[bool] = list()
+    assert _motor.go2pos(50000, velocity=1000, on_complete=lambda _success: (_result.append(_success), _done.set()))
+    time.sleep(0.2)
+    _moving = _motor.read_snapshot()
+    assert _moving.error == 0 and _moving.velocity > 0 and _moving.current > 0 and not _moving.target_reached
+    assert _done.wait(TIMEOUT) and _result == [True]
+    assert not _motor.is_motor_in_motion()
+    _snap = _motor.read_snapshot()          # the drive is disabled after the move
+    assert _snap.error == 0 and not _snap.quick_stop and _snap.timestamp > _moving.timestamp
+    assert abs(_snap.position - 50000) < 100 and _snap.velocity == 0
+    assert _motor.snapshot is _snap and _motor.mDev_pos == _snap.position
+
+
+def test_snapshot_does_not_block_when_asked(eposSim):
+    _motor = _open()
+    _held = threading.Event()
+    _release = threading.Event()
+    def _hold():
+        with _motor.comm_lock:
+            _held.set()
+            _release.wait(TIMEOUT)
+    _holder = threading.Thread(target=_hold)
+    _holder.start()
+    assert _held.wait(TIMEOUT)
+    try:
+        assert _motor.read_snapshot(blocking=False) is None
+        _blocked = threading.Thread(target=_motor.read_snapshot)
+        _blocked.start()
+        _blocked.join(0.2)
+        assert _blocked.is_alive()          # waits for the device
+    finally:
+        _release.set()
+        _holder.join(TIMEOUT)
+    _blocked.join(TIMEOUT)
+    assert not _blocked.is_alive()
+    assert _motor.read_snapshot(blocking=False) is not None
+
+
+def test_devices_on_different_ports_do_not_wait(eposSim):
+    _devs = MAXON_Motor.init_devices(backend='sim')
+    _first, _second = MAXON_Motor(_devs[0]), MAXON_Motor(_devs[1])
+    assert _first.comm_lock is not _second.comm_lock
+    assert _first.comm_lock is MAXON_Motor.portLock(_devs[0].port)
+    with _first.comm_lock:                  # the first device busy, library-wide lock free
+        assert not MAXON_Motor.mxn_lock.locked()
+        _start = time.monotonic()
+        _snap = _second.read_snapshot(blocking=False)
+        assert _snap is not None and _snap.error == 0
+        assert time.monotonic() - _start < 1.0
+
+
+def test_hanging_port_does_not_hold_enumeration(eposSim, monkeypatch):
+    monkeypatch.setattr(MAXON_Motor, 'epos', eposSimulator(devices=[simDevice(port=f'USB{_i}'.encode(), sn=0x100 + _i, nodeid=1, sensortype=1)
+                                                                   for _i in range(3)]))
+    monkeypatch.setattr(MAXON_Motor, 'enum_parallel', True)
+    monkeypatch.setattr(MAXON_Motor, 'enum_port_timeout', 0.3)
+    _release = threading.Event()
+    _readDevSN = MAXON_Motor.readDevSN
+    def _hanging(keyHandle, nodeID, lock = None):
+        if lock is MAXON_Motor.port_locks.get(b'USB1'):
+            _release.wait(3.0)                  # unresponsive controller
+        return _readDevSN(keyHandle, nodeID, lock)
+    monkeypatch.setattr(MAXON_Motor, 'readDevSN', staticmethod(_hanging))
+    _start = time.monotonic()
+    try:
+        _devs = MAXON_Motor.init_devices(backend='sim')
+        _elapsed = time.monotonic() - _start
+        assert not MAXON_Motor.mxn_lock.locked()
+    finally:
+        _release.set()
+    assert [_dev.port for _dev in _devs] == [b'USB0', b'USB2']
+    assert _elapsed < 0.3 + 0.5
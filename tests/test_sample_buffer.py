@@ -0,0 +1,50 @@
+import numpy as np
+
+from sample_buffer import sampleBuffer, FLAG_STABLE
+
+
+def test_append_wraps_keeping_latest_contiguous():
+    _buf = sampleBuffer(8)
+    for _i in range(21):
+        _buf.append(float(_i), 10.0 * _i, FLAG_STABLE if _i % 2 else 0)
+    assert len(_buf) == 8 and _buf.total == 21
+    _win = _buf.last_n(100)
+    np.testing.assert_array_equal(_win.time, np.arange(13, 21, dtype=float))
+    np.testing.assert_array_equal(_win.weight, 10.0 * np.arange(13, 21))
+    np.testing.assert_array_equal(_win.flags, [FLAG_STABLE if _i % 2 else 0 for _i in range(13, 21)])
+    assert _buf.latest() == (20.0, 200.0, 0)
+
+
+def test_extend_matches_append():
+    _t = np.arange(30, dtype=float) * 0.1
+    _w = np.sin(_t)
+    _appended = sampleBuffer(16)
+    for _ti, _wi in zip(_t, _w):
+        _appended.append(_ti, _wi)
+    _extended = sampleBuffer(16)
+    for _chunk in (slice(0, 5), slice(5, 19), slice(19, 30)):     # chunks crossing the wrap point
+        _extended.extend(_t[_chunk], _w[_chunk])
+    assert _extended.total == _appended.total == 30
+    np.testing.assert_array_equal(_extended.last_n(16).time, _appended.last_n(16).time)
+    np.testing.assert_array_equal(_extended.last_n(16).weight, _appended.last_n(16).weight)
+
+
+def test_extend_longer_than_capacity():
+    _buf = sampleBuffer(4)
+    _buf.extend(np.arange(10, dtype=float), np.arange(10, dtype=float), FLAG_STABLE)
+    assert _buf.total == 10
+    np.testing.assert_array_equal(_buf.last_n(4).weight, [6.0, 7.0, 8.0, 9.0])
+    assert (_buf.last_n(4).flags == FLAG_STABLE).all()
+
+
+def test_time_queries():
+    _buf = sampleBuffer(32)
+    _buf.extend(np.arange(20, dtype=float), np.arange(20, dtype=float))
+    np.testing.assert_array_equal(_buf.last_seconds(3.0).time, [16.0, 17.0, 18.0, 19.0])
+    np.testing.assert_array_equal(_buf.since(17.5).time, [18.0, 19.0])
+    _buf.mark_run_start()
+    _buf.append(20.0, 20.0)
+    _buf.append(21.0, 21.0)
+    np.testing.assert_array_equal(_buf.since_run_start().time, [20.0, 21.0])
+    _buf.clear()
+    assert len(_buf) == 0 and _buf.latest() is None
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from scale_capture import scaleCapture, scaleReplay, readCapture, CAPTURE_MAGIC
+from WLCscale import WLCscale
+
+FRAME = 'SI {stable} +{weight:9.3f} kg \r\n'
+
+
+def _session() -> list[tuple[float, bytes]]:    # frames split at arbitrary points, with garbage between them
+    _stream = b''.join((b'\x00\xff' if _i % 7 == 0 else b'') +
+                       FRAME.format(stable=' ' if _i % 3 else '?', weight=1.0 + 0.01 * _i).encode('ascii')
+                       for _i in range(200))
+    _chunks:list[tuple[float, bytes]] = list()
+    _pos, _t, _size = 0, 5000.0, 1
+    while _pos < len(_stream):
+        _chunks.append((_t, _stream[_pos:_pos + _size]))
+        _pos += _size
+        _t += 0.001 * _size
+        _size = _size % 37 + 1
+    return _chunks
+
+
+def test_capture_round_trip(tmp_path):
+    _path = str(tmp_path / 'session.cap')
+    _chunks = _session()
+    _capture = scaleCapture(_path)
+    for _t, _data in _chunks:
+        _capture.write(_t, _data)
+    _capture.write(_chunks[-1][0] + 1.0, bytes(range(256)) * 300)     # longer than a record, split
+    _capture.close()
+    _read = list(readCapture(_path))
+    assert [_data for _, _data in _read[:len(_chunks)]] == [_data for _, _data in _chunks]
+    assert all(abs(_t - _rt) < 1e-5 for (_t, _), (_rt, _) in zip(_chunks, _read))
+    assert b''.join(_data for _, _data in _read[len(_chunks):]) == bytes(range(256)) * 300
+    assert _capture.records == len(_read)
+
+
+def test_replay_matches_live_feed(tmp_path):
+    _path = str(tmp_path / 'session.cap')
+    _chunks = _session()
+    _live = WLCscale('live')                    # not connected, fed directly
+    _capture = scaleCapture(_path)
+    for _t, _data in _chunks:
+        _capture.write(_t, _data)
+        _live._feed_bytes(_data, _t)
+    _capture.close()
+    _expected = _live.drain_samples()
+    assert len(_expected) == 200
+
+    _scale = WLCscale('replay')
+    _replay = scaleReplay(_path, _scale._feed_bytes)
+    assert _replay.run(speed=0) == 200 and _replay.chunks == len(_chunks)
+    _samples = _scale.drain_samples()
+    assert [_s.weight for _s in _samples] == [_s.weight for _s in _expected]
+    assert [_s.stable for _s in _samples] == [_s.stable for _s in _expected]
+    assert [_s.time for _s in _samples] == pytest.approx([_s.time for _s in _expected], abs=1e-5)
+
+
+def test_paced_replay_is_retimed(tmp_path):
+    _path = str(tmp_path / 'session.cap')
+    _capture = scaleCapture(_path)
+    for _i in range(5):
+        _capture.write(100.0 + 0.1 * _i, FRAME.format(stable=' ', weight=float(_i)).encode('ascii'))
+    _capture.close()
+    _scale = WLCscale('replay')
+    _start = time.monotonic()
+    assert scaleReplay(_path, _scale._feed_bytes).run(speed=4.0) == 5
+    assert time.monotonic() - _start == pytest.approx(0.1, abs=0.05)
+    _times = [_s.time for _s in _scale.drain_samples()]
+    assert _times[0] == pytest.approx(_start, abs=0.05)     # replay time, not the captured one
+    assert _times[-1] - _times[0] == pytest.approx(0.1, abs=0.01)
+
+
+def test_not_a_capture(tmp_path):
+    _path = tmp_path / 'other.bin'
+    _path.write_bytes(b'X' * len(CAPTURE_MAGIC) + bytes(8))
+    with pytest.raises(ValueError):
+        list(readCapture(str(_path)))
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from station_reactor import stationReactor
+
+
+@pytest.fixture
+def reactor():
+    _reactor = stationReactor('test')
+    yield _reactor
+    _reactor.stop()
+
+
+def test_periodic_job_runs_at_its_rate(reactor):
+    _runs:list[float] = list()
+    reactor.add_job('tick', lambda: _runs.append(time.monotonic()), 0.02)
+    time.sleep(0.5)
+    reactor.remove_job('tick')
+    assert 10 <= len(_runs) <= 30
+    assert reactor.job('tick') is None
+
+
+def test_done_result_finishes_the_job(reactor):
+    _count = iter(range(100))
+    _done = threading.Event()
+    _job = reactor.add_job('countdown', lambda: stationReactor.DONE if next(_count) == 3 else None, 0.01, on_done=_done.set)
+    assert _job.join(2.0) and _done.is_set()
+    assert not _job.is_alive() and _job.runs == 4
+    assert reactor.job('countdown') is None
+
+
+def test_results_go_to_subscribers(reactor):
+    _results:list[int] = list()
+    _values = iter(range(100))
+    reactor.add_job('values', lambda: next(_values), 0.01, subscribers=[_results.append])
+    time.sleep(0.2)
+    reactor.remove_job('values')
+    assert _results[:5] == [0, 1, 2, 3, 4]
+
+
+def test_jobs_are_ordered_by_due_time(reactor):
+    _order:list[str] = list()
+    for _name, _delay in (('c', 0.15), ('a', 0.05), ('b', 0.1)):
+        reactor.add_job(_name, lambda _name=_name: (_order.append(_name), stationReactor.DONE)[1], 1.0, delay=_delay)
+    time.sleep(0.4)
+    assert _order == ['a', 'b', 'c']
+
+
+def test_same_name_replaces_and_cancelled_job_skips_on_done(reactor):
+    _old_done = threading.Event()
+    _old = reactor.add_job('job', lambda: None, 0.01, on_done=_old_done.set)
+    _new_runs:list[int] = list()
+    _new = reactor.add_job('job', lambda: _new_runs.append(1), 0.01)
+    assert _old.join(1.0) and not _old_done.is_set()
+    time.sleep(0.1)
+    assert reactor.job('job') is _new and _new_runs
+
+
+def test_failing_job_is_finished(reactor):
+    _job = reactor.add_job('fail', lambda: 1 / 0, 0.01)
+    assert _job.join(1.0) and _job.runs == 1
+
+
+def test_slow_job_is_counted_as_overrun(reactor):
+    reactor.add_job('slow', lambda: time.sleep(0.03), 0.01)
+    time.sleep(0.3)
+    reactor.remove_job('slow')
+    assert reactor.loop_overruns > 0
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from weight_filters import filterChain, medianFilter, hampelFilter, emaFilter, kalmanFilter
+
+CONFIG = [('hampel', {'n': 7, 'k': 3.0}), ('median', {'n': 5}), ('ema', {'tau': 0.2}), ('kalman', {'q': 1.0, 'r': 0.05})]
+
+
+def _signal(n:int = 400):
+    _rng = np.random.default_rng(1)
+    _t = np.cumsum(_rng.uniform(0.015, 0.03, n))
+    _x = 0.5 * _t + _rng.normal(0.0, 0.02, n)
+    _x[20::37] += 5.0                                   # spikes, the first window is padded with the first sample
+    return _t, _x
+
+
+def test_from_config():
+    _chain = filterChain.from_config(CONFIG + [('unknown', {})])
+    assert [type(_f) for _f in _chain.filters] == [hampelFilter, medianFilter, emaFilter, kalmanFilter]
+
+
+@pytest.mark.parametrize('config', [CONFIG[:1], CONFIG[1:2], CONFIG[2:3], CONFIG[3:], CONFIG])
+def test_batches_match_one_call(config):
+    _t, _x = _signal()
+    _whole = filterChain.from_config(config).process(_t, _x.copy())
+    _chain = filterChain.from_config(config)
+    _edges = [0, 1, 2, 10, 57, 58, 200, 333, len(_t)]
+    _batched = np.concatenate([_chain.process(_t[_a:_b], _x[_a:_b].copy()) for _a, _b in zip(_edges, _edges[1:])])
+    np.testing.assert_allclose(_batched, _whole, rtol=1e-12, atol=1e-12)
+
+
+def test_reset_restarts_the_chain():
+    _t, _x = _signal()
+    _chain = filterChain.from_config(CONFIG)
+    _first = _chain.process(_t, _x.copy())
+    _chain.reset()
+    np.testing.assert_allclose(_chain.process(_t, _x.copy()), _first)
+
+
+def test_hampel_removes_spikes():
+    _t, _x = _signal()
+    _y = hampelFilter(n=7, k=3.0).process(_t, _x.copy())
+    assert np.abs(_y - 0.5 * _t).max() < 0.5
@@ -0,0 +1,60 @@
+import os
+import time
+
+import pytest
+
+from WLCscale import WLCscale
+from station_reactor import stationReactor
+from wlc_emulator import wlcEmulator
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'openpty'), reason='WLC emulator requires pseudo-terminals')
+
+SECONDS = 1.0
+
+
+def _run(emulator:wlcEmulator, **scale_args) -> list[WLCscale.weightSample]:
+    _scale = WLCscale(emulator.port, streaming=True, **scale_args)
+    try:
+        assert _scale.connect()
+        emulator.start()
+        time.sleep(SECONDS)
+        emulator.stop()
+        time.sleep(0.2)
+        return _scale.drain_samples()
+    finally:
+        _scale.disconnect()
+        emulator.close()
+
+
+@pytest.fixture
+def reactor():
+    _reactor = stationReactor('test')
+    yield _reactor
+    _reactor.stop()
+
+
+@pytest.mark.parametrize('mode', ['thread', 'reactor'])
+def test_streaming_receives_every_frame(mode, request):
+    _emulator = wlcEmulator(rate=45.0, weight=1.0, flow=0.5)
+    _args = dict(reactor=request.getfixturevalue('reactor')) if mode == 'reactor' else dict()
+    _samples = _run(_emulator, **_args)
+    _sent = [_w for _, _w in _emulator.sent]
+    assert _emulator.frames_sent >= 0.8 * 45.0 * SECONDS
+    assert [round(_s.weight, 3) for _s in _samples] == _sent
+    assert all(_a.time <= _b.time for _a, _b in zip(_samples, _samples[1:]))
+
+
+def test_garbage_between_frames_is_skipped():
+    _emulator = wlcEmulator(rate=45.0, weight=2.0, flow=-0.3, garbage_rate=0.3, seed=7)
+    _samples = _run(_emulator)
+    _sent = {_w for _, _w in _emulator.sent}
+    assert _emulator.garbage_sent > 0
+    assert _samples and all(round(_s.weight, 3) in _sent for _s in _samples)
+    assert len(_samples) >= 0.8 * len(_sent)
+
+
+def test_dropped_bytes_keep_the_reader_alive():
+    _emulator = wlcEmulator(rate=45.0, weight=1.0, drop_rate=0.01, seed=3)
+    _samples = _run(_emulator)
+    assert _emulator.bytes_dropped > 0
+    assert len(_samples) >= 0.5 * _emulator.frames_sent
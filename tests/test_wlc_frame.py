@@ -0,0 +1,24 @@
+import math
+
+from wlc_frame import wlcDecoder
+
+FRAMES = b'SI ? -   58.237 kg \r\n\x00\xffS    +    1.500 g \r\nSI ^ +  -------- kg \r\n  ? +    2.000 kg \r\n'
+
+
+def test_decode_all_in_place():
+    _frames = wlcDecoder.decode_all(FRAMES)
+    assert [(_f.weight if not math.isnan(_f.weight) else None, _f.unit, _f.stable, _f.overload) for _, _f in _frames] == \
+           [(-58.237, 'kg', False, False), (1.5, 'g', True, False), (None, 'kg', False, True), (2.0, 'kg', False, False)]
+    assert _frames[-1][0] == len(FRAMES)
+    for _data in (bytearray(FRAMES), memoryview(FRAMES), memoryview(bytearray(FRAMES))):
+        assert [_end for _end, _ in wlcDecoder.decode_all(_data)] == [_end for _end, _ in _frames]
+    _buf = bytearray(FRAMES + b'SI   +    3.0')    # partial frame after the end bound
+    assert [_end for _end, _ in wlcDecoder.decode_all(_buf, len(FRAMES))] == [_end for _end, _ in _frames]
+
+
+def test_repeated_frames_decode_the_same():
+    _line = b'SI   +   12.345 kg \r\n'
+    _first = wlcDecoder.decode(_line)                   # fields cached by the first decode
+    assert wlcDecoder.decode(bytearray(_line)) == _first == (12.345, 1, 'kg', True, False)
+    assert wlcDecoder.decode(b'SI   + OL kg \r\n').overload     # cached fields, non numeric mass
+    assert wlcDecoder.decode(b'garbage') is None
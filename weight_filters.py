@@ -0,0 +1,194 @@
+from __future__ import annotations
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from common_utils import print_err, print_log
+
+
+#
+#   Scale weight signal conditioning.
+#   Filters are causal and stateful: process() takes the batch of samples received since the last call
+#   (monotonic times and weights) and returns the filtered weights, continuing from the previous batch.
+#   Window filters (median, Hampel) run vectorized over the batch, recursive ones (EMA, Kalman) per sample.
+#   filterChain.from_config builds a per scale chain, e.g. [('hampel', {'n': 7}), ('kalman', {'r': 0.05})]
+#
+
+class weightFilter:
+    name = 'none'
+
+    def reset(self):
+        pass
+
+    def process(self, t:np.ndarray, x:np.ndarray) -> np.ndarray:
+        return x
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({", ".join(f"{_k}={_v}" for _k, _v in self.params().items())})'
+
+    def params(self) -> dict:
+        return dict()
+
+
+class _windowFilter(weightFilter):          # keeps the last n-1 samples to continue the window over batches
+    def __init__(self, n:int):
+        self.n:int = max(1, int(n))
+        self._tail:np.ndarray = np.empty(0)
+
+    def reset(self):
+        self._tail = np.empty(0)
+
+    def _windows(self, x:np.ndarray) -> np.ndarray:     # (len(x), n) windows ending at every sample
+        if not self._tail.size:
+            self._tail = np.full(self.n - 1, x[0])      # first batch - window padded with the first sample
+        _ext = np.concatenate((self._tail, x))
+        self._tail = _ext[len(_ext) - (self.n - 1):] if self.n > 1 else np.empty(0)
+        return sliding_window_view(_ext, self.n)
+
+    def params(self) -> dict:
+        return {'n': self.n}
+
+
+class medianFilter(_windowFilter):          # median of the last n samples
+    name = 'median'
+
+    def __init__(self, n:int = 5):
+        super().__init__(n)
+
+    def process(self, t:np.ndarray, x:np.ndarray) -> np.ndarray:
+        if not x.size:
+            return x
+        return np.median(self._windows(x), axis=1)
+
+
+class hampelFilter(_windowFilter):          # outliers (> k scaled MADs from the window median) are replaced by the median
+    name = 'hampel'
+    MAD_SCALE = 1.4826                      # MAD to sigma for normal noise
+
+    def __init__(self, n:int = 7, k:float = 3.0, min_sigma:float = 0.0):
+        super().__init__(n)
+        self.k:float = k
+        self.min_sigma:float = min_sigma    # weight units, sigma floor (scale resolution) for a flat window
+        self.outliers:int = 0               # samples replaced since reset
+
+    def reset(self):
+        super().reset()
+        self.outliers = 0
+
+    def process(self, t:np.ndarray, x:np.ndarray) -> np.ndarray:
+        if not x.size:
+            return x
+        _win = self._windows(x)
+        _med = np.median(_win, axis=1)
+        _sigma = np.maximum(hampelFilter.MAD_SCALE * np.median(np.abs(_win - _med[:, None]), axis=1), self.min_sigma)
+        _out = np.abs(x - _med) > self.k * _sigma
+        self.outliers += int(np.count_nonzero(_out))
+        return np.where(_out, _med, x)
+
+    def params(self) -> dict:
+        return {'n': self.n, 'k': self.k, 'min_sigma': self.min_sigma}
+
+
+class emaFilter(weightFilter):              # exponential moving average with time constant tau (irregular sampling safe)
+    name = 'ema'
+
+    def __init__(self, tau:float = 0.5):
+        self.tau:float = tau                # sec
+        self.__y:float | None = None
+        self.__t:float = 0.0
+
+    def reset(self):
+        self.__y = None
+
+    def process(self, t:np.ndarray, x:np.ndarray) -> np.ndarray:
+        _out = np.empty_like(x, dtype=np.float64)
+        for _i in range(x.size):
+            if self.__y is None:
+                self.__y = float(x[_i])
+            else:
+                _alpha = 1.0 - math.exp(-max(t[_i] - self.__t, 0.0) / self.tau) if self.tau > 0 else 1.0
+                self.__y += _alpha * (x[_i] - self.__y)
+            self.__t = float(t[_i])
+            _out[_i] = self.__y
+        return _out
+
+    def params(self) -> dict:
+        return {'tau': self.tau}
+
+
+class kalmanFilter(weightFilter):           # weight + flow rate (constant rate model), weight measured
+    name = 'kalman'
+
+    def __init__(self, q:float = 1.0, r:float = 0.05):
+        self.q:float = q                    # flow rate change noise density (weight units / sec^2)^2 * sec
+        self.r:float = r                    # measurement noise variance (weight units^2)
+        self.reset()
+
+    def reset(self):
+        self.__x:np.ndarray | None = None   # [weight, rate]
+        self.__p:np.ndarray = np.eye(2)
+        self.__t:float = 0.0
+
+    @property
+    def rate(self) -> float:                # estimated flow rate, weight units / sec
+        return float(self.__x[1]) if self.__x is not None else 0.0
+
+    def process(self, t:np.ndarray, x:np.ndarray) -> np.ndarray:
+        _out = np.empty_like(x, dtype=np.float64)
+        for _i in range(x.size):
+            _z = float(x[_i])
+            if self.__x is None:
+                self.__x = np.array([_z, 0.0])
+                self.__p = np.diag([self.r, 1.0])
+            else:
+                _dt = max(float(t[_i]) - self.__t, 0.0)
+                _f = np.array([[1.0, _dt], [0.0, 1.0]])
+                _qm = self.q * np.array([[_dt**3 / 3, _dt**2 / 2], [_dt**2 / 2, _dt]])
+                self.__x = _f @ self.__x
+                self.__p = _f @ self.__p @ _f.T + _qm
+                _s = self.__p[0, 0] + self.r
+                _k = self.__p[:, 0] / _s
+                self.__x = self.__x + _k * (_z - self.__x[0])
+                self.__p = self.__p - np.outer(_k, self.__p[0, :])
+            self.__t = float(t[_i])
+            _out[_i] = self.__x[0]
+        return _out
+
+    def params(self) -> dict:
+        return {'q': self.q, 'r': self.r}
+
+
+class filterChain(weightFilter):            # filters applied in order
+    name = 'chain'
+    FILTERS:dict[str, type[weightFilter]] = {_f.name: _f for _f in (medianFilter, hampelFilter, emaFilter, kalmanFilter)}
+
+    def __init__(self, filters:list[weightFilter] = None):
+        self.filters:list[weightFilter] = list(filters) if filters else list()
+
+    def __repr__(self):
+        return f'filterChain({self.filters})'
+
+    def __len__(self) -> int:
+        return len(self.filters)
+
+    @staticmethod
+    def from_config(config:list[tuple[str, dict]]) -> filterChain:
+        _filters:list[weightFilter] = list()
+        for _name, _params in config:
+            _cls = filterChain.FILTERS.get(_name)
+            if _cls is None:
+                print_err(f'Unknown weight filter {_name}, known filters: {list(filterChain.FILTERS)}')
+                continue
+            _filters.append(_cls(**(_params or dict())))
+        _chain = filterChain(_filters)
+        print_log(f'Weight filter chain: {_chain}')
+        return _chain
+
+    def reset(self):
+        for _f in self.filters:
+            _f.reset()
+
+    def process(self, t:np.ndarray, x:np.ndarray) -> np.ndarray:
+        for _f in self.filters:
+            x = _f.process(t, x)
+        return x
@@ -0,0 +1,174 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import random
+import threading
+from collections import deque
+
+from common_utils import print_err, print_DEBUG, print_warn, print_log, exptTrace
+
+
+#
+#   WLC scale emulator on a pseudo-terminal pair (Linux / macOS).
+#   The emulator writes WLC frames ("SI ? -   58.237 kg \r\n") to the pty master at a fixed rate,
+#   the real WLCscale opens the slave end (wlcEmulator.port) as a serial port. Weight ramps with
+#   the configured flow, with optional noise, dropped bytes and garbage bytes between frames.
+#   Sent frames are recorded (time, weight) for end-to-end latency measurement.
+#   Run as a script for a throughput / latency benchmark of the real serial path.
+#
+
+class wlcEmulator:
+    FRAME_FORMAT = 'SI {stable} {sign}{weight:9.3f} kg \r\n'     # 21 bytes
+    SENT_MAX = 100000                       # sent frames records kept
+
+    def __init__(self, rate:float = 45.0, weight:float = 0.0, flow:float = 0.0, noise:float = 0.0,
+                 stable_band:float = 0.01, drop_rate:float = 0.0, garbage_rate:float = 0.0, seed:int = None):
+        if not hasattr(os, 'openpty'):
+            raise RuntimeError('WLC emulator requires pseudo-terminals (Linux / macOS)')
+        self.rate:float = rate              # frames / sec
+        self.weight:float = weight          # kg, may be negative
+        self.flow:float = flow              # kg / sec
+        self.noise:float = noise            # kg, gaussian sigma
+        self.stable_band:float = stable_band    # kg, frame change below it is reported stable
+        self.drop_rate:float = drop_rate    # probability to drop each byte
+        self.garbage_rate:float = garbage_rate  # probability to insert garbage bytes before a frame
+        self.__random = random.Random(seed)
+        self.frames_sent:int = 0
+        self.bytes_dropped:int = 0
+        self.garbage_sent:int = 0
+        self.overflows:int = 0              # frames lost because nobody reads the slave
+        self.sent:deque[tuple[float, float]] = deque(maxlen=wlcEmulator.SENT_MAX)     # (monotonic time, weight)
+        self.__stop = threading.Event()
+        self.__thread:threading.Thread | None = None
+        self.__last_reported:float = weight
+
+        import tty
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        os.set_blocking(self.__master, False)
+        self.port:str = os.ttyname(self.__slave)
+
+    def __repr__(self):
+        return f'wlcEmulator({self.port}, rate={self.rate}, sent={self.frames_sent})'
+
+    def start(self) -> str:
+        if self.__thread is None or not self.__thread.is_alive():
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__run, name=f'wlcEmulator-{self.port}', daemon=True)
+            self.__thread.start()
+            print_log(f'WLC emulator started on {self.port}, rate = {self.rate} frames/sec')
+        return self.port
+
+    def stop(self):
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join(1.0)
+        print_log(f'WLC emulator stopped on {self.port}: {self.frames_sent} frames, {self.bytes_dropped} bytes dropped, {self.garbage_sent} garbage bytes, {self.overflows} overflows')
+
+    def close(self):
+        self.stop()
+        for _fd in (self.__master, self.__slave):
+            try:
+                os.close(_fd)
+            except OSError:
+                pass
+
+    def frame(self, weight:float) -> bytes:
+        _stable = ' ' if abs(weight - self.__last_reported) < self.stable_band else '?'
+        self.__last_reported = weight
+        return wlcEmulator.FRAME_FORMAT.format(stable=_stable, sign='-' if weight < 0 else '+',
+                                               weight=abs(weight)).encode('ascii')
+
+    def __corrupt(self, data:bytes) -> bytes:
+        if self.garbage_rate and self.__random.random() < self.garbage_rate:
+            _garbage = bytes(self.__random.randrange(256) for _ in range(self.__random.randint(1, 8)))
+            self.garbage_sent += len(_garbage)
+            data = _garbage + data
+        if self.drop_rate:
+            _kept = bytes(_b for _b in data if self.__random.random() >= self.drop_rate)
+            self.bytes_dropped += len(data) - len(_kept)
+            data = _kept
+        return data
+
+    def __run(self):
+        _period = 1.0 / self.rate
+        _start = _next = time.monotonic()
+        try:
+            while not self.__stop.is_set():
+                _now = time.monotonic()
+                _weight = self.weight + self.flow * (_now - _start)
+                if self.noise:
+                    _weight += self.__random.gauss(0.0, self.noise)
+                _data = self.__corrupt(self.frame(_weight))
+                try:
+                    os.write(self.__master, _data)
+                    self.sent.append((time.monotonic(), round(_weight, 3)))
+                    self.frames_sent += 1
+                except BlockingIOError:
+                    self.overflows += 1
+                _next += _period
+                _wait = _next - time.monotonic()
+                if _wait < 0:                   # behind the schedule - no catch up burst
+                    _next = time.monotonic()
+                    _wait = 0
+                self.__stop.wait(_wait)
+        except Exception as ex:
+            exptTrace(ex)
+            print_err(f'WLC emulator on {self.port} failed. Exception: {ex} of type: {type(ex)}')
+
+
+#  =====  BENCHMARK  =====
+
+if __name__ == "__main__":
+    import argparse
+    import math
+    import statistics
+    from WLCscale import WLCscale
+    from wlc_frame import wlcDecoder
+
+    parser = argparse.ArgumentParser(description='WLC scale emulator benchmark of the real WLCscale serial path')
+    parser.add_argument('--rate', type=float, default=45.0, help='frames / sec')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--noise', type=float, default=0.0)
+    parser.add_argument('--drop', type=float, default=0.0, help='byte drop probability')
+    parser.add_argument('--garbage', type=float, default=0.0, help='garbage probability per frame')
+    parser.add_argument('--repeat', type=int, default=10, help='decoder benchmark runs')
+    parser.add_argument('--mode', choices=['poll', 'streaming'], default='streaming')
+    args = parser.parse_args()
+
+    emulator = wlcEmulator(rate=args.rate, weight=1.0, flow=0.1, noise=args.noise, drop_rate=args.drop,
+                           garbage_rate=args.garbage)
+    scale = WLCscale(emulator.port, streaming=(args.mode == 'streaming'))
+    try:
+        scale.connect()
+        emulator.start()
+        time.sleep(args.seconds)
+        emulator.stop()
+        time.sleep(0.2)
+        received = scale.drain_samples()
+
+        sent = {_w: _t for _t, _w in emulator.sent}    # frames are matched by weight: clean ramp only
+        clean = not (args.noise or args.drop or args.garbage)
+        latency = [_s.time - sent[round(_s.weight, 3)] for _s in received if round(_s.weight, 3) in sent] if clean else []
+        print_log(f'Frames sent = {emulator.frames_sent}, received = {len(received)} ({len(received) / args.seconds:.1f} / sec), '
+                  f'bytes dropped = {emulator.bytes_dropped}, garbage = {emulator.garbage_sent}')
+        if latency:
+            print_log(f'Latency: mean = {statistics.mean(latency)*1000:.2f} ms, max = {max(latency)*1000:.2f} ms, '
+                      f'matched = {len(latency)}')
+
+        _frames = [emulator.frame(1.0 + _i * 0.001) for _i in range(10000)]
+        _buffer = b''.join(_frames)
+        _decoders = (('parse_weight', lambda: [scale.parse_weight(_frame.decode().strip()) for _frame in _frames]),
+                     ('wlcDecoder.decode', lambda: [wlcDecoder.decode(_frame) for _frame in _frames]),
+                     ('wlcDecoder.decode_all', lambda: wlcDecoder.decode_all(_buffer)))
+        for _name, _decode in _decoders:            # best of args.repeat runs, single runs are too noisy to compare
+            _best = math.inf
+            for _ in range(args.repeat):
+                _t = time.perf_counter()
+                _decode()
+                _best = min(_best, time.perf_counter() - _t)
+            print_log(f'{_name}: {_best / len(_frames) * 1e6:.2f} us / frame')
+    finally:
+        scale.disconnect()
+        emulator.close()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import math
+import re
+from collections import namedtuple
+
+
+#
+#   WLC scale frame decoder working on the received bytes (bytes / bytearray / memoryview), no str decoding.
+#   Mass frame (WLC manual, 21.4.6): "SI ? -   58.237 kg \r\n"
+#       [0:3] command (S, SI, SU, SUI), [3] stability (' ' - stable, '?' - unstable, '^' / 'v' - over / under range),
+#       [5] sign, [6:15] mass, [16:19] unit. Continuous transmission frames have no command field.
+#   A non numeric mass field is reported as overload as well.
+#   decode_all() decodes every frame of a buffer in one pass, garbage between frames is skipped.
+#   The frames are matched in place (bytes / bytearray / memoryview, no copy of the buffer). The decoded
+#   stability / sign / unit of a frame are cached by the raw fields, a repeated frame costs the regex match,
+#   one float() conversion and the result tuple.
+#
+
+_UNSTABLE = ord('?')
+_OVERLOAD = (ord('^'), ord('v'))
+_MINUS = ord('-')
+_units:dict[bytes, str] = dict()            # decoded units cache
+_fields:dict[tuple[bytes, bytes, bytes], tuple[int, str, bool, bool]] = dict()
+                                            # (stability, sign, unit) -> (sign, unit, stable, overload)
+_CACHE_MAX = 256                            # cached fields, noisy frames don't grow the cache
+
+class wlcDecoder:
+    frame = namedtuple("frame", ["weight", "sign", "unit", "stable", "overload"])
+                                            # weight - signed, nan when the weight field is not a number; sign - +1 / -1
+    FRAME_RE = re.compile(rb'(?:[A-Z]{1,3} {0,2})?([ ?^v]) ([-+ ]) *([0-9]*\.?[0-9]+|[A-Z]+|-+) ([A-Za-z%]+)[ \r]*(?:\n|$)')
+
+    @staticmethod
+    def _frame(status:bytes, sign:bytes, value:bytes, unit:bytes)->wlcDecoder.frame:     # decoded match groups
+        _unit = _units.get(unit)
+        if _unit is None:
+            _unit = _units.setdefault(bytes(unit), unit.decode('ascii'))
+        _sign = -1 if sign[0] == _MINUS else 1
+        _status = status[0]
+        try:
+            _weight = _sign * float(value)
+            _overload = _status in _OVERLOAD
+        except ValueError:
+            _weight = math.nan
+            _overload = True
+        return wlcDecoder.frame(_weight, _sign, _unit, _status != _UNSTABLE and not _overload, _overload)
+
+    @staticmethod
+    def _decode(status:bytes, sign:bytes, value:bytes, unit:bytes)->wlcDecoder.frame:   # decoded match groups, cached fields
+        _cached = _fields.get((status, sign, unit))
+        if _cached is not None:
+            try:
+                return tuple.__new__(wlcDecoder.frame, (_cached[0] * float(value),) + _cached)
+            except ValueError:
+                pass
+        _frame = wlcDecoder._frame(status, sign, value, unit)
+        if not math.isnan(_frame.weight) and len(_fields) < _CACHE_MAX:
+            _fields[(status, sign, unit)] = tuple(_frame[1:])
+        return _frame
+
+    @staticmethod
+    def decode(data:bytes | bytearray | memoryview)->wlcDecoder.frame | None:    # the first frame in data, None - no valid frame
+        _match = wlcDecoder.FRAME_RE.search(data)
+        return wlcDecoder._decode(*_match.groups()) if _match is not None else None
+
+    @staticmethod
+    def decode_all(data:bytes | bytearray | memoryview, end:int = None)->list[tuple[int, wlcDecoder.frame]]:
+                                            # (end offset in data, frame) of every frame in data[:end]
+        _decode = wlcDecoder._decode
+        return [(_m.end(), _decode(*_m.groups())) 
+                for _m in wlcDecoder.FRAME_RE.finditer(data, 0, len(data) if end is None else end)]